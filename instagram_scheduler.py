@@ -68,6 +68,38 @@ def import_autopost():
         return None, None
 
 
+# ---------------------------------------------------------------------------
+# Content bank (pre-rendered captions + media)
+# ---------------------------------------------------------------------------
+BANK_REFILL_GUARD = timedelta(minutes=int(os.getenv("CONTENT_BANK_REFILL_GUARD_MINUTES", "30")))
+
+
+def open_content_bank():
+    """Django setup karke myapp.content_bank return karo (na ho paye to None → folder mode)"""
+    try:
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myproject.settings")
+        import django
+
+        django.setup()
+        return importlib.import_module("myapp.content_bank")
+    except Exception as exc:
+        logging.warning("Content bank unavailable, using content folders: %s", exc)
+        return None
+
+
+def claim_bank_item(bank):
+    if bank is None:
+        return None
+    from django.db import close_old_connections
+
+    close_old_connections()
+    try:
+        return bank.claim()
+    except Exception as exc:
+        logging.warning("Content bank claim failed: %s", exc)
+        return None
+
+
 # ---------------------------------------------------------------------------
 # State handling
 # ---------------------------------------------------------------------------
@@ -109,6 +141,8 @@ def main_loop(run_once: bool = False, dry_run: bool = False, jobs: list | None =
     tz = pytz.timezone(SCHEDULE_TZ)
     jobs = jobs or DEFAULT_JOBS
 
+    # Bank pehle load karo, taaki myapp root project se import ho (nested copy se nahi)
+    bank = open_content_bank()
     ensure_project_on_path()
     autopost_mod, autopost_main = import_autopost()
 
@@ -158,6 +192,8 @@ def main_loop(run_once: bool = False, dry_run: bool = False, jobs: list | None =
     logging.info("Scheduler started. Jobs: %s",
                  ", ".join([f"{j}@{job_next[j]['hhmm']}" for j in job_next]))
 
+    refilling = False
+
     try:
         while True:
             now_utc = datetime.now(pytz.UTC)
@@ -170,14 +206,19 @@ def main_loop(run_once: bool = False, dry_run: bool = False, jobs: list | None =
                     logging.info("Running job %s (scheduled: %s, local: %s)",
                                  job_id, meta["hhmm"], local_time)
 
-                    # choose content
+                    # choose content: pehle content bank (instant), phir content folders
+                    bank_item = None if dry_run else claim_bank_item(bank)
                     image_files = list(images_dir.glob("*")) if images_dir.exists() else []
                     reel_files = list(reels_dir.glob("*")) if reels_dir.exists() else []
 
                     chosen_type = None
                     chosen_path = None
 
-                    if reel_files and image_files:
+                    if bank_item is not None:
+                        chosen = None
+                        chosen_type = bank_item.kind
+                        chosen_path = bank_item.media_path
+                    elif reel_files and image_files:
                         chosen = random.choice(["reel", "image"])
                     elif reel_files:
                         chosen = "reel"
@@ -203,22 +244,32 @@ def main_loop(run_once: bool = False, dry_run: bool = False, jobs: list | None =
                             logging.info("[DRY RUN] Would post %s: %s", chosen_type, chosen_path)
                         else:
                             # real posting
+                            result = None
                             try:
                                 if chosen_type == "reel":
                                     logging.info("Posting reel: %s", chosen_path)
-                                    autopost_mod.post_instagram(chosen_path)
+                                    result = autopost_mod.post_instagram(chosen_path)
 
                                 elif chosen_type == "image":
-                                    try:
-                                        caption = autopost_mod.generate_tech_script()
-                                    except Exception:
-                                        caption = ""
+                                    if bank_item is not None:
+                                        caption = bank_item.caption
+                                    else:
+                                        try:
+                                            caption = autopost_mod.generate_tech_script()
+                                        except Exception:
+                                            caption = ""
                                     logging.info("Posting image: %s", chosen_path)
-                                    autopost_mod.post_instagram_image(caption, chosen_path)
+                                    result = autopost_mod.post_instagram_image(caption, chosen_path)
 
                             except Exception as e:
                                 logging.exception("Upload failed: %s", e)
 
+                            if bank_item is not None:
+                                if result and result.get("ok"):
+                                    bank.mark_used(bank_item)
+                                else:
+                                    bank.release(bank_item)
+
                     # schedule for next day
                     next_local = nxt.astimezone(tz) + timedelta(days=1)
                     next_local = tz.localize(
@@ -235,6 +286,17 @@ def main_loop(run_once: bool = False, dry_run: bool = False, jobs: list | None =
                         logging.info("Run-once enabled. Exiting.")
                         return
 
+            # Idle time (agla slot door hai) mein bank refill, ek item per tick
+            next_slot = min(meta["next_run_utc"] for meta in job_next.values())
+            if bank is not None and not dry_run and next_slot - datetime.now(pytz.UTC) > BANK_REFILL_GUARD:
+                try:
+                    refilling = refilling or bank.below_watermark()
+                    if refilling:
+                        refilling = bank.fill(max_items=1) > 0
+                except Exception as exc:
+                    logging.warning("Content bank refill failed: %s", exc)
+                    refilling = False
+
             time.sleep(20)
 
     except KeyboardInterrupt:
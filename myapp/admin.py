@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import PostRun
+from .models import ContentItem, PostRun, RotationItem
 
 # Register your models here.
 admin.site.register(PostRun)
+admin.site.register(ContentItem)
+admin.site.register(RotationItem)
@@ -1,24 +1,44 @@
+import json
 import os
 import random
-import textwrap
-import requests
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
 import numpy as np
-from moviepy.editor import *
-from gtts import gTTS
-from instagrapi import Client
+from moviepy.editor import AudioFileClip, ImageClip
+from instagrapi.exceptions import LoginRequired
 from pydantic import ValidationError
-from PIL import Image, ImageDraw, ImageFont, ImageOps, ImageFilter
+from PIL import Image
 import wave
-
-# ====== FIX FOR IMAGEMAGICK ERROR ======
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 import moviepy.config as mpconfig
-mpconfig.change_settings({
-    "IMAGEMAGICK_BINARY": r"C:\Program Files\ImageMagick-7.1.2-Q16-HDRI\magick.exe"
-})
-# =======================================
 
 # ====== CONFIG ======
-from myapp.config import GROQ_API_KEY, INSTAGRAM_USERNAME, INSTAGRAM_PASSWORD, UNSPLASH_ACCESS_KEY
+from myapp import provider_health
+from myapp.config import (
+    ARTIFACT_MAX_AGE_HOURS,
+    CAPTION_BATCH_SIZE,
+    CAPTION_STREAM_MIN_WORDS,
+    GROQ_API_KEY,
+    INSTAGRAM_USERNAME,
+    INSTAGRAM_PASSWORD,
+    PROCEDURAL_BG_SEED,
+    REEL_RENDERER,
+    RUNS_DIR,
+)
+from myapp.backgrounds import load_background
+from myapp.image_pool import PER_KEYWORD as IMAGE_POOL_PER_KEYWORD, image_pool, unsplash_available
+from myapp.image_utils import QUOTE_SIZE, compose_quote_frame, compose_reel_frame
+from myapp.instagram_session import InstagramBlocked, get_session
+from myapp.llm_router import GroqAuthError, GroqUnavailable, groq_router
+from myapp.procedural_bg import generate_background
+from myapp.render_cache import file_digest, make_key, render_cache
 
 # ====== TECH TOPICS LIST ======
 TECH_TOPICS = [
@@ -38,14 +58,154 @@ TECH_TOPICS = [
     "GitHub", "CI/CD", "Jenkins", "Agile Development", "Scrum"
 ]
 
+# Unsplash image keywords (topics ki tarah rotation se aate hain)
+TECH_IMAGE_KEYWORDS = [
+    "technology", "coding", "programming", "computer", "laptop",
+    "artificial intelligence", "machine learning", "data science",
+    "cybersecurity", "cloud computing", "blockchain", "web development",
+    "software development", "code", "developer", "tech startup",
+    "digital technology", "innovation", "tech background", "futuristic technology",
+    "ai technology", "programming code", "coding laptop", "tech workspace",
+    "modern technology", "digital transformation", "tech industry"
+]
+
+
+# Har topic ka image keyword (TECH_IMAGE_KEYWORDS mein se): post ka background uske topic se mile
+TOPIC_IMAGE_KEYWORDS = {
+    "Artificial Intelligence": "artificial intelligence", "Machine Learning": "machine learning",
+    "Python Programming": "programming code", "JavaScript": "web development",
+    "Web Development": "web development", "Mobile App Development": "software development",
+    "Cloud Computing": "cloud computing", "Cybersecurity": "cybersecurity",
+    "Data Science": "data science", "Blockchain": "blockchain",
+    "Internet of Things": "digital technology", "Quantum Computing": "futuristic technology",
+    "DevOps": "software development", "React.js": "web development", "Node.js": "programming code",
+    "Django": "programming code", "Flask": "programming code", "API Development": "code",
+    "Database Management": "data science", "Git Version Control": "developer",
+    "Docker": "cloud computing", "Kubernetes": "cloud computing",
+    "Full Stack Development": "web development", "Frontend Development": "web development",
+    "Backend Development": "programming", "UI/UX Design": "tech workspace",
+    "Agile Methodology": "tech startup", "Software Testing": "software development",
+    "System Design": "programming", "Computer Networking": "computer", "Linux": "coding laptop",
+    "AWS": "cloud computing", "Google Cloud": "cloud computing", "Azure": "cloud computing",
+    "Microservices": "cloud computing", "REST API": "code", "GraphQL": "code",
+    "MongoDB": "data science", "PostgreSQL": "data science", "TypeScript": "programming code",
+    "Vue.js": "web development", "Angular": "web development", "Flutter": "software development",
+    "React Native": "software development", "Swift": "coding", "Kotlin": "coding",
+    "Go Programming": "coding", "Rust": "coding", "C++": "coding", "Java": "coding",
+    "Computer Vision": "ai technology", "Natural Language Processing": "ai technology",
+    "Deep Learning": "machine learning", "Neural Networks": "machine learning",
+    "TensorFlow": "machine learning", "PyTorch": "machine learning", "ChatGPT": "ai technology",
+    "OpenAI": "ai technology", "GitHub": "developer", "CI/CD": "software development",
+    "Jenkins": "software development", "Agile Development": "tech startup", "Scrum": "tech workspace",
+}
+
+
+def image_keyword_for(topic: str | None) -> str | None:
+    """Topic ka background keyword (map mein na ho to generic "technology")"""
+    if not topic:
+        return None
+    return TOPIC_IMAGE_KEYWORDS.get(topic, "technology")
+
+
+def _django_ready() -> bool:
+    """Django configured hai? (standalone script mein DB features skip hote hain)"""
+    from django.apps import apps
+
+    return apps.ready
+
+
+def _next_topics(count: int = 1) -> list[str]:
+    """Least-recently-used topics (weights ke saath); bina Django ke random"""
+    if not _django_ready():
+        return random.sample(TECH_TOPICS, min(count, len(TECH_TOPICS)))
+    from myapp.rotation import next_topics
+
+    return next_topics(TECH_TOPICS, count)
+
+
+def _next_image_keyword() -> str:
+    if not _django_ready():
+        return random.choice(TECH_IMAGE_KEYWORDS)
+    from myapp.rotation import next_keyword
+
+    return next_keyword(TECH_IMAGE_KEYWORDS)
+
+
+# ====== Run workspace (concurrent pipelines ke files alag rahe) ======
+@contextmanager
+def run_workspace(keep: bool = False, existing: str | None = None):
+    """Har run ke liye unique working directory; run khatam hone par delete (keep=True ho to nahi).
+
+    ``existing`` diya ho to wahi directory yield hoti hai aur delete nahi hoti.
+    """
+    if existing:
+        yield existing
+        return
+    os.makedirs(RUNS_DIR, exist_ok=True)
+    workdir = tempfile.mkdtemp(prefix="run_", dir=RUNS_DIR)
+    try:
+        yield workdir
+    finally:
+        if not keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def artifact_path(workdir: str | None, folder: str, filename: str) -> str:
+    """Workdir ho to usme file, warna shared folder mein unique naam (overwrite se bachne ke liye).
+
+    Shared folder wale artifacts kisi workspace ke saath delete nahi hote, isliye har naye
+    path par usi naam ke ``ARTIFACT_MAX_AGE_HOURS`` se purane artifacts hata diye jate hain.
+    """
+    if workdir:
+        os.makedirs(workdir, exist_ok=True)
+        return os.path.join(workdir, filename)
+    os.makedirs(folder, exist_ok=True)
+    stem, ext = os.path.splitext(filename)
+    prune_artifacts(folder, stem, ext)
+    return os.path.join(folder, f"{stem}_{uuid.uuid4().hex[:12]}{ext}")
+
+
+def prune_artifacts(folder: str, stem: str, ext: str, max_age: float = ARTIFACT_MAX_AGE_HOURS * 3600) -> int:
+    """``folder`` mein ``<stem>_<12 hex><ext>`` (artifact_path wale) purane files delete karo"""
+    pattern = re.compile(rf"^{re.escape(stem)}_[0-9a-f]{{12}}{re.escape(ext)}$")
+    cutoff = time.time() - max_age
+    removed = 0
+    try:
+        names = os.listdir(folder)
+    except OSError:
+        return 0
+    for name in names:
+        if not pattern.match(name):
+            continue
+        path = os.path.join(folder, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
 # ====== 1. Tech Script Generate (Google/YouTube se inspired) ======
-def generate_tech_script():
+FALLBACK_CAPTION_SUFFIX = "seekhna shuru karo - tech career ka first step hai yeh!"
+
+
+def fallback_caption(topic: str) -> str:
+    """Groq na mile to yeh fixed caption (dedupe index mein kabhi nahi jata)"""
+    return f"💡 {topic} {FALLBACK_CAPTION_SUFFIX}"
+
+
+def is_fallback_caption(text: str) -> bool:
+    return text.startswith("💡 ") and text.endswith(FALLBACK_CAPTION_SUFFIX)
+
+
+def generate_tech_script(topic: str | None = None):
     """Generate unique, readable & engaging tech content using Groq API with tech topics"""
     if not GROQ_API_KEY or len(GROQ_API_KEY) < 10:
         print("⚠️ GROQ_API_KEY nahi daala → default tech tip use kar raha hoon")
-        return "💡 Linux seekhna shuru karo - tech career ka first step hai yeh!"
+        return fallback_caption(topic or "Linux")
 
-    random_topic = random.choice(TECH_TOPICS)
+    random_topic = topic or _next_topics()[0]
     
     tech_prompts = [
         f"'{random_topic}' par ek detailed tech tip Hindi mein 40-50 words mein explain karo - YouTube tech videos style, with examples",
@@ -57,92 +217,265 @@ def generate_tech_script():
 
     max_retries = 3
     # prepare a safe fallback message in case the API is unavailable or unauthorized
-    fallback = f"💡 {random_topic} seekhna shuru karo - tech career ka first step hai yeh!"
-
-    # List of models to try in case one fails
-    available_models = ["llama-3.3-70b-versatile", "llama3-70b-8192", "mixtral-8x7b-32768"]
+    fallback = fallback_caption(random_topic)
 
     for attempt in range(max_retries):
+        prompt = random.choice(tech_prompts)
+        print(f"📱 Tech Topic: {random_topic}")
+        print(f"💡 Prompt: {prompt}")
+        print(f"🔄 Attempt {attempt + 1}/{max_retries}...")
+        # Stream ke saath hi 💡/🔹 lines banti hain; 40-50 words ke poore sentences aate hi stop
+        formatter = CaptionFormatter(random_topic, min_words=CAPTION_STREAM_MIN_WORDS)
         try:
-            prompt = random.choice(tech_prompts)
-            current_model = available_models[attempt % len(available_models)]
-            print(f"📱 Tech Topic: {random_topic}")
-            print(f"💡 Prompt: {prompt}")
-            print(f"🔄 Attempt {attempt + 1}/{max_retries} using model: {current_model}...")
-
-            response = requests.post(
-                "https://api.groq.com/openai/v1/chat/completions",
-                headers={"Authorization": f"Bearer {GROQ_API_KEY}"},
-                json={
-                    "model": current_model,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 1.3,
-                    "max_tokens": 200,
-                    "top_p": 0.9,
-                    "frequency_penalty": 0.6,
-                    "presence_penalty": 0.4
-                },
-                timeout=30
-            )
-
-            if response.status_code == 401:
-                # Unauthorized: API key invalid/expired — don't retry
-                print("⚠️ Groq API returned 401 Unauthorized. Check GROQ_API_KEY in your .env or environment variables.")
-                print(f"⚠️ Response snippet: {response.text}")
-                return fallback
-
-            if response.status_code != 200:
-                print(f"⚠️ Groq API returned status {response.status_code}: {response.text[:200]}")
-                if attempt < max_retries - 1:
-                    continue
-                else:
-                    raise Exception(f"API returned status {response.status_code}")
-
-            response_data = response.json()
-            choices = response_data.get("choices", [])
-            if not choices:
-                if attempt < max_retries - 1:
-                    continue
-                else:
-                    raise Exception("No choices in API response")
-
-            content = choices[0].get("message", {}).get("content", "").strip()
-            if not content or len(content) < 30:
-                if attempt < max_retries - 1:
-                    continue
-                else:
-                    fallback = f"💡 {random_topic} seekhna shuru karo - tech career ka first step hai yeh!"
-                    return fallback
-
-            # ✅ Format content for reels
-            lines = content.split(". ")
-            formatted_lines = []
-            for i, line in enumerate(lines):
-                line = line.strip()
-                if not line:
-                    continue
-                # Add emoji for first line or key points
-                if i == 0:
-                    line = f"💡 {line}"
-                else:
-                    line = f"🔹 {line}"
-                formatted_lines.append(line)
-            formatted_content = "\n".join(formatted_lines)
-
-            # Add topic if not present
-            if random_topic.lower() not in formatted_content.lower():
-                formatted_content = f"{random_topic}: {formatted_content}"
-
-            print(f"✅ Groq se content generate ho gaya (formatted) → {formatted_content[:60]}...")
-            return formatted_content
-
+            # Router fastest healthy model chunta hai; fail/decommissioned models skip hote hain
+            current_model, content = groq_router.complete({
+                "messages": [{"role": "user", "content": prompt}],
+                "temperature": 1.3,
+                "max_tokens": 200,
+                "top_p": 0.9,
+                "frequency_penalty": 0.6,
+                "presence_penalty": 0.4
+            }, stop_when=formatter.update)
+        except GroqAuthError as e:
+            # Unauthorized: API key invalid/expired — don't retry
+            print("⚠️ Groq API returned 401 Unauthorized. Check GROQ_API_KEY in your .env or environment variables.")
+            print(f"⚠️ Response snippet: {e}")
+            return fallback
+        except GroqUnavailable as e:
+            # Koi healthy model nahi - retry se bhi kuch nahi milega
+            print(f"⚠️ Groq unavailable: {e}")
+            break
         except Exception as e:
+            # Koi aur error (stream parse, formatter callback) → caller crash na ho, retry/fallback
             print(f"⚠️ Attempt {attempt + 1} failed: {e}")
-            if attempt == max_retries - 1:
-                print("❌ Groq API failed after all retries. Using fallback text.")
-                print("👉 Check your GROQ_API_KEY in config.py or .env")
-                fallback = f"💡 {random_topic} seekhna shuru karo - tech career ka first step hai yeh!"
-                return fallback
+            continue
+
+        if not content or len(content) < 30:
+            continue
+
+        # ✅ Format content for reels (stream mein bani lines + bacha hua aakhri sentence)
+        formatted_content = formatter.finish()
+
+        print(f"✅ Groq ({current_model}) se content generate ho gaya (formatted) → {formatted_content[:60]}...")
+        return formatted_content
+
+    print("❌ Groq API failed after all retries. Using fallback text.")
+    print("👉 Check your GROQ_API_KEY in config.py or .env")
+    return fallback
+
+class CaptionFormatter:
+    """LLM text ko sentence-by-sentence reel caption lines mein badlo (streaming ke saath).
+
+    ``update(text)`` ko stream ka ab tak ka text milta hai; har poora sentence (``.``/``?``/``!``/``।``
+    ke baad space, ya newline) aate hi line ban jati hai - pehli 💡, baaki 🔹. ``min_words`` poore
+    ho gaye to True (stream rok do). ``?``/``!`` line mein rehte hain, ``.``/``।`` hat jate hain.
+    """
+
+    SENTENCE_END = re.compile(r"([.!?।]+)\s+|\s*\n\s*")
+
+    def __init__(self, topic: str, min_words: int = 0):
+        self.topic = topic
+        self.min_words = min_words
+        self._reset()
+
+    def _reset(self) -> None:
+        self.lines = []
+        self.words = 0
+        self.done = False
+        self._seen = ""
+        self._buffer = ""
+
+    def update(self, text: str) -> bool:
+        if not text.startswith(self._seen):
+            # Router ne dusre model par failover kiya → naya text
+            self._reset()
+        self._buffer += text[len(self._seen):]
+        self._seen = text
+        while not self.done:
+            match = self.SENTENCE_END.search(self._buffer)
+            if not match:
+                break
+            ending = match.group(1) or ""
+            self._add(self._buffer[:match.start()] + ending.strip(".।"))
+            self._buffer = self._buffer[match.end():]
+            self.done = bool(self.min_words) and self.words >= self.min_words
+        return self.done
+
+    def _add(self, sentence: str) -> None:
+        sentence = sentence.strip()
+        if not sentence:
+            return
+        # Add emoji for first line or key points
+        self.lines.append(f"💡 {sentence}" if not self.lines else f"🔹 {sentence}")
+        self.words += len(sentence.split())
+
+    def finish(self) -> str:
+        # Stream poora aaya to bacha hua text aakhri sentence hai; early stop par adhura sentence chhod do
+        if not self.done:
+            self._add(self._buffer)
+        self._buffer = ""
+        formatted_content = "\n".join(self.lines)
+
+        # Add topic if not present
+        if self.topic.lower() not in formatted_content.lower():
+            formatted_content = f"{self.topic}: {formatted_content}"
+        return formatted_content
+
+
+def _format_caption(content: str, topic: str) -> str:
+    """LLM text ko reel caption format mein: pehli line 💡, baaki points 🔹, topic prefix"""
+    formatter = CaptionFormatter(topic)
+    formatter.update(content)
+    return formatter.finish()
+
+
+def _parse_tips_json(raw: str) -> list:
+    """``{"tips": [...]}`` parse karo (model kabhi ```json fences laga deta hai)"""
+    start, end = raw.find("{"), raw.rfind("}")
+    if start == -1 or end <= start:
+        raise ValueError("JSON object nahi mila")
+    tips = json.loads(raw[start:end + 1]).get("tips")
+    if not isinstance(tips, list):
+        raise ValueError("'tips' list missing")
+    return tips
+
+
+def generate_tech_scripts_batch(count: int, topics: list[str] | None = None) -> list[str]:
+    """Ek hi Groq call mein ``count`` alag topics par tips (JSON mode) → formatted captions.
+
+    Har tip validate hoti hai (string, min length, duplicate nahi); invalid tips drop ho
+    jati hain, isliye result ``count`` se chhota ho sakta hai. Groq fail ho to ``[]``.
+    """
+    return [caption for _, caption in _batch_captions(count, topics)]
+
+
+def _batch_captions(count: int, topics: list[str] | None = None) -> list[tuple[str, str]]:
+    """``generate_tech_scripts_batch`` jaisa, par ``(topic, caption)`` pairs"""
+    if count <= 0 or not GROQ_API_KEY or len(GROQ_API_KEY) < 10:
+        return []
+
+    topics = list(topics or [])[:count]
+    if len(topics) < count:
+        topics += _next_topics(count - len(topics))
+
+    captions = []
+    seen = set()
+    for start in range(0, count, CAPTION_BATCH_SIZE):
+        for topic, tip in _request_tip_batch(topics[start:start + CAPTION_BATCH_SIZE]):
+            key = " ".join(tip.lower().split())
+            if key in seen:
+                continue
+            seen.add(key)
+            captions.append((topic, _format_caption(tip, topic)))
+    print(f"✅ Groq batch se {len(captions)}/{count} captions ready")
+    return captions
+
+
+def _request_tip_batch(topics: list[str]) -> list[tuple[str, str]]:
+    numbered = "\n".join(f"{i}. {topic}" for i, topic in enumerate(topics, 1))
+    prompt = (
+        "Neeche diye har topic par ek alag tech tip Hindi mein 40-50 words mein likho - "
+        "YouTube tech videos style, with examples.\n"
+        f"Topics:\n{numbered}\n\n"
+        'Sirf JSON return karo: {"tips": [{"topic": "<topic>", "tip": "<tip>"}]} '
+        "- har topic ke liye exactly ek tip, same order mein."
+    )
+    for attempt in range(3):
+        print(f"🔄 Batch of {len(topics)} tips, attempt {attempt + 1}/3...")
+        try:
+            _, raw = groq_router.complete({
+                "messages": [{"role": "user", "content": prompt}],
+                "temperature": 1.0,
+                "max_tokens": 160 * len(topics) + 100,
+                "top_p": 0.9,
+                "response_format": {"type": "json_object"},
+            }, timeout=60, latency_sensitive=False)
+            tips = _parse_tips_json(raw)
+        except GroqAuthError:
+            print("⚠️ Groq API returned 401 Unauthorized. Check GROQ_API_KEY in your .env or environment variables.")
+            return []
+        except GroqUnavailable as e:
+            print(f"⚠️ Groq unavailable: {e}")
+            break
+        except Exception as e:
+            # Invalid JSON ya koi unexpected error → agli attempt (aakhir mein [] → single-call fallback)
+            print(f"⚠️ Batch attempt {attempt + 1} failed: {e}")
+            continue
+
+        wanted = {topic.lower(): topic for topic in topics}
+        results = []
+        for i, item in enumerate(tips):
+            if not isinstance(item, dict) or not isinstance(item.get("tip"), str):
+                continue
+            tip = item["tip"].strip()
+            if len(tip) < 30:
+                continue
+            topic = wanted.get(str(item.get("topic", "")).strip().lower())
+            if topic is None:
+                topic = topics[i] if i < len(topics) else random.choice(topics)
+            results.append((topic, tip))
+        return results
+
+    print("❌ Groq batch failed after all retries.")
+    return []
+
+
+# Batch mein aayi extra captions baad ke posts ke liye (process-local), ``(topic, caption)``
+_caption_pool = deque()
+_caption_pool_lock = threading.Lock()
+
+
+def prefetch_captions(count: int) -> int:
+    """``count`` captions ek batch call se pool mein daalo; kitni mili woh return"""
+    captions = _batch_captions(count)
+    with _caption_pool_lock:
+        _caption_pool.extend(captions)
+    return len(captions)
+
+
+def pooled_captions() -> int:
+    with _caption_pool_lock:
+        return len(_caption_pool)
+
+
+def _pooled_topics() -> list[str]:
+    with _caption_pool_lock:
+        return [topic for topic, _ in _caption_pool]
+
+
+def next_post_topic() -> str:
+    """Agle post ka topic: pool mein padi caption ka topic, warna rotation se.
+
+    Caption aur background (``image_keyword_for``) dono isi topic se bante hain.
+    """
+    with _caption_pool_lock:
+        if _caption_pool:
+            return _caption_pool[0][0]
+    return _next_topics()[0]
+
+
+def _next_caption(topic: str | None = None) -> str:
+    with _caption_pool_lock:
+        for pooled in _caption_pool:
+            if topic is None or pooled[0] == topic:
+                _caption_pool.remove(pooled)
+                return pooled[1]
+    return generate_tech_script(topic)
+
+
+def take_caption(topic: str | None = None) -> str:
+    """Pool mein pre-generated caption ho to woh, warna single Groq call (``topic`` par, diya ho to).
+
+    Django configured ho to pehle post ho chuke captions se near-duplicate check hota hai aur
+    duplicate render se pehle hi regenerate ho jata hai. Index mein caption post successful
+    hone par hi jata hai (``caption_index.register_posted``).
+    """
+    if not _django_ready():
+        return _next_caption(topic)
+    from myapp.caption_index import unique_caption
+
+    return unique_caption(lambda: _next_caption(topic))
+
 
 # ====== Backward compatibility ======
 def generate_motivation_script():
@@ -150,57 +483,55 @@ def generate_motivation_script():
     return generate_tech_script()
 
 # ====== 2. Random Tech Image Download (Google/Unsplash se) ======
-def download_random_tech_image():
-    """Download random tech-related image from Unsplash API"""
+def _next_image_keywords(count: int) -> list[str]:
+    if not _django_ready():
+        return random.sample(TECH_IMAGE_KEYWORDS, min(count, len(TECH_IMAGE_KEYWORDS)))
+    from myapp.rotation import next_keywords
+
+    return next_keywords(TECH_IMAGE_KEYWORDS, count)
+
+
+def refill_image_pool(background: bool = True) -> int:
+    """Image pool ko target tak bharo (least-recently-used keywords, har keyword ek Unsplash call)"""
+    deficit = image_pool.deficit()
+    if deficit <= 0:
+        return 0
+    count = -(-deficit // IMAGE_POOL_PER_KEYWORD)
+    # Pool wali captions ke topics ke keywords pehle → unke posts ko matching background mile
+    keywords = list(dict.fromkeys(image_keyword_for(topic) for topic in _pooled_topics()))[:count]
+    if len(keywords) < count:
+        keywords += _next_image_keywords(count - len(keywords))
+    if background:
+        image_pool.refill_async(keywords)
+        return 0
+    return image_pool.refill(keywords)
+
+
+def download_random_tech_image(workdir: str | None = None, keyword: str | None = None):
+    """Tech background local image pool se (``keyword`` ho to usi keyword ki image).
+
+    Pool mein na ho to Unsplash se turant thodi images; woh bhi na mile to pool ki koi bhi image.
+    """
     # Images folder banaye agar nahi hai
     images_folder = "images"
     os.makedirs(images_folder, exist_ok=True)
-    
-    # Tech-related image keywords - har bar random select hoga
-    tech_keywords = [
-        "technology", "coding", "programming", "computer", "laptop", 
-        "artificial intelligence", "machine learning", "data science",
-        "cybersecurity", "cloud computing", "blockchain", "web development",
-        "software development", "code", "developer", "tech startup",
-        "digital technology", "innovation", "tech background", "futuristic technology",
-        "ai technology", "programming code", "coding laptop", "tech workspace",
-        "modern technology", "digital transformation", "tech industry"
-    ]
-    
-    # Random keyword select karo
-    keyword = random.choice(tech_keywords)
-    print(f"🖼️ Random tech image fetch kar raha hoon: '{keyword}'")
-    
-    # Agar Unsplash API key hai to use karo, nahi to fallback
-    if UNSPLASH_ACCESS_KEY and len(UNSPLASH_ACCESS_KEY) > 10:
-        try:
-            # Unsplash API se random image fetch karo
-            unsplash_url = f"https://api.unsplash.com/photos/random"
-            params = {
-                "query": keyword,
-                "orientation": "portrait",
-                "client_id": UNSPLASH_ACCESS_KEY
-            }
-            
-            response = requests.get(unsplash_url, params=params, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                image_url = data.get("urls", {}).get("regular") or data.get("urls", {}).get("full")
-                
-                if image_url:
-                    # Image download karo
-                    img_response = requests.get(image_url, timeout=15)
-                    if img_response.status_code == 200:
-                        # Images folder mein save karo
-                        image_path = os.path.join(images_folder, "bg_tech.jpg")
-                        with open(image_path, "wb") as f:
-                            f.write(img_response.content)
-                        print(f"✅ Tech image download ho gayi: {keyword} → {image_path}")
-                        return image_path
-        except Exception as e:
-            print(f"⚠️ Unsplash API error: {e}")
-            print("⚠️ Fallback: Default image use kar raha hoon")
-    
+
+    image_path = image_pool.take(keyword)
+    if image_path is None and unsplash_available():
+        # Pool mein (is keyword ki) image nahi: kuch images abhi (parallel download), baaki background mein
+        keyword = keyword or _next_image_keyword()
+        print(f"🖼️ Image pool mein nahi → Unsplash se fetch kar raha hoon: '{keyword}'")
+        image_pool.refill([keyword], target=3, per_keyword=True)
+        image_path = image_pool.take(keyword)
+    if image_path is None and keyword:
+        image_path = image_pool.take()
+    if image_pool.low():
+        refill_image_pool(background=True)
+    if image_path:
+        print(f"✅ Tech image (pool) → {image_path}")
+        return image_path
+    print("⚠️ Fallback: Default image use kar raha hoon")
+
     # Fallback: Local bg.jpg use karo agar available ho (images folder mein ya root mein)
     fallback_paths = [
         os.path.join(images_folder, "bg.jpg"),
@@ -214,187 +545,224 @@ def download_random_tech_image():
     # Agar kuch bhi nahi mila
     print("❌ Image nahi mili! Auto-generated background create kar raha hoon")
     try:
-        img = Image.new("RGB", (1080, 1440), (20, 20, 20))
-        draw = ImageDraw.Draw(img)
-        for y in range(0, 1440, 40):
-            shade = 40 + (y // 8) % 80
-            draw.rectangle([(0, y), (1080, y + 40)], fill=(shade, shade, shade))
-        for i in range(20):
-            x0 = random.randint(0, 980)
-            y0 = random.randint(0, 1340)
-            draw.rectangle([(x0, y0), (x0 + 100, y0 + 100)], outline=(80, 80, 80), width=2)
-        images_folder = "images"
-        os.makedirs(images_folder, exist_ok=True)
-        gen_path = os.path.join(images_folder, "bg_generated.jpg")
-        img.save(gen_path, "JPEG", quality=88)
-        print(f"🖼️ Auto-generated background ready → {gen_path}")
+        # Reel size (1080x1920); quote isi se center crop ho jata hai
+        pixels, seed = generate_background(1080, 1920, seed=PROCEDURAL_BG_SEED)
+        gen_path = artifact_path(workdir, images_folder, "bg_generated.jpg")
+        Image.fromarray(pixels).save(gen_path, "JPEG", quality=88)
+        print(f"🖼️ Auto-generated background ready (seed={seed}) → {gen_path}")
         return gen_path
     except Exception as e:
         print(f"⚠️ Auto background generation failed: {e}")
         return None
 
 
-def create_quote_image(text: str) -> str | None:
-    """Random tech background + overlay text generate karo"""
+def create_quote_image(text: str, workdir: str | None = None,
+                       bg_image_path: str | None = None) -> str | None:
+    """Random tech background (ya diya hua ``bg_image_path``) + overlay text generate karo"""
     print("🖼️ Creating quote image...")
-    base_image_path = download_random_tech_image()
+    output_path = artifact_path(workdir, "images", "quote_post.jpg")
+    # Background download workdir (ya temporary scratch dir) mein hota hai
+    with run_workspace(existing=workdir) as scratch:
+        return _render_quote_image(text, scratch, output_path, bg_image_path)
+
+
+def _render_quote_image(text: str, scratch: str, output_path: str,
+                        base_image_path: str | None = None) -> str | None:
+    base_image_path = base_image_path or download_random_tech_image(scratch)
     if not base_image_path or not os.path.exists(base_image_path):
         print("❌ Quote image ke liye background image nahi mili")
         return None
 
-    images_folder = "images"
-    os.makedirs(images_folder, exist_ok=True)
-    output_path = os.path.join(images_folder, "quote_post.jpg")
+    # Same text + same background → pehle se bani image reuse karo
+    cache_key = make_key("quote", text=text, bg=file_digest(base_image_path),
+                         size=QUOTE_SIZE, quality=92, layout="fit", template="classic")
+    if render_cache.fetch(cache_key, ".jpg", output_path):
+        print(f"♻️ Quote image render cache se mili → {output_path}")
+        return output_path
 
     try:
         print(f"📂 Loading image: {base_image_path}")
-        base_img = Image.open(base_image_path).convert("RGB")
-        print(f"🖼️ Original image size: {base_img.size}")
-        
-        target_size = (1080, 1350)  # Instagram portrait size
-        print(f"🔄 Resizing image to: {target_size}")
-        base_img = ImageOps.fit(base_img, target_size, method=Image.Resampling.LANCZOS)
-        print("✅ Image resized successfully")
-
-        # Prepare overlay for readability
-        overlay = Image.new("RGBA", target_size, (0, 0, 0, 0))
-        draw = ImageDraw.Draw(overlay, "RGBA")
-        box_margin = 70
-        draw.rectangle(
-            (
-                box_margin,
-                220,
-                target_size[0] - box_margin,
-                target_size[1] - 220,
-            ),
-            fill=(0, 0, 0, 150),
-            outline=(255, 255, 255, 60),
-            width=4,
-        )
-
-        # Load font
-        try:
-            font = ImageFont.truetype("arial.ttf", 64)
-            font_small = ImageFont.truetype("arial.ttf", 46)
-        except IOError:
-            font = ImageFont.load_default()
-            font_small = ImageFont.load_default()
-
-        # Prepare text
-        clean_text = text.replace("\n", " ").strip()
-        wrapped_text = textwrap.fill(clean_text, width=20)
-
-        text_x = box_margin + 30
-        text_y = 260
-        draw.text(
-            (text_x, text_y),
-            wrapped_text,
-            font=font,
-            fill=(255, 255, 255, 255),
-            spacing=12,
-        )
-
-        footer_text = " @iamsaniydv"
-        # Compute footer size robustly (use textbbox if available, fallback to textsize)
-        try:
-            bbox = draw.textbbox((0, 0), footer_text, font=font_small)
-            footer_width = bbox[2] - bbox[0]
-            footer_height = bbox[3] - bbox[1]
-        except Exception:
-            footer_width, footer_height = draw.textsize(footer_text, font=font_small)
-
-        # Place footer inside the bottom margin (use box_margin so it doesn't run off the image)
-        footer_x = target_size[0] - box_margin - footer_width - 20
-        footer_y = target_size[1] - box_margin - footer_height - 20
-
-        draw.text((footer_x, footer_y), footer_text, font=font_small, fill=(255, 255, 255, 200))
-
-        final_img = Image.alpha_composite(base_img.convert("RGBA"), overlay)
-        final_img.convert("RGB").save(output_path, "JPEG", quality=92)
+        # 1080x1350 crop/resize derivative cache se (har background ek hi baar resample)
+        base_img = load_background(base_image_path, "quote")
+        frame = compose_quote_frame(base_img, text)
+        Image.fromarray(frame).save(output_path, "JPEG", quality=92)
+        render_cache.put(cache_key, output_path, ".jpg")
         print(f"🖼 Quote image ready → {output_path}")
         return output_path
     except Exception as exc:
         print(f"⚠️ Quote image generate nahi ho payi: {exc}")
-        return base_image_path
+        # Overlay ke bina hi sahi - background ko output path par rakh do (scratch delete hoga)
+        shutil.copyfile(base_image_path, output_path)
+        return output_path
 
 # ====== 2. Video Banaye (100% working - random tech image ke saath) ======
-def create_reel_video(text):
+REEL_DURATION = 16
+REEL_FPS = 30
+MUSIC_VOLUME = 0.6
+
+
+def create_reel_video(text, renderer: str | None = None, workdir: str | None = None,
+                      bg_image_path: str | None = None, audio_path: str | None = None):
+    """Reel render karo - static frame Pillow se ek baar compose karke ffmpeg se encode.
+
+    ``renderer="moviepy"`` purana per-frame MoviePy path use karta hai (animated
+    effects ke liye); ffmpeg fail hone par bhi wahi fallback hai. Saare artifacts
+    ``workdir`` (ya temporary scratch dir) mein bante hain aur output ka naam unique
+    hota hai, taaki parallel runs ek dusre ki files overwrite na karein.
+    ``bg_image_path`` / ``audio_path`` pehle se ready hon (``gather_post_inputs``) to
+    download/music synthesis skip hota hai.
+    """
     print("🎥 Video ban raha hai...")
+    renderer = (renderer or REEL_RENDERER).lower()
+    output = artifact_path(workdir, "videos", "reel.mp4")
+    with run_workspace(existing=workdir) as scratch:
+        return _render_reel(text, renderer, scratch, output, bg_image_path, audio_path)
 
-    # Videos aur audio folders banaye agar nahi hai
-    videos_folder = "videos"
-    audio_folder = "audio"
-    os.makedirs(videos_folder, exist_ok=True)
-    os.makedirs(audio_folder, exist_ok=True)
 
+def _render_reel(text: str, renderer: str, scratch: str, output: str,
+                 bg_image_path: str | None = None, audio_path: str | None = None) -> str | None:
     # Random tech image download karo
-    bg_image_path = download_random_tech_image()
+    bg_image_path = bg_image_path or download_random_tech_image(scratch)
     if not bg_image_path or not os.path.exists(bg_image_path):
         print("❌ Background image nahi mili!")
         return None
 
-    # Background image load + resize (new MoviePy style)
+    # Text se seed → retry par same track aur render cache hit
+    music_path = audio_path or pick_background_music(scratch, seed=text)
+
+    cache_key = make_key(
+        "reel", text=text, bg=file_digest(bg_image_path), audio=file_digest(music_path),
+        duration=REEL_DURATION, fps=REEL_FPS, volume=MUSIC_VOLUME, renderer=renderer, layout="fit",
+    )
+    if render_cache.fetch(cache_key, ".mp4", output):
+        print(f"♻️ Reel render cache se mili → {output}")
+        return output
+
+    # Background + margin + text box ek hi frame mein (Pillow, no ImageMagick)
     print(f"🎥 Loading video background image: {bg_image_path}")
-    bg_img = ImageClip(bg_image_path).set_duration(16)
-    print(f"🖼️ Original video image size: {bg_img.size}")
-    
-    # Calculate new height while maintaining aspect ratio
-    aspect_ratio = bg_img.size[1] / bg_img.size[0]
-    new_height = int(1080 * aspect_ratio)
-    print(f"🔄 Resizing video image to: (1080, {new_height}) with LANCZOS resampling")
-    # Convert to PIL Image to use Pillow's resize with LANCZOS resampling
-    pil_img = Image.fromarray(bg_img.img)
-    resized_img = pil_img.resize((1080, new_height), Image.Resampling.LANCZOS)
-    bg_img = ImageClip(np.array(resized_img)).set_duration(16)
-    bg_img = bg_img.margin(left=80, right=80, top=200, bottom=200, color=(0,0,0))  # optional black border
-    bg_img = bg_img.set_pos("center")
-
-    # Background music (no robotic TTS)
+    bg_img = load_background(bg_image_path, "reel")
+    frame = compose_reel_frame(bg_img, text)
+
+    if renderer == "ffmpeg":
+        # Frame static hai - ek hi baar save karo, ffmpeg use loop karke encode karega
+        frame_path = os.path.join(scratch, "reel_frame.png")
+        Image.fromarray(frame).save(frame_path)
+        if encode_still_video(frame_path, music_path, output):
+            render_cache.put(cache_key, output, ".mp4")
+            print(f"✅ Video successfully ban gaya (ffmpeg still) → {output}")
+            return output
+        print("⚠️ ffmpeg still render fail ho gaya → MoviePy fallback use kar raha hoon")
+
+    final = ImageClip(frame).set_duration(REEL_DURATION)
+    if music_path:
+        audio = AudioFileClip(music_path).subclip(0, REEL_DURATION).volumex(MUSIC_VOLUME)
+        final = final.set_audio(audio)
+    final.write_videofile(output, fps=REEL_FPS, codec="libx264", audio_codec="aac", threads=6, verbose=False, logger=None)
+    render_cache.put(cache_key, output, ".mp4")
+    print(f"✅ Video successfully ban gaya → {output} (size ~10-15MB)")
+    return output
+
+
+def encode_still_video(frame_path: str, audio_path: str | None, output: str,
+                       duration: int = REEL_DURATION, fps: int = REEL_FPS) -> bool:
+    """Ek still frame ko ffmpeg ke looped-image mode se MP4 mein encode karo (audio mux ke saath)"""
+    cmd = [
+        mpconfig.get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error",
+        # Frame sirf ek baar decode ho (framerate 1), fps filter usse duplicate karega
+        "-loop", "1", "-framerate", "1", "-i", frame_path,
+    ]
+    if audio_path:
+        cmd += ["-i", audio_path]
+    cmd += [
+        "-t", str(duration),
+        # Pad (yuv420p ke liye even width/height) aur RGB→yuv420p sirf ek still par, uske baad
+        # fps duplicate kare. 30 fps hi rakha hai - Instagram reels 23-60 fps maangta hai
+        "-vf", f"pad=ceil(iw/2)*2:ceil(ih/2)*2,format=yuv420p,fps={fps}",
+        "-c:v", "libx264", "-preset", "veryfast", "-tune", "stillimage",
+    ]
+    if audio_path:
+        cmd += ["-map", "0:v:0", "-map", "1:a:0", "-c:a", "aac", "-b:a", "128k",
+                "-af", f"volume={MUSIC_VOLUME}"]
+    cmd += ["-movflags", "+faststart", output]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"⚠️ ffmpeg run nahi ho paya: {e}")
+        return False
+    if result.returncode != 0:
+        print(f"⚠️ ffmpeg error ({result.returncode}): {result.stderr.strip()[:300]}")
+        return False
+    return os.path.exists(output)
+
+def pick_background_music(workdir: str, seed=None) -> str | None:
+    """audio/ folder ka track (agar rakha hai), warna synth track generate karo"""
+    audio_folder = "audio"
     music_candidates = [
         os.path.join(audio_folder, "music.mp3"),
         os.path.join(audio_folder, "bg_music.mp3"),
         os.path.join(audio_folder, "song.mp3"),
     ]
     music_path = next((p for p in music_candidates if os.path.exists(p)), None)
-    audio = None
     if music_path:
-        audio = AudioFileClip(music_path).subclip(0, 16).volumex(0.6)
-    else:
-        gen_path = generate_background_music(audio_folder, duration_sec=16)
-        if gen_path and os.path.exists(gen_path):
-            audio = AudioFileClip(gen_path).subclip(0, 16).volumex(0.6)
-
-    # Text overlay with background for better readability
-    wrapped = textwrap.fill(text, width=20)
-    
-    # Create text clip with a semi-transparent background
-    txt_clip = (TextClip(wrapped, fontsize=90, color='white', font='Arial-Bold',
-                        stroke_color='black', stroke_width=3, size=(1000, None),
-                        method='caption', align='center')
-               .set_position('center')
-               .set_duration(16))
-    
-    # Add a semi-transparent background behind text
-    text_bg = (ColorClip(size=(1100, txt_clip.size[1] + 40), color=(0, 0, 0, 180))
-              .set_position(('center', 'center'))
-              .set_duration(16))
-    
-    # Combine text with its background
-    text_with_bg = CompositeVideoClip([text_bg, txt_clip])
-    
-    # Position text in the center with some margin from bottom
-    text_final = text_with_bg.set_position(('center', bg_img.size[1] * 0.6))
+        return music_path
+    gen_path = generate_background_music(workdir, duration_sec=REEL_DURATION, seed=seed)
+    if gen_path and os.path.exists(gen_path):
+        return gen_path
+    return None
 
-    # Combine all elements
-    final = CompositeVideoClip([bg_img, text_final])
-    if audio:
-        final = final.set_audio(audio)
-    output = os.path.join(videos_folder, "reel.mp4")
-    final.write_videofile(output, fps=30, codec="libx264", audio_codec="aac", threads=6, verbose=False, logger=None)
-    print(f"✅ Video successfully ban gaya → {output} (size ~10-15MB)")
-    return output
 
-def generate_background_music(audio_folder: str, duration_sec: int = 16) -> str | None:
+def _timed(fn):
+    start = time.perf_counter()
+    try:
+        result = fn()
+    finally:
+        if _django_ready():
+            # Pool thread ka DB connection (rotation/caption index) yahin band karo
+            from django.db import connections
+
+            connections.close_all()
+    return result, round((time.perf_counter() - start) * 1000)
+
+
+def gather_post_inputs(workdir: str, with_music: bool = True, music_seed=None, on_ready=None,
+                       known: dict | None = None, topic: str | None = None) -> dict:
+    """Script, background image aur music ek saath (thread pool mein) taiyar karo.
+
+    Topic pehle chuna jata hai (``next_post_topic``), phir caption aur usi topic ke keyword
+    wala background parallel mein - teeno ek dusre ka wait nahi karte, isliye total time
+    sabse slow stage jitna hota hai, sum nahi. ``on_ready(name, value, duration_ms)`` har
+    input ready hote hi (caller ke thread mein) call hota hai. ``known`` mein pehle se chune
+    inputs (retry) dobara nahi bante. Returns ``{"topic", "script", "bg_image", "music"}``.
+    """
+    topic = topic or next_post_topic()
+    tasks = {
+        "script": lambda: take_caption(topic),
+        "bg_image": lambda: download_random_tech_image(workdir, keyword=image_keyword_for(topic)),
+    }
+    if with_music:
+        # Music text par depend na kare, tabhi parallel ban sakta hai → seed caller deta hai
+        tasks["music"] = lambda: pick_background_music(workdir, seed=music_seed)
+
+    inputs = {"topic": topic, "music": None}
+    for name, value in (known or {}).items():
+        if name in tasks and value:
+            del tasks[name]
+            inputs[name] = value
+            if on_ready:
+                on_ready(name, value, 0)
+    with ThreadPoolExecutor(max_workers=max(len(tasks), 1), thread_name_prefix="post-inputs") as pool:
+        futures = {pool.submit(_timed, fn): name for name, fn in tasks.items()}
+        for future in as_completed(futures):
+            name = futures[future]
+            inputs[name], duration_ms = future.result()
+            if on_ready:
+                on_ready(name, inputs[name], duration_ms)
+    return inputs
+
+
+def generate_background_music(audio_folder: str, duration_sec: int = 16, seed=None) -> str | None:
+    """Simple synth track; same ``seed`` → same notes (render cache ke liye deterministic)"""
+    rng = random.Random(seed)
     os.makedirs(audio_folder, exist_ok=True)
     path = os.path.join(audio_folder, "auto_music.wav")
     sr = 44100
@@ -406,7 +774,7 @@ def generate_background_music(audio_folder: str, duration_sec: int = 16) -> str
     for i in range(pattern_len):
         start = int(i * note_duration * sr)
         end = int((i + 1) * note_duration * sr)
-        freq = random.choice(base_freqs)
+        freq = rng.choice(base_freqs)
         env_len = end - start
         if env_len <= 0:
             continue
@@ -432,23 +800,26 @@ def generate_background_music(audio_folder: str, duration_sec: int = 16) -> str
         return None
 
 # ====== 3. Instagram Post (Reel) ======
-def post_instagram(video_path):
+def _instagram_config_error() -> dict | None:
+    """Credentials missing ya negative cache mein → network ke bina error response"""
+    credential = provider_health.credential_fingerprint(INSTAGRAM_USERNAME, INSTAGRAM_PASSWORD)
+    reason = provider_health.blocked(provider_health.INSTAGRAM, credential)
+    if reason:
+        print(f"⏭️ Instagram skip (cached failure): {reason}")
+        return {"ok": False, "error": f"Instagram skipped (cached failure): {reason}", "skipped": True}
     if not INSTAGRAM_USERNAME or not INSTAGRAM_PASSWORD:
+        provider_health.record_failure(provider_health.INSTAGRAM, "Missing Instagram credentials in config",
+                                       credential)
         return {"ok": False, "error": "Missing Instagram credentials in config"}
+    return None
 
-    try:
-        cl = Client()
-        cl.set_settings({})
-        cl.delay_range = [2, 6]
-
-        # Use saved session
-        if os.path.exists("session.json"):
-            cl.load_settings("session.json")
-            cl.login(INSTAGRAM_USERNAME, INSTAGRAM_PASSWORD)
-        else:
-            cl.login(INSTAGRAM_USERNAME, INSTAGRAM_PASSWORD)
-            cl.dump_settings("session.json")
 
+def post_instagram(video_path):
+    config_error = _instagram_config_error()
+    if config_error:
+        return config_error
+
+    try:
         # Random hashtags
         tech_hashtags = [
             "#tech #technology #coding #programming #hindi #reels #viral",
@@ -464,7 +835,7 @@ def post_instagram(video_path):
         # Simple clip_upload call
         try:
             print("📤 Uploading reel to Instagram (this may take a minute)...")
-            resp = cl.clip_upload(video_path, caption=caption)
+            resp = get_session().run(lambda cl: cl.clip_upload(video_path, caption=caption))
             # Return instagrapi response (could be model object)
             return {"ok": True, "response": resp}
         except ValidationError as ve:
@@ -475,27 +846,26 @@ def post_instagram(video_path):
             else:
                 return {"ok": False, "error": error_str}
 
+    except InstagramBlocked as e:
+        return {"ok": False, "error": str(e), "skipped": True}
+    except LoginRequired as e:
+        # Relogin ke baad bhi auth fail: session ne warm client hata diya aur failure cache kar di
+        return {"ok": False, "error": str(e), "hint": "Login fail ho raha hai. Check 2FA / suspicious login alerts."}
     except Exception as e:
-        # Auto-fix: Delete session file if upload fails (often fixes 'Unknown' or 'LoginRequired')
-        if os.path.exists("session.json"):
-            try:
-                os.remove("session.json")
-                print("⚠️ Session file corrupted or expired. Deleted 'session.json'.")
-            except:
-                pass
-        return {"ok": False, "error": str(e), "hint": "Session reset. Please run the script again to login freshly."}
+        return {"ok": False, "error": str(e), "hint": "Check 2FA, suspicious login alerts, and session.json"}
 
 
 # ====== 4. Instagram Post (Image-only) ======
-def post_instagram_image(caption_text: str, image_path: str | None = None):
+def post_instagram_image(caption_text: str, image_path: str | None = None, workdir: str | None = None):
     """Sirf image + caption ke saath normal Instagram photo post kare"""
-    if not INSTAGRAM_USERNAME or not INSTAGRAM_PASSWORD:
-        return {"ok": False, "error": "Missing Instagram credentials in config"}
+    config_error = _instagram_config_error()
+    if config_error:
+        return config_error
 
     try:
         # Agar image_path nahi diya, to text overlay ke saath naya image bana do
         if not image_path:
-            image_path = create_quote_image(caption_text)
+            image_path = create_quote_image(caption_text, workdir)
         if not image_path or not os.path.exists(image_path):
             raise Exception("Image path invalid ya image generate nahi ho payi")
 
@@ -504,18 +874,6 @@ def post_instagram_image(caption_text: str, image_path: str | None = None):
         if valid_ext not in [".jpg", ".jpeg", ".png", ".webp"]:
             raise Exception(f"Invalid image format for photo upload: {valid_ext}")
 
-        cl = Client()
-        cl.set_settings({})
-        cl.delay_range = [2, 6]
-
-        # Use saved session
-        if os.path.exists("session.json"):
-            cl.load_settings("session.json")
-            cl.login(INSTAGRAM_USERNAME, INSTAGRAM_PASSWORD)
-        else:
-            cl.login(INSTAGRAM_USERNAME, INSTAGRAM_PASSWORD)
-            cl.dump_settings("session.json")
-
         # Normal post ke liye thode simple hashtags
         tech_hashtags = [
             "#tech #coding #programming #developer #hindi",
@@ -526,11 +884,15 @@ def post_instagram_image(caption_text: str, image_path: str | None = None):
         caption = f"{caption_text}\n\n{random.choice(tech_hashtags)}"
 
         try:
-            resp = cl.photo_upload(image_path, caption=caption)
+            resp = get_session().run(lambda cl: cl.photo_upload(image_path, caption=caption))
             return {"ok": True, "response": resp}
         except ValidationError as ve:
             return {"ok": False, "error": str(ve)}
-        
+
+    except InstagramBlocked as e:
+        return {"ok": False, "error": str(e), "skipped": True}
+    except LoginRequired as e:
+        return {"ok": False, "error": str(e), "hint": "Login fail ho raha hai. Check 2FA / suspicious login alerts."}
     except Exception as e:
         return {"ok": False, "error": str(e), "hint": "Check 2FA, suspicious login alerts, and session.json"}
 
@@ -540,19 +902,22 @@ def main():
     print("       🚀 TECH REEL AUTO POST MACHINE FULL POWER PE!       ")
     print("="*70 + "\n")
 
-    tech_content = generate_tech_script()
-    print(f"Tech Content → {tech_content}\n")
-
-    video = create_reel_video(tech_content)
-    if video:
-        print("🚀 Instagram par upload shuru kar raha hoon...")
-        result = post_instagram(video)
-        if result.get("ok"):
-            print("✅ Instagram Post Successful!")
-        else:
-            print(f"❌ Instagram Post Failed: {result.get('error')}")
-            if result.get("hint"):
-                print(f"💡 Hint: {result.get('hint')}")
+    with run_workspace() as workdir:
+        inputs = gather_post_inputs(workdir)
+        tech_content = inputs["script"]
+        print(f"Tech Content → {tech_content}\n")
+
+        video = create_reel_video(tech_content, workdir=workdir, bg_image_path=inputs["bg_image"],
+                                  audio_path=inputs["music"])
+        if video:
+            print("🚀 Instagram par upload shuru kar raha hoon...")
+            result = post_instagram(video)
+            if result.get("ok"):
+                print("✅ Instagram Post Successful!")
+            else:
+                print(f"❌ Instagram Post Failed: {result.get('error')}")
+                if result.get("hint"):
+                    print(f"💡 Hint: {result.get('hint')}")
 
     print("\n🎉 KHTM! Ab Instagram kholo aur dekho Tech Reel live hai ya nahi 😎")
 
@@ -0,0 +1,59 @@
+import os
+import uuid
+
+import numpy as np
+from PIL import Image
+
+from myapp.config import BG_CACHE_DIR, BG_CACHE_MAX_MB
+from myapp.image_utils import (
+    QUOTE_SIZE,
+    REEL_WIDTH,
+    decode_scaled,
+    fit_quote_background,
+    quote_decode_size,
+    reel_decode_size,
+    scale_reel_background,
+)
+from myapp.render_cache import FileLRUCache, file_digest, make_key
+
+# kind → (target size, minimum decode size, resample function); reel ki height source aspect ratio se
+DERIVATIVES = {
+    "quote": (QUOTE_SIZE, quote_decode_size, fit_quote_background),
+    "reel": ((REEL_WIDTH, None), reel_decode_size, scale_reel_background),
+}
+EXT = ".npy"
+
+background_cache = FileLRUCache(BG_CACHE_DIR, BG_CACHE_MAX_MB * 1024 * 1024)
+
+
+def load_background(path: str, kind: str) -> Image.Image:
+    """``kind`` ("quote"/"reel") ke size ki RGB background.
+
+    Pehli baar image reduced resolution par decode (JPEG draft) + LANCZOS resample hoti hai
+    aur raw pixels (``.npy``) cache mein jate hain; agli renders (same source content) seedha
+    ready pixels load karti hain.
+    """
+    size, decode_size, derive = DERIVATIVES[kind]
+    key = make_key("background", src=file_digest(path), size=size, resample="lanczos", decode="draft")
+    cached = background_cache.get(key, EXT)
+    if cached:
+        try:
+            return Image.fromarray(np.load(cached))
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Background cache file kharab ({e}) → dobara resize")
+
+    img = derive(decode_scaled(path, decode_size))
+
+    if background_cache.max_bytes > 0:
+        os.makedirs(BG_CACHE_DIR, exist_ok=True)
+        tmp_path = os.path.join(BG_CACHE_DIR, f".{key}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, "wb") as fh:
+                np.save(fh, np.asarray(img))
+            background_cache.put(key, tmp_path, EXT, move=True)
+        except OSError as e:
+            print(f"⚠️ Background cache store fail: {e}")
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return img
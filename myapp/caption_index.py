@@ -0,0 +1,123 @@
+import hashlib
+import re
+
+import numpy as np
+from django.db import transaction
+
+from .config import CAPTION_DEDUPE_ATTEMPTS, CAPTION_DUPLICATE_THRESHOLD
+from .models import CaptionBucket, CaptionFingerprint
+
+# 128 hash functions = 32 LSH bands x 4 rows → ~0.42 similarity se upar wale candidates
+# milte hain, phir signature se asli similarity (threshold) check hoti hai
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+# Fixed seed: signatures processes aur restarts ke beech comparable rehte hain
+_rng = np.random.RandomState(1)
+_A = _rng.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+_WORD = re.compile(r"\w+")
+
+
+def _normalize(text: str) -> str:
+    # Emoji/punctuation hatao: "💡 Docker: ..." aur "Docker ..." same maane jayein
+    return " ".join(_WORD.findall(text.lower()))
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(_normalize(text).encode("utf-8")).hexdigest()
+
+
+def _shingles(text: str) -> set[str]:
+    normalized = _normalize(text)
+    if len(normalized) <= SHINGLE_SIZE:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+
+
+def signature(text: str) -> np.ndarray:
+    """Caption ka MinHash signature (uint32 x NUM_PERM)"""
+    shingles = _shingles(text)
+    if not shingles:
+        return np.full(NUM_PERM, _MAX_HASH, dtype=np.uint32)
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little") for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+    permuted = ((np.outer(hashes, _A) + _B) % _PRIME) & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def _bucket_keys(sig: np.ndarray) -> list[int]:
+    keys = []
+    for band in range(BANDS):
+        chunk = band.to_bytes(1, "little") + sig[band * ROWS:(band + 1) * ROWS].tobytes()
+        keys.append(int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), "little", signed=True))
+    return keys
+
+
+def find_duplicate(text: str, threshold: float = CAPTION_DUPLICATE_THRESHOLD):
+    """Sabse milta-julta purana caption ``(fingerprint, similarity)`` ya None"""
+    sig = signature(text)
+    candidate_ids = (
+        CaptionBucket.objects.filter(key__in=_bucket_keys(sig))
+        .values_list("fingerprint_id", flat=True)
+        .distinct()
+    )
+    best = None
+    for fingerprint in CaptionFingerprint.objects.filter(id__in=list(candidate_ids)):
+        other = np.frombuffer(bytes(fingerprint.signature), dtype=np.uint32)
+        similarity = float(np.mean(other == sig))
+        if similarity >= threshold and (best is None or similarity > best[1]):
+            best = (fingerprint, similarity)
+    return best
+
+
+def register(text: str) -> CaptionFingerprint:
+    sig = signature(text)
+    with transaction.atomic():
+        fingerprint = CaptionFingerprint.objects.create(text=text, text_hash=text_hash(text),
+                                                        signature=sig.tobytes())
+        CaptionBucket.objects.bulk_create(
+            CaptionBucket(fingerprint=fingerprint, key=key) for key in _bucket_keys(sig)
+        )
+    return fingerprint
+
+
+def register_posted(text: str) -> CaptionFingerprint | None:
+    """Successfully post hua caption index mein daalo (fallback/khali/already indexed text nahi)"""
+    from .auto_post import is_fallback_caption
+
+    text = (text or "").strip()
+    if not text or is_fallback_caption(text):
+        return None
+    # Full-table text compare nahi - indexed hash column par lookup
+    if CaptionFingerprint.objects.filter(text_hash=text_hash(text)).exists():
+        return None
+    return register(text)
+
+
+def unique_caption(generate, attempts: int = CAPTION_DEDUPE_ATTEMPTS) -> str:
+    """``generate()`` se caption lo; post ho chuke caption jaisa ho to regenerate.
+
+    Yahan index mein kuch nahi jata - fail/abort runs ke captions agli baar block na karein.
+    """
+    from .auto_post import is_fallback_caption
+
+    for attempt in range(attempts + 1):
+        caption = generate()
+        if is_fallback_caption(caption):
+            return caption  # Groq nahi mila → regenerate se bhi wahi fallback
+        match = find_duplicate(caption)
+        if match is None:
+            return caption
+        fingerprint, similarity = match
+        print(f"♻️ Caption {similarity:.0%} purane caption #{fingerprint.id} jaisa hai → regenerate")
+    print("⚠️ Unique caption nahi mila, last wala use kar raha hoon")
+    return caption
@@ -27,4 +27,85 @@ FB_ACCESS_TOKEN       = os.getenv("FB_ACCESS_TOKEN", "")
 X_CONSUMER_KEY        = os.getenv("X_CONSUMER_KEY", "")
 X_CONSUMER_SECRET     = os.getenv("X_CONSUMER_SECRET", "")
 X_ACCESS_TOKEN        = os.getenv("X_ACCESS_TOKEN", "")
-X_ACCESS_SECRET       = os.getenv("X_ACCESS_SECRET", "")
\ No newline at end of file
+X_ACCESS_SECRET       = os.getenv("X_ACCESS_SECRET", "")
+
+# Reel rendering: "ffmpeg" (single still frame, fast) ya "moviepy" (per-frame, animated effects)
+REEL_RENDERER = os.getenv("REEL_RENDERER", "ffmpeg")
+
+# Finished reels/quote images ka content-addressed cache (LRU, size-bounded)
+RENDER_CACHE_DIR = os.getenv("RENDER_CACHE_DIR", os.path.join("cache", "renders"))
+RENDER_CACHE_MAX_MB = int(os.getenv("RENDER_CACHE_MAX_MB", "500"))
+
+# Backgrounds ke resized (quote 1080x1350 / reel width 1080) pixels ka cache: har image ek hi baar resample
+BG_CACHE_DIR = os.getenv("BG_CACHE_DIR", os.path.join("cache", "backgrounds"))
+BG_CACHE_MAX_MB = int(os.getenv("BG_CACHE_MAX_MB", "300"))
+
+# Har pipeline run ki scratch/working directories yahan banti hain (run ke baad delete)
+RUNS_DIR = os.getenv("RUNS_DIR", "runs")
+
+# Workspace ke bahar (workdir=None) bane reels/images/backgrounds itne ghante baad delete
+ARTIFACT_MAX_AGE_HOURS = float(os.getenv("ARTIFACT_MAX_AGE_HOURS", "24"))
+
+# Instagram session (process mein warm client; yeh file har login/upload ke baad atomically update hoti hai)
+INSTAGRAM_SESSION_FILE = os.getenv("INSTAGRAM_SESSION_FILE", "session.json")
+INSTAGRAM_SESSION_VALIDATE_SECONDS = int(os.getenv("INSTAGRAM_SESSION_VALIDATE_SECONDS", "900"))
+
+# Twitter clients process mein cache hote hain; credentials verify max itne seconds mein ek baar
+TWITTER_VERIFY_TTL_SECONDS = int(os.getenv("TWITTER_VERIFY_TTL_SECONDS", "3600"))
+
+# Shared HTTP session (Groq/Unsplash): keep-alive pool per host + retry/backoff
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "4"))
+HTTP_POOL_BLOCK = os.getenv("HTTP_POOL_BLOCK", "true").lower() in ("1", "true", "yes")
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.5"))
+
+# Content bank: scheduled slots ke liye pehle se rendered reels/images
+CONTENT_BANK_DIR = os.getenv("CONTENT_BANK_DIR", os.path.join("content", "bank"))
+CONTENT_BANK_DEPTH = int(os.getenv("CONTENT_BANK_DEPTH", "6"))
+CONTENT_BANK_LOW_WATERMARK = int(os.getenv("CONTENT_BANK_LOW_WATERMARK", "2"))
+CONTENT_BANK_EXPIRY_HOURS = int(os.getenv("CONTENT_BANK_EXPIRY_HOURS", "72"))
+
+# Batch caption generation: ek Groq request mein max itni tips
+CAPTION_BATCH_SIZE = int(os.getenv("CAPTION_BATCH_SIZE", "8"))
+
+# Near-duplicate captions (MinHash similarity isse zyada → regenerate, max itni baar)
+CAPTION_DUPLICATE_THRESHOLD = float(os.getenv("CAPTION_DUPLICATE_THRESHOLD", "0.6"))
+CAPTION_DEDUPE_ATTEMPTS = int(os.getenv("CAPTION_DEDUPE_ATTEMPTS", "3"))
+
+# Groq model router: fastest healthy model pehle, fail hone wale models ka circuit open
+GROQ_MODELS = [m.strip() for m in os.getenv(
+    "GROQ_MODELS", "llama-3.3-70b-versatile,llama3-70b-8192,mixtral-8x7b-32768"
+).split(",") if m.strip()]
+GROQ_BREAKER_FAILURES = int(os.getenv("GROQ_BREAKER_FAILURES", "3"))
+GROQ_BREAKER_COOLDOWN = int(os.getenv("GROQ_BREAKER_COOLDOWN", "60"))
+GROQ_HEDGE = os.getenv("GROQ_HEDGE", "false").lower() in ("1", "true", "yes")
+
+# Credential/config failures (Groq 401, Unsplash key, Instagram login) ka negative cache:
+# itni der tak provider skip → seedha fallback, network timeout nahi
+PROVIDER_FAILURE_FILE = os.getenv("PROVIDER_FAILURE_FILE", "provider_failures.json")
+PROVIDER_FAILURE_TTL_SECONDS = int(os.getenv("PROVIDER_FAILURE_TTL_SECONDS", "900"))
+
+# Caption streaming: itne words (poore sentences) aa gaye to baaki Groq stream chhod do (0 = poora jawab)
+CAPTION_STREAM_MIN_WORDS = int(os.getenv("CAPTION_STREAM_MIN_WORDS", "40"))
+
+# Record/replay HTTP (offline benchmarking): "record" = responses disk par save, "replay" = network
+# ke bina disk se; latency = recorded x SCALE, ya LATENCY_MS diya ho to fixed
+HTTP_REPLAY_MODE = os.getenv("HTTP_REPLAY_MODE", "").strip().lower()
+HTTP_REPLAY_DIR = os.getenv("HTTP_REPLAY_DIR", "replay")
+HTTP_REPLAY_LATENCY_MS = float(os.getenv("HTTP_REPLAY_LATENCY_MS")) if os.getenv("HTTP_REPLAY_LATENCY_MS") else None
+HTTP_REPLAY_LATENCY_SCALE = float(os.getenv("HTTP_REPLAY_LATENCY_SCALE", "1.0"))
+
+# Background image pool: Unsplash se ek call mein kai images (count), disk se turant render
+IMAGE_POOL_DIR = os.getenv("IMAGE_POOL_DIR", os.path.join("images", "pool"))
+IMAGE_POOL_MAX_MB = int(os.getenv("IMAGE_POOL_MAX_MB", "200"))
+IMAGE_POOL_TARGET = int(os.getenv("IMAGE_POOL_TARGET", "30"))
+IMAGE_POOL_LOW_WATERMARK = int(os.getenv("IMAGE_POOL_LOW_WATERMARK", "10"))
+# Ek image dobara itne ghante baad hi use hogi
+IMAGE_POOL_REUSE_HOURS = float(os.getenv("IMAGE_POOL_REUSE_HOURS", "72"))
+
+# Image downloads: chunks mein disk par; isse badi file abort (512MB instances par RSS safe)
+IMAGE_DOWNLOAD_MAX_MB = float(os.getenv("IMAGE_DOWNLOAD_MAX_MB", "15"))
+
+# Network/images na hon to procedural background (NumPy); seed set ho to har baar same image (debug/benchmark)
+PROCEDURAL_BG_SEED = int(os.getenv("PROCEDURAL_BG_SEED")) if os.getenv("PROCEDURAL_BG_SEED") else None
@@ -0,0 +1,149 @@
+import os
+import shutil
+import uuid
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .auto_post import (
+    create_quote_image,
+    create_reel_video,
+    gather_post_inputs,
+    pooled_captions,
+    prefetch_captions,
+    refill_image_pool,
+    run_workspace,
+)
+from .caption_index import register_posted
+from .config import (
+    CONTENT_BANK_DEPTH,
+    CONTENT_BANK_DIR,
+    CONTENT_BANK_EXPIRY_HOURS,
+    CONTENT_BANK_LOW_WATERMARK,
+)
+from .models import ContentItem
+
+# Claim ke baad upload itni der mein finish na ho (crash) to item wapas ready
+CLAIM_TIMEOUT = timedelta(hours=1)
+
+
+def _ready(kind: str | None = None):
+    items = ContentItem.objects.filter(status=ContentItem.Status.READY, expires_at__gt=timezone.now())
+    return items.filter(kind=kind) if kind else items
+
+
+def depth(kind: str) -> int:
+    return _ready(kind).count()
+
+
+def below_watermark(kinds=None) -> bool:
+    """Kisi bhi kind ka stock low watermark tak gir gaya?"""
+    return any(depth(kind) <= CONTENT_BANK_LOW_WATERMARK for kind in kinds or ContentItem.Kind.values)
+
+
+def produce(kind: str) -> ContentItem | None:
+    """Ek caption + rendered media banao aur bank mein ready rakho"""
+    os.makedirs(CONTENT_BANK_DIR, exist_ok=True)
+    with run_workspace() as workdir:
+        inputs = gather_post_inputs(workdir, with_music=kind == ContentItem.Kind.REEL)
+        caption = inputs["script"]
+        if kind == ContentItem.Kind.REEL:
+            media = create_reel_video(caption, workdir=workdir, bg_image_path=inputs["bg_image"],
+                                      audio_path=inputs["music"])
+        else:
+            media = create_quote_image(caption, workdir=workdir, bg_image_path=inputs["bg_image"])
+        if not media or not os.path.exists(media):
+            print(f"❌ Content bank: {kind} render fail")
+            return None
+
+        # Workspace delete hone se pehle media bank folder mein move karo
+        dest = os.path.join(CONTENT_BANK_DIR, f"{kind}_{uuid.uuid4().hex[:12]}{os.path.splitext(media)[1]}")
+        shutil.move(media, dest)
+
+    return ContentItem.objects.create(
+        kind=kind,
+        caption=caption,
+        media_path=dest,
+        expires_at=timezone.now() + timedelta(hours=CONTENT_BANK_EXPIRY_HOURS),
+    )
+
+
+def fill(kinds=None, target: int = CONTENT_BANK_DEPTH, max_items: int | None = None) -> int:
+    """Har kind ko ``target`` depth tak bharo; ``max_items`` se ek call ka kaam limit hota hai"""
+    expire_stale()
+    kinds = kinds or ContentItem.Kind.values
+
+    # Saari zaruri captions ek (ya kuch) batched Groq calls mein - produce() pool se lega
+    # (max_items=1 wale scheduler ticks bhi pool se lete hain, isliye poori kami ke liye prefetch)
+    needed = sum(max(target - depth(kind), 0) for kind in kinds)
+    missing = needed - pooled_captions()
+    if missing > 1:
+        prefetch_captions(missing)
+    if needed:
+        # Backgrounds bhi idle time mein (Unsplash count=N calls), renders disk se lenge
+        refill_image_pool(background=False)
+
+    produced = 0
+    for kind in kinds:
+        while depth(kind) < target:
+            if max_items is not None and produced >= max_items:
+                return produced
+            if produce(kind) is None:
+                break
+            produced += 1
+    return produced
+
+
+def claim(kind: str | None = None) -> ContentItem | None:
+    """Sabse purana ready item claim karo (conditional UPDATE, kai processes safe)"""
+    for item_id in _ready(kind).order_by("created_at").values_list("id", flat=True)[:10]:
+        claimed = ContentItem.objects.filter(id=item_id, status=ContentItem.Status.READY).update(
+            status=ContentItem.Status.CLAIMED,
+            claimed_at=timezone.now(),
+        )
+        if claimed:
+            item = ContentItem.objects.get(id=item_id)
+            if os.path.exists(item.media_path):
+                return item
+            # File gayab (disk cleanup) → item bekaar
+            item.status = ContentItem.Status.EXPIRED
+            item.save(update_fields=["status"])
+    return None
+
+
+def mark_used(item: ContentItem) -> None:
+    """Upload ho gaya → media file hatao, caption dedupe index mein"""
+    _remove_media(item.media_path)
+    item.status = ContentItem.Status.USED
+    item.save(update_fields=["status"])
+    register_posted(item.caption)
+
+
+def release(item: ContentItem) -> None:
+    """Upload fail → item agle slot ke liye wapas ready"""
+    item.status = ContentItem.Status.READY
+    item.claimed_at = None
+    item.save(update_fields=["status", "claimed_at"])
+
+
+def expire_stale() -> int:
+    """Expired items ki files delete karo, atke hue claims wapas ready karo"""
+    now = timezone.now()
+    ContentItem.objects.filter(
+        status=ContentItem.Status.CLAIMED, claimed_at__lt=now - CLAIM_TIMEOUT
+    ).update(status=ContentItem.Status.READY, claimed_at=None)
+
+    expired = ContentItem.objects.filter(status=ContentItem.Status.READY, expires_at__lte=now)
+    count = 0
+    for item in expired:
+        _remove_media(item.media_path)
+        count += 1
+    expired.update(status=ContentItem.Status.EXPIRED)
+    return count
+
+
+def _remove_media(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
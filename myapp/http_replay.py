@@ -0,0 +1,261 @@
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from http.client import HTTPMessage
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from urllib3 import HTTPResponse
+from urllib3._collections import HTTPHeaderDict
+
+from myapp.config import (
+    HTTP_REPLAY_DIR,
+    HTTP_REPLAY_LATENCY_MS,
+    HTTP_REPLAY_LATENCY_SCALE,
+    HTTP_REPLAY_MODE,
+)
+
+RECORD = "record"
+REPLAY = "replay"
+
+# Ye query params key/disk par nahi jate (API keys, signatures)
+SECRET_PARAMS = {"client_id", "access_token", "api_key", "key", "signature", "sig"}
+# Body already decode ho chuki hai, ye headers replay mein galat honge
+DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+# Session tokens/credentials disk par nahi jate (Instagram ``ig-set-*`` auth/session headers bhi)
+SECRET_HEADERS = {"authorization", "proxy-authorization", "x-csrftoken", "x-access-token", "x-auth-token"}
+SECRET_HEADER_PREFIXES = ("ig-set-", "x-ig-set-")
+# Set-Cookie rehta hai (replay mein cookie names wahi), sirf value hat jati hai
+REDACTED = "redacted"
+
+
+def _scrub_headers(headers) -> list:
+    scrubbed = []
+    for name, value in headers:
+        lower = name.lower()
+        if lower in DROP_HEADERS or lower in SECRET_HEADERS or lower.startswith(SECRET_HEADER_PREFIXES):
+            continue
+        if lower in ("set-cookie", "set-cookie2"):
+            cookie, sep, attributes = value.partition(";")
+            value = f"{cookie.split('=', 1)[0].strip()}={REDACTED}{sep}{attributes}"
+        scrubbed.append([name, value])
+    return scrubbed
+
+
+def _scrub_url(url: str) -> str:
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() not in SECRET_PARAMS]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(sorted(query)), ""))
+
+
+def _body_bytes(body) -> bytes:
+    if body is None:
+        return b""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    if not isinstance(body, bytes):
+        return b""  # file/stream uploads: sirf endpoint se match
+    try:
+        # JSON body: key order se key na badle
+        return json.dumps(json.loads(body), sort_keys=True).encode("utf-8")
+    except ValueError:
+        return body
+
+
+def _digest(*parts: bytes | str) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8") if isinstance(part, str) else part)
+        h.update(b"\x00")
+    return h.hexdigest()[:16]
+
+
+class _OriginalResponse:
+    """``requests`` isi ke ``msg`` se Set-Cookie padhta hai (session cookies replay mein bhi)"""
+
+    def __init__(self, headers: list):
+        self.msg = HTTPMessage()
+        for name, value in headers:
+            self.msg[name] = value
+
+    def isclosed(self) -> bool:
+        return True
+
+
+class ReplayAdapter(BaseAdapter):
+    """HTTP responses disk par record karo / disk se replay karo (synthetic latency ke saath).
+
+    Recording ``<dir>/<host>/<endpoint>/<seq>-<request>.json`` (+ ``.body``) mein jati hai.
+    Replay mein pehle exact request (method + URL + body) match hoti hai; random prompts/
+    captions jaisi badalti bodies ke liye usi endpoint ki recordings order mein cycle hoti
+    hain, isliye ek hi recording se pipeline baar-baar deterministic chalti hai.
+    Miss par ``requests.ConnectionError`` (jaise network na ho).
+    """
+
+    def __init__(self, inner, mode: str, directory: str = HTTP_REPLAY_DIR,
+                 latency_ms: float | None = HTTP_REPLAY_LATENCY_MS,
+                 latency_scale: float = HTTP_REPLAY_LATENCY_SCALE):
+        super().__init__()
+        self.inner = inner
+        self.mode = mode
+        self.directory = directory
+        self.latency_ms = latency_ms
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._cursor = defaultdict(int)
+        self._seq = int(time.time() * 1000)
+
+    def _keys(self, request) -> tuple[str, str, str]:
+        parts = urlsplit(request.url)
+        endpoint = _digest(request.method, parts.scheme, parts.netloc, parts.path)
+        exact = _digest(request.method, _scrub_url(request.url), _body_bytes(request.body))
+        return parts.netloc.replace(":", "_"), endpoint, exact
+
+    def send(self, request, **kwargs):
+        host, endpoint, exact = self._keys(request)
+        folder = os.path.join(self.directory, host, endpoint)
+        if self.mode == RECORD:
+            return self._record(request, folder, exact, **kwargs)
+        return self._replay(request, folder, exact)
+
+    def close(self):
+        self.inner.close()
+
+    # ---- record ----
+    def _record(self, request, folder: str, exact: str, **kwargs):
+        start = time.perf_counter()
+        response = self.inner.send(request, **kwargs)
+        raw_headers = response.raw.headers.items() if response.raw is not None else response.headers.items()
+
+        with self._lock:
+            self._seq += 1
+            stem = os.path.join(folder, f"{self._seq}-{exact}")
+        os.makedirs(folder, exist_ok=True)
+        meta = {
+            "method": request.method,
+            "url": _scrub_url(request.url),
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": _scrub_headers(raw_headers),
+        }
+
+        def save(body_path: str) -> None:
+            # .json sabse aakhir mein: replay sirf poori recordings dekhta hai
+            os.replace(body_path, stem + ".body")
+            meta["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            _atomic_write(stem + ".json", json.dumps(meta, indent=2, ensure_ascii=False).encode("utf-8"))
+
+        if kwargs.get("stream") and response.raw is not None:
+            # Body caller ke saath-saath disk par (memory mein nahi); caller beech mein ruke
+            # (jaise download_to_file ka max_bytes cap) to recording discard
+            response.raw = _RecordingStream(response.raw, f"{stem}.body.{uuid.uuid4().hex}.tmp", save)
+            return response
+        tmp_path = f"{stem}.body.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as fh:
+            fh.write(response.content)
+        save(tmp_path)
+        return response
+
+    # ---- replay ----
+    def _replay(self, request, folder: str, exact: str):
+        stem = self._lookup(folder, exact)
+        if stem is None:
+            raise requests.ConnectionError(
+                f"Replay: {request.method} {_scrub_url(request.url)} ki recording nahi mili ({self.directory})",
+                request=request,
+            )
+        with open(stem + ".json", "r", encoding="utf-8") as fh:
+            meta = json.load(fh)
+        with open(stem + ".body", "rb") as fh:
+            content = fh.read()
+
+        latency_ms = self.latency_ms if self.latency_ms is not None else meta["latency_ms"] * self.latency_scale
+        if latency_ms > 0:
+            time.sleep(latency_ms / 1000)
+
+        raw = HTTPResponse(
+            body=io.BytesIO(content),
+            headers=HTTPHeaderDict(meta["headers"]),
+            status=meta["status"],
+            reason=meta.get("reason"),
+            preload_content=False,
+            decode_content=False,
+            original_response=_OriginalResponse(meta["headers"]),
+        )
+        # Normal adapter wala response banane ka code (headers, cookies, encoding)
+        return self.inner.build_response(request, raw)
+
+    def _lookup(self, folder: str, exact: str) -> str | None:
+        try:
+            stems = sorted(name[:-5] for name in os.listdir(folder) if name.endswith(".json"))
+        except OSError:
+            return None
+        if not stems:
+            return None
+        for stem in stems:
+            if stem.endswith(f"-{exact}"):
+                return os.path.join(folder, stem)
+        with self._lock:
+            index = self._cursor[folder] % len(stems)
+            self._cursor[folder] += 1
+        return os.path.join(folder, stems[index])
+
+
+class _RecordingStream:
+    """``stream=True`` response ka raw wrapper: jo chunks caller padhta hai wahi temp file mein.
+
+    Poori body padh li gayi to ``on_complete(tmp_path)``; pehle hi close ho gaya to temp file delete.
+    """
+
+    def __init__(self, raw, tmp_path: str, on_complete):
+        self._raw = raw
+        self._tmp_path = tmp_path
+        self._on_complete = on_complete
+        self._fh = open(tmp_path, "wb")
+
+    def stream(self, amt=2 ** 16, decode_content=None):
+        for chunk in self._raw.stream(amt, decode_content=decode_content):
+            self._fh.write(chunk)
+            yield chunk
+        self._fh.close()
+        self._on_complete(self._tmp_path)
+
+    def close(self):
+        if not self._fh.closed:
+            self._fh.close()
+            os.remove(self._tmp_path)
+        self._raw.close()
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp_path, path)
+
+
+_announced = False
+
+
+def install(session: requests.Session, mode: str = HTTP_REPLAY_MODE) -> requests.Session:
+    """``HTTP_REPLAY_MODE`` set ho to session ke http/https adapters ko ReplayAdapter se wrap karo"""
+    global _announced
+    if mode not in (RECORD, REPLAY):
+        return session
+    if not _announced:
+        _announced = True
+        print(f"🎞️ HTTP {mode} mode: {os.path.abspath(HTTP_REPLAY_DIR)}")
+    for prefix in ("https://", "http://"):
+        inner = session.get_adapter(prefix)
+        if not isinstance(inner, ReplayAdapter):
+            session.mount(prefix, ReplayAdapter(inner, mode))
+    return session
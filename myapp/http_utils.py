@@ -0,0 +1,257 @@
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from myapp.config import (
+    HTTP_BACKOFF_FACTOR,
+    HTTP_MAX_RETRIES,
+    HTTP_POOL_BLOCK,
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    IMAGE_DOWNLOAD_MAX_MB,
+)
+from myapp.http_replay import install as install_replay
+
+# Current thread ki request timing (connection classes yahan likhti hain, session.send padhta hai)
+_timing = threading.local()
+
+
+def _record(field: str, ms: float) -> None:
+    current = getattr(_timing, "current", None)
+    if current is not None:
+        current[field] = round(current.get(field, 0) + ms, 1)
+
+
+class _TimedConnectionMixin:
+    """Naye connection ka time note karo: ``_new_conn`` = DNS + TCP, baaki ``connect`` = TLS"""
+
+    def _new_conn(self):
+        start = time.perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            self._tcp_ms = (time.perf_counter() - start) * 1000
+            _record("connect_ms", self._tcp_ms)
+
+    def connect(self):
+        self._tcp_ms = 0.0
+        start = time.perf_counter()
+        super().connect()
+        if isinstance(self, HTTPSConnection):
+            _record("tls_ms", max((time.perf_counter() - start) * 1000 - self._tcp_ms, 0))
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """Keep-alive adapter jiske host pools timed connections use karte hain"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+
+class TimedSession(requests.Session):
+    """``requests.Session`` jo har response par ``response.timing`` lagata hai.
+
+    - ``connect_ms``: naya connection (DNS lookup bhi isi mein; urllib3 alag hook nahi deta)
+    - ``tls_ms``: HTTPS handshake
+    - ``ttfb_ms``: request bhejne se headers tak (``response.elapsed``)
+    - ``transfer_ms``: body download (stream=True ho to None)
+    - ``reused``: keep-alive connection reuse hua ya nahi
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._stats_lock = threading.Lock()
+        self._stats = defaultdict(lambda: {"requests": 0, "reused": 0, "connect_ms": 0.0, "total_ms": 0.0})
+
+    def send(self, request, **kwargs):
+        outer = getattr(_timing, "current", None)  # redirects ke liye send() nested call hota hai
+        _timing.current = {}
+        start = time.perf_counter()
+        try:
+            response = super().send(request, **kwargs)
+        finally:
+            measured = _timing.current
+            _timing.current = outer
+        total_ms = (time.perf_counter() - start) * 1000
+
+        ttfb_ms = round(response.elapsed.total_seconds() * 1000, 1)
+        timing = {
+            "connect_ms": measured.get("connect_ms", 0.0),
+            "tls_ms": measured.get("tls_ms", 0.0),
+            "ttfb_ms": ttfb_ms,
+            "transfer_ms": None if kwargs.get("stream") else round(max(total_ms - ttfb_ms, 0), 1),
+            "total_ms": round(total_ms, 1),
+            "reused": "connect_ms" not in measured,
+        }
+        response.timing = timing
+
+        host = urlsplit(request.url).netloc
+        with self._stats_lock:
+            entry = self._stats[host]
+            entry["requests"] += 1
+            entry["reused"] += int(timing["reused"])
+            entry["connect_ms"] += timing["connect_ms"] + timing["tls_ms"]
+            entry["total_ms"] += timing["total_ms"]
+        return response
+
+    def stats(self) -> dict:
+        """Host-wise totals (PostRun.metadata ke liye)"""
+        with self._stats_lock:
+            return {
+                host: {
+                    "requests": e["requests"],
+                    "reused": e["reused"],
+                    "connect_ms": round(e["connect_ms"], 1),
+                    "avg_ms": round(e["total_ms"] / e["requests"], 1),
+                }
+                for host, e in self._stats.items()
+            }
+
+
+def build_session(status_forcelist=(429, 502, 503, 504), max_retries: int = HTTP_MAX_RETRIES) -> TimedSession:
+    """Pooled session: per-host connection limit, 429/5xx par backoff ke saath retry"""
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=status_forcelist,
+        allowed_methods=None,  # POST bhi: in statuses par server ne request process nahi ki
+        respect_retry_after_header=True,
+        raise_on_status=False,  # aakhri response caller ko milega (status_code khud check hota hai)
+    )
+    adapter = PooledHTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        pool_block=HTTP_POOL_BLOCK,
+        max_retries=retry,
+    )
+    session = TimedSession()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    # HTTP_REPLAY_MODE=record/replay → offline benchmarking ke liye disk recording
+    return install_replay(session)
+
+
+# Process-wide shared session (Unsplash, image downloads)
+http_session = build_session()
+
+# Image downloads ke liye bhi urllib3 retry nahi: download_to_file ka Range-resume loop hi retry
+# karta hai (warna har attempt ke andar 3 connect tries → ek kharab host par 9 timeouts)
+download_session = build_session(status_forcelist=(), max_retries=0)
+
+# Groq ke liye koi retry nahi (na status, na connect/read timeout): POST dobara jaye to completion
+# dobara generate + bill hota hai aur timeout 3x ho jata hai - retry/failover sirf model router karta hai
+llm_session = build_session(status_forcelist=(), max_retries=0)
+
+
+def http_stats() -> dict:
+    """API calls + image downloads ke host-wise totals (PostRun.metadata ke liye)"""
+    return {**http_session.stats(), **download_session.stats()}
+
+
+# Download loop in statuses par (backoff ke baad) dobara try karta hai
+DOWNLOAD_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class DownloadTooLarge(Exception):
+    """Body ``max_bytes`` se badi - download beech mein rok diya"""
+
+
+def download_to_file(url: str, path: str, session: requests.Session | None = None,
+                     max_bytes: int = int(IMAGE_DOWNLOAD_MAX_MB * 1024 * 1024), timeout: float = 15,
+                     attempts: int = 3, chunk_size: int = 64 * 1024) -> str:
+    """``url`` ko chunks mein stream karke ``path`` par likho; sha256 hex return.
+
+    - body kabhi poori memory mein nahi aati (``chunk_size`` tak hi)
+    - ``.part`` temp file mein likhkar atomic rename → aadhi file kabhi ``path`` par nahi
+    - connection beech mein toote to ``Range: bytes=<n>-`` se resume (server 206 na de ya range
+      galat ho to shuru se)
+    - ``max_bytes`` se badi body → ``DownloadTooLarge``
+    - retries sirf yahi loop karta hai (``download_session`` mein urllib3 retry nahi): connection
+      error/timeout aur 429/5xx par max ``attempts`` tries, har ek ka ek hi timeout
+    """
+    session = session or download_session
+    tmp_path = f"{path}.{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    written = 0
+    last_error = None
+    try:
+        for attempt in range(attempts):
+            headers = {"Range": f"bytes={written}-"} if written else {}
+            try:
+                with session.get(url, stream=True, timeout=timeout, headers=headers) as response:
+                    content_range = response.headers.get("Content-Range", "")
+                    if written and response.status_code == 206 and content_range.startswith(f"bytes {written}-"):
+                        mode = "ab"
+                    elif response.status_code == 200:
+                        # Naya download (ya server ne Range ignore kiya) → shuru se
+                        mode, written, digest = "wb", 0, hashlib.sha256()
+                    elif response.status_code in DOWNLOAD_RETRY_STATUSES:
+                        last_error = requests.HTTPError(f"HTTP {response.status_code} for {url}", response=response)
+                        print(f"⚠️ Download HTTP {response.status_code} (attempt {attempt + 1}/{attempts})")
+                        if attempt + 1 < attempts:
+                            time.sleep(HTTP_BACKOFF_FACTOR * 2 ** attempt)
+                        continue
+                    elif response.status_code in (206, 416):
+                        # Galat range mili (ya range satisfy nahi hui) → agli attempt shuru se
+                        last_error = requests.HTTPError(
+                            f"HTTP {response.status_code} (Content-Range '{content_range}') for {url}",
+                            response=response,
+                        )
+                        print(f"⚠️ Resume range match nahi hui ({content_range or 'none'}) → shuru se download")
+                        written, digest = 0, hashlib.sha256()
+                        continue
+                    else:
+                        raise requests.HTTPError(f"HTTP {response.status_code} for {url}", response=response)
+
+                    declared = response.headers.get("Content-Length", "")
+                    if declared.isdigit() and written + int(declared) > max_bytes:
+                        raise DownloadTooLarge(f"{written + int(declared)} bytes > {max_bytes}")
+                    with open(tmp_path, mode) as fh:
+                        for chunk in response.iter_content(chunk_size):
+                            if written + len(chunk) > max_bytes:
+                                raise DownloadTooLarge(f"> {max_bytes} bytes")
+                            fh.write(chunk)
+                            digest.update(chunk)
+                            written += len(chunk)
+                os.replace(tmp_path, path)
+                return digest.hexdigest()
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+                # Body ke beech connection/read timeout: jitna likha gaya wahan se resume
+                last_error = e
+                print(f"⚠️ Download toota ({written} bytes, attempt {attempt + 1}/{attempts}): {e}")
+        raise last_error
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
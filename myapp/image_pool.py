@@ -0,0 +1,249 @@
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows (local dev): sirf process ke andar ka lock
+    fcntl = None
+
+import requests
+
+from myapp import provider_health
+from myapp.config import (
+    IMAGE_POOL_DIR,
+    IMAGE_POOL_LOW_WATERMARK,
+    IMAGE_POOL_MAX_MB,
+    IMAGE_POOL_REUSE_HOURS,
+    IMAGE_POOL_TARGET,
+    UNSPLASH_ACCESS_KEY,
+)
+from myapp.http_utils import DownloadTooLarge, download_to_file, http_session
+from myapp.render_cache import FileLRUCache
+
+UNSPLASH_RANDOM_URL = "https://api.unsplash.com/photos/random"
+# Ek keyword se max itni images (Unsplash ``count`` max 30) → pool mein variety
+PER_KEYWORD = 10
+EXT = ".jpg"
+
+
+def unsplash_available() -> bool:
+    """Key set hai aur negative cache mein nahi (missing key bhi wahan note hoti hai)"""
+    credential = provider_health.credential_fingerprint(UNSPLASH_ACCESS_KEY)
+    reason = provider_health.blocked(provider_health.UNSPLASH, credential)
+    if reason:
+        print(f"⏭️ Unsplash skip (cached failure): {reason}")
+        return False
+    if not UNSPLASH_ACCESS_KEY or len(UNSPLASH_ACCESS_KEY) <= 10:
+        provider_health.record_failure(provider_health.UNSPLASH, "UNSPLASH_ACCESS_KEY missing/invalid", credential)
+        return False
+    return True
+
+
+class ImagePool:
+    """Pehle se download ki hui background images (content-addressed, size cap + LRU eviction).
+
+    - files ``<sha256>.jpg``: same photo dobara aaye to ek hi file
+    - ``take()`` disk se image deta hai; jo image ``reuse_seconds`` mein use hui woh nahi milti
+      (pehle kabhi use na hui images, phir sabse purani use hui)
+    - last-used time ``<dir>.json`` index mein (eviction mtime se, FileLRUCache wala)
+    - index ka read-modify-write ``<dir>.json.lock`` par ``flock`` ke saath: worker, scheduler aur
+      commands alag processes mein bhi ek dusre ke updates nahi khote, same image do baar nahi milti
+    """
+
+    def __init__(self, directory: str = IMAGE_POOL_DIR, max_bytes: int = IMAGE_POOL_MAX_MB * 1024 * 1024,
+                 reuse_seconds: float = IMAGE_POOL_REUSE_HOURS * 3600, target: int = IMAGE_POOL_TARGET):
+        self.directory = directory
+        self.files = FileLRUCache(directory, max_bytes)
+        self.reuse_seconds = reuse_seconds
+        self.target = target
+        self._index_path = f"{os.path.normpath(directory)}.json"
+        self._lock = threading.Lock()
+        self._index_lock = threading.Lock()
+        self._refill_thread = None
+
+    @contextmanager
+    def _locked(self):
+        """Index ka exclusive lock: process ke threads ke beech + (flock se) processes ke beech"""
+        with self._index_lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(os.path.dirname(self._index_path) or ".", exist_ok=True)
+            with open(f"{self._index_path}.lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # ---- index ----
+    def _load(self) -> dict:
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, index: dict) -> None:
+        present = set(self._digests())
+        index = {digest: entry for digest, entry in index.items() if digest in present}  # evicted files hatao
+        tmp_path = f"{self._index_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                json.dump(index, fh)
+            os.replace(tmp_path, self._index_path)
+        except OSError as e:
+            print(f"⚠️ Image pool index save nahi ho paya: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _digests(self) -> list[str]:
+        try:
+            return [name[:-len(EXT)] for name in os.listdir(self.directory) if name.endswith(EXT)]
+        except OSError:
+            return []
+
+    def _eligible(self, index: dict, now: float, keyword: str | None = None) -> list[tuple]:
+        candidates = []
+        for digest in self._digests():
+            entry = index.get(digest, {})
+            if keyword is not None and entry.get("keyword") != keyword:
+                continue
+            used_at = entry.get("used_at")
+            if used_at and now - used_at < self.reuse_seconds:
+                continue
+            # Never-used pehle (download order), phir sabse pehle use hui
+            candidates.append((used_at is not None, used_at or entry.get("added_at", 0), digest))
+        return sorted(candidates)
+
+    # ---- serving ----
+    def take(self, keyword: str | None = None) -> str | None:
+        """Reuse window ke bahar wali ek image ka path (pool directory mein hi, copy nahi).
+
+        ``keyword`` diya ho to sirf usi keyword se download hui images.
+        """
+        now = time.time()
+        with self._locked():
+            index = self._load()
+            candidates = self._eligible(index, now, keyword)
+            if not candidates:
+                return None
+            digest = candidates[0][2]
+            index.setdefault(digest, {})["used_at"] = now
+            self._save(index)
+        return self.files.get(digest, EXT)  # mtime touch → LRU mein recent
+
+    def available(self, keyword: str | None = None) -> int:
+        with self._locked():
+            return len(self._eligible(self._load(), time.time(), keyword))
+
+    def deficit(self) -> int:
+        return max(self.target - self.available(), 0)
+
+    def low(self) -> bool:
+        return self.available() <= IMAGE_POOL_LOW_WATERMARK
+
+    # ---- refill ----
+    def refill(self, keywords: list[str], target: int | None = None, per_keyword: bool = False) -> int:
+        """Har keyword ke liye ek ``photos/random?count=N`` call, images parallel download.
+
+        ``per_keyword=True`` par ``target`` har keyword ki available images ke liye hai (poore pool ka nahi).
+        """
+        target = self.target if target is None else target
+        if not keywords or not unsplash_available():
+            return 0
+        os.makedirs(self.directory, exist_ok=True)
+        added = 0
+        for keyword in keywords:
+            need = target - self.available(keyword if per_keyword else None)
+            if need <= 0:
+                continue
+            photos = self._random_photos(keyword, min(need, PER_KEYWORD))
+            if photos is None:
+                break
+            with self._locked():
+                known = {entry.get("photo_id") for entry in self._load().values()}
+            fresh = [photo for photo in photos if photo.get("id") not in known]
+            with ThreadPoolExecutor(max_workers=4, thread_name_prefix="image-pool") as pool:
+                added += sum(pool.map(lambda photo: self._download(photo, keyword), fresh))
+        if added:
+            print(f"🖼️ Image pool +{added} images (available: {self.available()})")
+        return added
+
+    def refill_async(self, keywords: list[str]) -> None:
+        """Background thread mein refill (ek waqt mein ek hi)"""
+        with self._lock:
+            if self._refill_thread is not None and self._refill_thread.is_alive():
+                return
+            self._refill_thread = threading.Thread(
+                target=self.refill, args=(keywords,), name="image-pool-refill", daemon=True
+            )
+            self._refill_thread.start()
+
+    def _random_photos(self, keyword: str, count: int) -> list | None:
+        try:
+            response = http_session.get(
+                UNSPLASH_RANDOM_URL,
+                params={
+                    "query": keyword,
+                    "orientation": "portrait",
+                    "count": count,
+                    "client_id": UNSPLASH_ACCESS_KEY,
+                },
+                timeout=10,
+            )
+        except Exception as e:
+            print(f"⚠️ Unsplash API error: {e}")
+            return None
+        if response.status_code in (401, 403):
+            # Galat key (401) ya hourly rate limit khatam (403) - agli runs network par na jayein
+            provider_health.record_failure(
+                provider_health.UNSPLASH,
+                f"HTTP {response.status_code}: {response.text[:200]}",
+                provider_health.credential_fingerprint(UNSPLASH_ACCESS_KEY),
+            )
+            return None
+        if response.status_code != 200:
+            print(f"⚠️ Unsplash API returned {response.status_code}")
+            return None
+        try:
+            photos = response.json()
+        except ValueError:
+            return None
+        return photos if isinstance(photos, list) else [photos]
+
+    def _download(self, photo: dict, keyword: str) -> bool:
+        urls = photo.get("urls") or {}
+        image_url = urls.get("regular") or urls.get("full")
+        if not image_url:
+            return False
+        # Stream karke disk par (chunks) - poori image memory mein nahi, sha256 saath-saath
+        tmp_path = os.path.join(self.directory, f".{uuid.uuid4().hex}.tmp")
+        try:
+            digest = download_to_file(image_url, tmp_path)
+        except (requests.RequestException, DownloadTooLarge, OSError) as e:
+            print(f"⚠️ Image download fail: {e}")
+            return False
+        if os.path.exists(os.path.join(self.directory, digest + EXT)):
+            os.remove(tmp_path)
+            return False  # same image pehle se pool mein
+        if not self.files.put(digest, tmp_path, EXT, move=True):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        with self._locked():
+            index = self._load()
+            entry = index.setdefault(digest, {})
+            entry.update({"photo_id": photo.get("id"), "keyword": keyword})
+            entry.setdefault("added_at", time.time())
+            self._save(index)
+        return True
+
+
+image_pool = ImagePool()
@@ -0,0 +1,288 @@
+import math
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+
+# Reel aur quote image dono ke liye common layout values
+REEL_WIDTH = 1080
+REEL_MARGIN = (80, 80, 200, 200)  # left, right, top, bottom (black border)
+QUOTE_SIZE = (1080, 1350)  # Instagram portrait size
+BACKGROUND_RESAMPLE = Image.Resampling.LANCZOS
+
+# Pehle Windows/Mac ke Arial, phir Linux containers ke DejaVu fonts try honge
+FONT_CANDIDATES = ("arial.ttf", "Arial.ttf", "DejaVuSans.ttf")
+BOLD_FONT_CANDIDATES = ("arialbd.ttf", "Arial Bold.ttf", "DejaVuSans-Bold.ttf")
+
+
+@lru_cache(maxsize=None)
+def load_font(size: int, bold: bool = False):
+    """TrueType font load karo (process-wide cache), koi na mile to Pillow ka default font"""
+    candidates = BOLD_FONT_CANDIDATES + FONT_CANDIDATES if bold else FONT_CANDIDATES
+    for name in candidates:
+        try:
+            return ImageFont.truetype(name, size)
+        except IOError:
+            continue
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:  # Pillow < 10.1
+        return ImageFont.load_default()
+
+
+def text_size(draw: ImageDraw.ImageDraw, text: str, font, spacing: int = 4,
+              stroke_width: int = 0) -> tuple[int, int]:
+    """Multiline text ka (width, height) pixels mein"""
+    bbox = draw.multiline_textbbox((0, 0), text, font=font, spacing=spacing,
+                                   stroke_width=stroke_width)
+    return bbox[2] - bbox[0], bbox[3] - bbox[1]
+
+
+# Sirf measurement ke liye (kabhi draw nahi hota)
+_measure = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+
+
+@lru_cache(maxsize=8192)
+def _word_width(font, word: str) -> float:
+    # Har font/size ke liye ek word ka advance ek hi baar measure hota hai
+    return font.getlength(word)
+
+
+def _split_long_word(word: str, font, max_width: float) -> list[str]:
+    pieces, current = [], ""
+    for char in word:
+        if current and _word_width(font, current + char) > max_width:
+            pieces.append(current)
+            current = char
+        else:
+            current += char
+    return pieces + [current] if current else pieces
+
+
+@lru_cache(maxsize=1024)
+def wrap_text(text: str, font, max_width: float, stroke_width: int = 0) -> str:
+    """Pixel widths (glyph advances) se greedy word wrap → multiline string.
+
+    Newlines bhi normal whitespace (``textwrap.fill`` jaisa); ``max_width`` se lamba word
+    characters par toot jata hai.
+    """
+    max_width -= 2 * stroke_width
+    space = _word_width(font, " ")
+    lines, current, current_width = [], [], 0.0
+    for word in text.split():
+        pieces = [word] if _word_width(font, word) <= max_width else _split_long_word(word, font, max_width)
+        for piece in pieces:
+            width = _word_width(font, piece)
+            if current and current_width + space + width > max_width:
+                lines.append(" ".join(current))
+                current, current_width = [], 0.0
+            current_width += width + (space if current else 0)
+            current.append(piece)
+    if current:
+        lines.append(" ".join(current))
+    return "\n".join(lines)
+
+
+@lru_cache(maxsize=512)
+def fit_text(text: str, max_width: int, max_height: int, max_size: int, min_size: int = 28,
+             bold: bool = False, spacing: int = 4, stroke_width: int = 0):
+    """Box mein fit hone wala sabse bada font size (binary search) → ``(font, wrapped_text)``.
+
+    Chhota text ``max_size`` par hi rehta hai; lamba Groq output overflow ki jagah chhota
+    hota hai (``min_size`` tak). Same text + box ka result memoized.
+    """
+    best = None
+    lo, hi = min_size, max_size
+    while lo <= hi:
+        size = (lo + hi) // 2
+        font = load_font(size, bold=bold)
+        wrapped = wrap_text(text, font, max_width, stroke_width)
+        _, height = text_size(_measure, wrapped, font, spacing, stroke_width)
+        if height <= max_height:
+            best = (font, wrapped)
+            lo = size + 1
+        else:
+            hi = size - 1
+    if best is None:
+        font = load_font(min_size, bold=bold)
+        best = (font, wrap_text(text, font, max_width, stroke_width))
+    return best
+
+
+def add_margin(img: Image.Image, margin=REEL_MARGIN, color=(0, 0, 0)) -> Image.Image:
+    """Image ke charo taraf solid border lagao (MoviePy ``margin`` jaisa)"""
+    left, right, top, bottom = margin
+    canvas = Image.new("RGB", (img.width + left + right, img.height + top + bottom), color)
+    canvas.paste(img, (left, top))
+    return canvas
+
+
+def draw_text_box(draw: ImageDraw.ImageDraw, text: str, *, box, font, text_xy=None,
+                  align: str = "left", spacing: int = 4, fill=(0, 0, 0, 150),
+                  outline=None, outline_width: int = 0, text_fill=(255, 255, 255, 255),
+                  stroke_width: int = 0, stroke_fill=(0, 0, 0, 255)) -> None:
+    """RGBA overlay par translucent box + text draw karo.
+
+    ``text_xy`` na diya ho to text box ke center mein rakha jata hai.
+    """
+    draw.rectangle(box, fill=fill, outline=outline, width=outline_width)
+    if text_xy is None:
+        text_w, text_h = text_size(draw, text, font, spacing, stroke_width)
+        text_xy = (
+            box[0] + (box[2] - box[0] - text_w) // 2,
+            box[1] + (box[3] - box[1] - text_h) // 2,
+        )
+    draw.multiline_text(text_xy, text, font=font, fill=text_fill, spacing=spacing,
+                        align=align, stroke_width=stroke_width, stroke_fill=stroke_fill)
+
+
+def composite(frame: Image.Image, overlay: Image.Image) -> np.ndarray:
+    """Overlay ko frame par ek hi alpha composite mein lagao → RGB array"""
+    return np.asarray(Image.alpha_composite(frame.convert("RGBA"), overlay).convert("RGB"))
+
+
+def reel_decode_size(width: int, height: int) -> tuple[int, int]:
+    """Reel background ke liye kam se kam itna resolution chahiye (width 1080)"""
+    scale = min(REEL_WIDTH / width, 1.0)
+    return math.ceil(width * scale), math.ceil(height * scale)
+
+
+def quote_decode_size(width: int, height: int) -> tuple[int, int]:
+    """Quote crop (1080x1350) cover karne ke liye minimum resolution"""
+    scale = min(max(QUOTE_SIZE[0] / width, QUOTE_SIZE[1] / height), 1.0)
+    return math.ceil(width * scale), math.ceil(height * scale)
+
+
+def decode_scaled(path: str, min_size) -> Image.Image:
+    """Image ko ``min_size(width, height)`` jitne (ya thode bade) resolution par RGB decode karo.
+
+    JPEG: ``draft`` se libjpeg DCT domain mein hi 1/2, 1/4 ya 1/8 scale par decode karta hai,
+    full-resolution pixels memory mein aate hi nahi. Baaki formats: full decode ke baad
+    ``reduce`` (integer box downscale). Final high-quality resample caller karta hai.
+    """
+    with Image.open(path) as img:
+        target = min_size(*img.size)
+        if img.format == "JPEG":
+            img.draft("RGB", target)
+            return img.convert("RGB")
+        img = img.convert("RGB")
+    factor = min(img.width // target[0], img.height // target[1])
+    return img.reduce(factor) if factor >= 2 else img
+
+
+def scale_reel_background(bg_img: Image.Image) -> Image.Image:
+    """Reel background: width 1080, aspect ratio same"""
+    bg_img = bg_img.convert("RGB")
+    new_height = int(REEL_WIDTH * bg_img.height / bg_img.width)
+    return bg_img.resize((REEL_WIDTH, new_height), BACKGROUND_RESAMPLE)
+
+
+def fit_quote_background(bg_img: Image.Image, size=QUOTE_SIZE) -> Image.Image:
+    """Quote background: center crop + resize to ``size`` (default 1080x1350)"""
+    return ImageOps.fit(bg_img.convert("RGB"), size, method=BACKGROUND_RESAMPLE)
+
+
+def compose_reel_frame(bg_img: Image.Image, text: str) -> np.ndarray:
+    """Reel ka static frame: width 1080 background + black margin + text box (RGB array)"""
+    # Derivative cache se aayi image pehle se sized hoti hai
+    if bg_img.width != REEL_WIDTH or bg_img.mode != "RGB":
+        bg_img = scale_reel_background(bg_img)
+    frame = add_margin(bg_img)
+
+    overlay = Image.new("RGBA", frame.size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(overlay, "RGBA")
+
+    # 1100px wide box, frame height ke 60% se shuru; text 1000px width + frame ke andar fit
+    box_left = (frame.width - 1100) // 2
+    box_top = int(frame.height * 0.6)
+    max_text_h = frame.height - box_top - 40 - REEL_MARGIN[3] // 2
+    font, wrapped = fit_text(text, 1000, max_text_h, max_size=90, min_size=40, bold=True, stroke_width=3)
+    _, text_h = text_size(draw, wrapped, font, stroke_width=3)
+
+    box = (box_left, box_top, box_left + 1100, box_top + text_h + 40)
+    draw_text_box(draw, wrapped, box=box, font=font, align="center",
+                  fill=(0, 0, 0, 180), stroke_width=3)
+    return composite(frame, overlay)
+
+
+class OverlayTemplate:
+    """Quote image ka layout. Static hissa (translucent box, border, footer) template + size +
+    footer ke liye ek hi baar render hota hai; har post par sirf text draw hota hai.
+    """
+
+    def __init__(self, name: str, size=QUOTE_SIZE, box=(70, 220, 1010, 1130), box_fill=(0, 0, 0, 150),
+                 outline=(255, 255, 255, 60), outline_width: int = 4, text_xy=(100, 260),
+                 font_size: int = 64, min_font_size: int = 32, spacing: int = 12,
+                 text_fill=(255, 255, 255), footer_font_size: int = 46,
+                 footer_fill=(255, 255, 255, 200), footer_margin: int = 90):
+        self.name = name
+        self.size = size
+        self.box = box
+        self.box_fill = box_fill
+        self.outline = outline
+        self.outline_width = outline_width
+        self.text_xy = text_xy
+        self.font_size = font_size
+        self.min_font_size = min_font_size
+        self.spacing = spacing
+        self.text_fill = text_fill
+        self.footer_font_size = footer_font_size
+        self.footer_fill = footer_fill
+        self.footer_margin = footer_margin
+
+    @property
+    def text_area(self) -> tuple[int, int]:
+        # Text box ke andar: right 30px, bottom 40px padding
+        return self.box[2] - self.text_xy[0] - 30, self.box[3] - self.text_xy[1] - 40
+
+
+QUOTE_TEMPLATES: dict[str, OverlayTemplate] = {}
+
+
+def register_template(template: OverlayTemplate) -> OverlayTemplate:
+    QUOTE_TEMPLATES[template.name] = template
+    return template
+
+
+register_template(OverlayTemplate("classic"))
+
+
+@lru_cache(maxsize=32)
+def _static_layer(template: OverlayTemplate, footer_text: str):
+    """Template ke static parts → (RGB, alpha mask, position), sirf non-transparent area (crop)"""
+    layer = Image.new("RGBA", template.size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer, "RGBA")
+    draw.rectangle(template.box, fill=template.box_fill, outline=template.outline,
+                   width=template.outline_width)
+    if footer_text:
+        font_small = load_font(template.footer_font_size)
+        footer_w, footer_h = text_size(draw, footer_text, font_small)
+        # Footer bottom margin ke andar rahe, image se bahar na jaye
+        footer_x = template.size[0] - template.footer_margin - footer_w
+        footer_y = template.size[1] - template.footer_margin - footer_h
+        draw.text((footer_x, footer_y), footer_text, font=font_small, fill=template.footer_fill)
+    bbox = layer.getbbox() or (0, 0, 1, 1)
+    layer = layer.crop(bbox)
+    return layer.convert("RGB"), layer.getchannel("A"), bbox[:2]
+
+
+def compose_quote_frame(bg_img: Image.Image, text: str,
+                        footer_text: str = " @iamsaniydv", template: str = "classic") -> np.ndarray:
+    """Quote post ka frame: crop + template ka cached static layer + text (RGB array)"""
+    layout = QUOTE_TEMPLATES[template]
+    if bg_img.size != layout.size or bg_img.mode != "RGB":
+        bg_img = fit_quote_background(bg_img, layout.size)
+    else:
+        bg_img = bg_img.copy()  # caller ki image par draw na ho
+
+    # Static layer mask ke saath paste (RGB par hi blend) - poore frame ka RGBA composite nahi
+    layer_rgb, layer_alpha, position = _static_layer(layout, footer_text or "")
+    bg_img.paste(layer_rgb, position, layer_alpha)
+
+    clean_text = text.replace("\n", " ").strip()
+    text_w, text_h = layout.text_area
+    font, wrapped = fit_text(clean_text, text_w, text_h, max_size=layout.font_size,
+                             min_size=layout.min_font_size, spacing=layout.spacing)
+    draw = ImageDraw.Draw(bg_img)
+    draw.multiline_text(layout.text_xy, wrapped, font=font, fill=layout.text_fill, spacing=layout.spacing)
+    return np.asarray(bg_img)
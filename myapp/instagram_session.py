@@ -0,0 +1,167 @@
+import json
+import os
+import threading
+import time
+import uuid
+
+from instagrapi import Client
+from instagrapi.exceptions import (
+    BadCredentials,
+    BadPassword,
+    ChallengeRequired,
+    LoginRequired,
+    TwoFactorRequired,
+)
+
+from myapp import provider_health
+from myapp.http_replay import install as install_replay
+from myapp.config import (
+    INSTAGRAM_PASSWORD,
+    INSTAGRAM_SESSION_FILE,
+    INSTAGRAM_SESSION_VALIDATE_SECONDS,
+    INSTAGRAM_USERNAME,
+)
+
+# In errors par baar-baar login try karna account ke liye nuksan (challenge/lock) - negative cache
+AUTH_FAILURES = (BadCredentials, BadPassword, ChallengeRequired, TwoFactorRequired, LoginRequired)
+
+
+class InstagramBlocked(Exception):
+    """Credentials haal hi mein fail hue the - TTL khatam hone tak login try nahi"""
+
+
+class InstagramSession:
+    """Ek account ka warm instagrapi client (per process).
+
+    - ``session.json`` se settings load karke login sirf ek baar hota hai
+    - session ko ``validate_seconds`` mein max ek baar ``account_info`` se check kiya jata hai
+    - relogin sirf ``LoginRequired`` par (same device uuids ke saath), file delete nahi hoti
+    - settings temp file + rename se atomically save hoti hain
+    - bad password / challenge / 2FA → ``provider_health`` negative cache, TTL tak login skip
+    """
+
+    def __init__(self, username: str, password: str, session_file: str,
+                 validate_seconds: int = INSTAGRAM_SESSION_VALIDATE_SECONDS):
+        self.username = username
+        self.password = password
+        self.session_file = session_file
+        self.validate_seconds = validate_seconds
+        self._client: Client | None = None
+        self._validated_at = 0.0
+        self._lock = threading.RLock()
+        self._credential = provider_health.credential_fingerprint(username, password)
+
+    def client(self) -> Client:
+        with self._lock:
+            if self._client is None:
+                self._client = self._connect()
+            elif time.monotonic() - self._validated_at > self.validate_seconds:
+                self._validate()
+            return self._client
+
+    def run(self, action):
+        """``action(client)`` chalao; auth error par ek baar relogin karke retry.
+
+        Instagrapi client thread-safe nahi hai, isliye ek account ke actions serialize hote hain.
+        """
+        with self._lock:
+            reason = provider_health.blocked(provider_health.INSTAGRAM, self._credential)
+            if reason:
+                raise InstagramBlocked(f"Instagram login skip (cached failure): {reason}")
+            try:
+                cl = self.client()
+                try:
+                    result = action(cl)
+                except LoginRequired:
+                    print("⚠️ Instagram session expire ho gaya → relogin kar raha hoon")
+                    self._relogin()
+                    result = action(self._client)
+            except AUTH_FAILURES as e:
+                # Relogin ke baad bhi fail → warm client hatao, TTL tak dobara login nahi
+                self.invalidate()
+                provider_health.record_failure(provider_health.INSTAGRAM, f"{type(e).__name__}: {e}",
+                                               self._credential)
+                raise
+            self.persist()
+            return result
+
+    def invalidate(self) -> None:
+        """In-process client hatao (session file rehti hai, agli baar usi se login)"""
+        with self._lock:
+            self._client = None
+            self._validated_at = 0.0
+
+    def persist(self) -> None:
+        if self._client is None:
+            return
+        directory = os.path.dirname(os.path.abspath(self.session_file))
+        tmp_path = os.path.join(directory, f".{os.path.basename(self.session_file)}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                json.dump(self._client.get_settings(), fh, indent=2)
+            os.replace(tmp_path, self.session_file)
+        except OSError as e:
+            print(f"⚠️ Instagram session save nahi ho paya: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _load_settings(self) -> dict | None:
+        if not os.path.exists(self.session_file):
+            return None
+        try:
+            with open(self.session_file, "r", encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ {self.session_file} read nahi ho paya ({e}) → fresh login")
+            return None
+
+    def _connect(self) -> Client:
+        cl = Client()
+        cl.delay_range = [2, 6]
+        for session in (cl.private, cl.public, cl.graphql):
+            install_replay(session)
+        settings = self._load_settings()
+        if settings:
+            # Saved session reuse: instagrapi ise validate karta hai aur zarurat ho to hi relogin
+            cl.set_settings(settings)
+        print("🔐 Instagram login (session reuse)..." if settings else "🔐 Instagram fresh login...")
+        cl.login(self.username, self.password)
+        self._client = cl
+        self._validated_at = time.monotonic()
+        # Login ho gaya → cached auth failure ab sach nahi
+        provider_health.clear(provider_health.INSTAGRAM)
+        self.persist()
+        return cl
+
+    def _validate(self) -> None:
+        try:
+            self._client.account_info()
+        except LoginRequired:
+            self._relogin()
+        self._validated_at = time.monotonic()
+
+    def _relogin(self) -> None:
+        if self._client is None:
+            self._client = self._connect()
+            return
+        # relogin() device uuids same rakhta hai → "suspicious login" kam
+        self._client.relogin()
+        self._validated_at = time.monotonic()
+        provider_health.clear(provider_health.INSTAGRAM)
+        self.persist()
+
+
+_sessions: dict[str, InstagramSession] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(username: str | None = None, password: str | None = None) -> InstagramSession:
+    """Account ke liye process-wide shared session manager"""
+    username = username or INSTAGRAM_USERNAME
+    password = password or INSTAGRAM_PASSWORD
+    with _sessions_lock:
+        session = _sessions.get(username)
+        if session is None or session.password != password:
+            session = InstagramSession(username, password, INSTAGRAM_SESSION_FILE)
+            _sessions[username] = session
+        return session
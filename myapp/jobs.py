@@ -0,0 +1,104 @@
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import DatabaseError, connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import PostRun
+
+PLATFORM_BY_JOB = {
+    PostRun.JobType.REEL: PostRun.Platform.INSTAGRAM,
+    PostRun.JobType.IMAGE: PostRun.Platform.INSTAGRAM,
+    PostRun.JobType.TWEET: PostRun.Platform.X,
+}
+
+
+def enqueue(job_type: str) -> PostRun:
+    """Naya job queue mein daalo - sirf ek INSERT, HTTP request turant return ho jati hai"""
+    return PostRun.objects.create(
+        platform=PLATFORM_BY_JOB[job_type],
+        job_type=job_type,
+        status=PostRun.Status.QUEUED,
+    )
+
+
+def claim_next(batch: int = 10) -> PostRun | None:
+    """Sabse purana queued job claim karo.
+
+    Claim ek conditional UPDATE (status=queued → started) hai, isliye kai worker
+    processes bina broker ke SQLite/Postgres dono par safely saath chal sakte hain.
+    """
+    candidates = (
+        PostRun.objects.filter(status=PostRun.Status.QUEUED)
+        .order_by("created_at")
+        .values_list("id", flat=True)[:batch]
+    )
+    for run_id in candidates:
+        now = timezone.now()
+        claimed = PostRun.objects.filter(id=run_id, status=PostRun.Status.QUEUED).update(
+            status=PostRun.Status.STARTED,
+            started_at=now,
+            heartbeat_at=now,
+            attempts=F("attempts") + 1,
+        )
+        if claimed:
+            return PostRun.objects.get(id=run_id)
+    return None
+
+
+def heartbeat(run_id: int) -> bool:
+    """Chal rahe job ka ``heartbeat_at`` abhi par set karo (job ab bhi 'started' ho tabhi)"""
+    return bool(PostRun.objects.filter(id=run_id, status=PostRun.Status.STARTED).update(
+        heartbeat_at=timezone.now()
+    ))
+
+
+@contextmanager
+def keep_alive(run_id: int, interval: float):
+    """Block ke dauraan background thread har ``interval`` seconds par heartbeat deta hai.
+
+    Lamba chalne wala job (slow upload) isliye stale nahi maana jata; worker process mar
+    jaye to heartbeat ruk jata hai aur ``requeue_stale`` use wapas queue kar deta hai.
+    """
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(interval):
+                try:
+                    heartbeat(run_id)
+                except DatabaseError as exc:
+                    print(f"⚠️ Job #{run_id} heartbeat fail: {exc}")
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=beat, name=f"job-{run_id}-heartbeat", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def requeue_stale(minutes: int, max_attempts: int = 3) -> int:
+    """Worker crash hone par atke 'started' jobs wapas queue karo (ya attempts khatam ho to fail).
+
+    Stale wahi job hai jiska heartbeat ``minutes`` se purana hai - sirf lamba chal raha job nahi.
+    Heartbeat se pehle ke rows ke liye ``started_at`` dekha jata hai.
+    """
+    cutoff = timezone.now() - timedelta(minutes=minutes)
+    stale = PostRun.objects.filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff),
+        status=PostRun.Status.STARTED,
+        finished_at__isnull=True,
+    ).exclude(job_type="")
+    failed = stale.filter(attempts__gte=max_attempts).update(
+        status=PostRun.Status.FAILED,
+        error_message="Worker did not finish the job (max attempts reached).",
+        finished_at=timezone.now(),
+    )
+    requeued = stale.filter(attempts__lt=max_attempts).update(status=PostRun.Status.QUEUED)
+    return failed + requeued
@@ -0,0 +1,323 @@
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from myapp.config import (
+    GROQ_API_KEY,
+    GROQ_BREAKER_COOLDOWN,
+    GROQ_BREAKER_FAILURES,
+    GROQ_HEDGE,
+    GROQ_MODELS,
+)
+from myapp import provider_health
+from myapp.http_utils import llm_session
+
+GROQ_CHAT_URL = "https://api.groq.com/openai/v1/chat/completions"
+
+# Untested models optimistic (0ms) maane jate hain → har model ek baar measure hota hai
+# (config order mein); error rate ka penalty latency mein jodte hain
+ERROR_PENALTY_MS = 5000.0
+EWMA_ALPHA = 0.3
+# Decommissioned / missing model ko itni der tak try nahi karte
+DECOMMISSION_SECONDS = 24 * 3600
+MAX_COOLDOWN_SECONDS = 600
+MIN_TIMEOUT, MAX_TIMEOUT = 8.0, 30.0
+
+
+class GroqAuthError(Exception):
+    """401: API key galat/expired - dusra model try karne ka fayda nahi"""
+
+
+class GroqUnavailable(Exception):
+    """Koi healthy model nahi mila / sab attempts fail"""
+
+
+class _ModelFailure(Exception):
+    pass
+
+
+class _HedgeLost(Exception):
+    """Hedged stream jiska pehla token dusre model ke baad aaya - chup-chaap band (failure nahi)"""
+
+
+class _StreamRace:
+    """Hedged streaming: jis model ka pehla token pehle aaye wahi ``stop_when`` ko feed karta hai,
+    dusre ka stream pehle token par hi band (``_HedgeLost``)"""
+
+    def __init__(self, stop_when):
+        self.stop_when = stop_when
+        self.winner = None
+        self._lock = threading.Lock()
+
+    def feed(self, model: str):
+        def check(text: str) -> bool:
+            with self._lock:
+                if self.winner is None:
+                    self.winner = model
+                won = self.winner == model
+            if not won:
+                raise _HedgeLost(model)
+            return self.stop_when(text)
+        return check
+
+
+class _ModelState:
+    def __init__(self):
+        self.ewma_ms = None
+        self.error_rate = 0.0
+        self.samples = deque(maxlen=50)
+        self.failures = 0
+        self.trips = 0
+        self.open_until = 0.0
+        self.reason = ""
+        self.decommissioned = False
+
+    def p95(self) -> float | None:
+        if len(self.samples) < 5:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+
+class ModelRouter:
+    """Groq models mein se fastest healthy model chuno.
+
+    - har model ka latency EWMA, error rate aur last 50 latencies (p95) track hote hain
+    - lagatar ``failure_threshold`` failures → circuit open (cooldown exponential)
+    - decommissioned / not-found model → 24h ke liye band, 429 → Retry-After tak band
+    - ``hedge=True``: primary p95 deadline tak jawab na de to doosre model par bhi request
+    """
+
+    def __init__(self, models: list[str], failure_threshold: int = GROQ_BREAKER_FAILURES,
+                 cooldown: int = GROQ_BREAKER_COOLDOWN, hedge: bool = GROQ_HEDGE):
+        self.models = list(models)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.hedge = hedge
+        self._state = {model: _ModelState() for model in self.models}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="groq-hedge") if hedge else None
+
+    # ---- routing ----
+    def ranked(self) -> list[str]:
+        """Healthy models, best (latency + error penalty) pehle"""
+        now = time.monotonic()
+        with self._lock:
+            healthy = [m for m in self.models if self._state[m].open_until <= now]
+
+            def score(model):
+                st = self._state[model]
+                return (st.ewma_ms or 0.0) + st.error_rate * ERROR_PENALTY_MS
+
+            return sorted(healthy, key=score)
+
+    def _timeout(self, model: str, cap: float) -> float:
+        with self._lock:
+            p95 = self._state[model].p95()
+        if p95 is None:
+            return cap
+        return min(cap, max(MIN_TIMEOUT, 3 * p95 / 1000))
+
+    # ---- bookkeeping ----
+    def _success(self, model: str, ms: float | None) -> None:
+        with self._lock:
+            st = self._state[model]
+            if ms is not None:
+                st.ewma_ms = ms if st.ewma_ms is None else EWMA_ALPHA * ms + (1 - EWMA_ALPHA) * st.ewma_ms
+                st.samples.append(ms)
+            st.error_rate *= 1 - EWMA_ALPHA
+            st.failures = 0
+            st.trips = 0
+            st.reason = ""
+
+    def _failure(self, model: str, reason: str, open_for: float | None = None,
+                 decommissioned: bool = False) -> None:
+        with self._lock:
+            st = self._state[model]
+            st.error_rate = EWMA_ALPHA + (1 - EWMA_ALPHA) * st.error_rate
+            st.failures += 1
+            st.reason = reason
+            st.decommissioned = st.decommissioned or decommissioned
+            if open_for is None and st.failures >= self.failure_threshold:
+                st.trips += 1
+                open_for = min(self.cooldown * 2 ** (st.trips - 1), MAX_COOLDOWN_SECONDS)
+            if open_for:
+                st.open_until = time.monotonic() + open_for
+                print(f"⛔ Groq model {model} ka circuit open ({int(open_for)}s): {reason}")
+
+    # ---- requests ----
+    def _call(self, model: str, body: dict, timeout: float, record_latency: bool = True,
+              stop_when=None) -> tuple[str, str]:
+        start = time.perf_counter()
+        payload = {**body, "model": model}
+        if stop_when is not None:
+            payload["stream"] = True
+        try:
+            response = llm_session.post(
+                GROQ_CHAT_URL,
+                headers={"Authorization": f"Bearer {GROQ_API_KEY}"},
+                json=payload,
+                timeout=timeout,
+                stream=stop_when is not None,
+            )
+        except requests.RequestException as e:
+            self._failure(model, f"{type(e).__name__}: {e}")
+            raise _ModelFailure(str(e)) from e
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if response.status_code == 401:
+            reason = f"401 Unauthorized: {response.text[:200]}"
+            provider_health.record_failure(provider_health.GROQ, reason,
+                                           provider_health.credential_fingerprint(GROQ_API_KEY))
+            raise GroqAuthError(reason)
+        if response.status_code != 200:
+            text = response.text[:200]
+            if response.status_code in (400, 404) and any(
+                marker in text for marker in ("decommissioned", "model_not_found", "does not exist")
+            ):
+                self._failure(model, f"decommissioned: {text}", DECOMMISSION_SECONDS, decommissioned=True)
+            elif response.status_code == 429:
+                retry_after = response.headers.get("Retry-After", "")
+                wait_s = float(retry_after) if retry_after.replace(".", "", 1).isdigit() else self.cooldown
+                self._failure(model, "rate limited (429)", wait_s)
+            else:
+                self._failure(model, f"HTTP {response.status_code}: {text}")
+            raise _ModelFailure(f"{model} returned {response.status_code}: {text}")
+        # 200 = key valid hai → purani 401 entry (dusre process/purani key ki) hatao
+        provider_health.clear(provider_health.GROQ)
+
+        try:
+            if stop_when is not None:
+                content = self._read_stream(response, stop_when)
+                # Streaming mein latency = pehli usable caption tak ka time
+                elapsed_ms = (time.perf_counter() - start) * 1000
+            else:
+                choices = response.json().get("choices", [])
+                content = choices[0].get("message", {}).get("content", "").strip() if choices else ""
+        except requests.RequestException as e:
+            self._failure(model, f"stream {type(e).__name__}: {e}")
+            raise _ModelFailure(str(e)) from e
+        except ValueError as e:
+            self._failure(model, "invalid JSON response")
+            raise _ModelFailure(str(e)) from e
+        self._success(model, elapsed_ms if record_latency else None)
+        return model, content
+
+    @staticmethod
+    def _read_stream(response, stop_when) -> str:
+        """SSE chunks (``data: {...}``) jodte jao; ``stop_when(text)`` True → baaki stream chhod do"""
+        text = ""
+        try:
+            for line in response.iter_lines(chunk_size=None):
+                if not line.startswith(b"data:"):
+                    continue
+                data = line[5:].strip()
+                if data == b"[DONE]":
+                    break
+                chunk = json.loads(data)
+                if chunk.get("error"):
+                    raise ValueError(f"stream error: {chunk['error']}")
+                choices = chunk.get("choices") or []
+                delta = (choices[0].get("delta") or {}).get("content") if choices else None
+                if delta:
+                    text += delta
+                    if stop_when(text):
+                        break
+        finally:
+            # Early stop par connection band → server baaki tokens generate/bhejna rok deta hai
+            response.close()
+        return text.strip()
+
+    def _hedged(self, primary: str, secondary: str, body: dict, timeout: float, tried: set,
+                stop_when=None) -> tuple[str, str]:
+        """Primary p95 tak na laute to secondary bhi; ``tried`` mein secondary tabhi jata hai jab
+        hedge request sach mein bheji gayi (primary jaldi fail ho to normal failover usse try kare).
+
+        Streaming mein dono streams ki race pehle token tak: jeetne wala ``stop_when`` feed karta
+        hai, haarne wala wahin band (primary tokens bhejna shuru kar chuka ho to hedge hi nahi).
+        """
+        race = _StreamRace(stop_when) if stop_when is not None else None
+        with self._lock:
+            deadline = self._state[primary].p95()
+        first = self._pool.submit(self._call, primary, body, timeout,
+                                  stop_when=race.feed(primary) if race else None)
+        done, _ = wait([first], timeout=deadline / 1000)
+        if done or (race and race.winner):
+            return first.result()
+        print(f"⏱️ {primary} p95 ({deadline:.0f}ms) se slow → {secondary} par hedge request")
+        tried.add(secondary)
+        pending = {first, self._pool.submit(self._call, secondary, body, self._timeout(secondary, timeout),
+                                            stop_when=race.feed(secondary) if race else None)}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except GroqAuthError:
+                    raise
+                except _HedgeLost:
+                    continue
+                except _ModelFailure as e:
+                    error = e
+        raise error
+
+    def complete(self, body: dict, timeout: float = MAX_TIMEOUT, attempts: int = 3,
+                 latency_sensitive: bool = True, stop_when=None) -> tuple[str, str]:
+        """Chat completion ``(model, content)``; ``body`` mein model nahi dena.
+
+        ``latency_sensitive=False`` (bade batch requests): p95 timeout/hedging nahi, aur
+        unki latency single-caption stats mein nahi gini jati.
+        ``stop_when(text)`` diya ho to response stream hota hai aur callback True dete hi
+        ruk jata hai (text us point tak ka). Failover par text naye model se shuru hota hai.
+        """
+        # Pichhla 401 abhi cache mein hai → network call ke bina fallback
+        reason = provider_health.blocked(provider_health.GROQ, provider_health.credential_fingerprint(GROQ_API_KEY))
+        if reason:
+            raise GroqAuthError(f"cached: {reason}")
+
+        tried = set()
+        last_error = None
+        for _ in range(attempts):
+            candidates = [m for m in self.ranked() if m not in tried]
+            if not candidates:
+                break
+            primary = candidates[0]
+            tried.add(primary)
+            try:
+                with self._lock:
+                    can_hedge = self._state[primary].p95() is not None
+                if not latency_sensitive:
+                    print(f"🔄 Groq model: {primary}")
+                    return self._call(primary, body, timeout, record_latency=False, stop_when=stop_when)
+                if self.hedge and can_hedge and len(candidates) > 1:
+                    return self._hedged(primary, candidates[1], body, self._timeout(primary, timeout), tried,
+                                        stop_when=stop_when)
+                print(f"🔄 Groq model: {primary}")
+                return self._call(primary, body, self._timeout(primary, timeout), stop_when=stop_when)
+            except _ModelFailure as e:
+                print(f"⚠️ {e}")
+                last_error = e
+        raise GroqUnavailable(str(last_error) if last_error else "sab Groq models ka circuit open hai")
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                model: {
+                    "ewma_ms": round(st.ewma_ms) if st.ewma_ms is not None else None,
+                    "p95_ms": round(st.p95()) if st.p95() is not None else None,
+                    "error_rate": round(st.error_rate, 3),
+                    "open": st.open_until > now,
+                    "decommissioned": st.decommissioned,
+                    "reason": st.reason,
+                }
+                for model, st in self._state.items()
+            }
+
+
+groq_router = ModelRouter(GROQ_MODELS)
@@ -5,10 +5,14 @@ from django.utils import timezone
 
 from myapp.auto_post import (
     create_reel_video,
-    generate_tech_script,
+    gather_post_inputs,
     post_instagram,
+    run_workspace,
 )
-from myapp.models import PostRun
+from myapp import caption_index, content_bank
+from myapp.http_utils import http_stats
+from myapp.models import ContentItem, PostRun
+from myapp.render_cache import render_cache
 
 
 class Command(BaseCommand):
@@ -26,6 +30,11 @@ class Command(BaseCommand):
             action="store_true",
             help="Skip the final platform upload step (dry run).",
         )
+        parser.add_argument(
+            "--live",
+            action="store_true",
+            help="Generate and render now instead of using a pre-rendered reel from the content bank.",
+        )
 
     def handle(self, *args, **options):
         platform = options["platform"]
@@ -36,29 +45,43 @@ class Command(BaseCommand):
 
         self.stdout.write(self.style.NOTICE(f"🚀 Tech Auto-post started ({platform})"))
         try:
-            quote = generate_tech_script()  # Har bar unique tech content
-            run.quote = quote
-            self.stdout.write(self.style.SUCCESS(f"Quote: {quote}"))
-
-            video_path = create_reel_video(quote)
-            if not video_path:
-                raise CommandError("Video generation failed; check logs.")
-
-            run.video_path = video_path
-            run_metadata["video_path"] = video_path
-
-            if skip_post:
-                run.status = PostRun.Status.SKIPPED
-                self.stdout.write(self.style.WARNING("Upload skipped (dry run)."))
-            else:
-                if platform == PostRun.Platform.INSTAGRAM:
-                    post_instagram(video_path)
+            use_bank = platform == PostRun.Platform.INSTAGRAM and not (skip_post or options["live"])
+            if use_bank and self._post_from_bank(run, run_metadata):
+                return
+
+            # Dry run mein rendered files inspect karne ke liye workspace rakha jata hai
+            with run_workspace(keep=skip_post) as workdir:
+                # Tech content, background aur music parallel mein (har bar unique content)
+                inputs = gather_post_inputs(workdir)
+                quote = inputs["script"]
+                run.quote = quote
+                self.stdout.write(self.style.SUCCESS(f"Quote: {quote}"))
+
+                video_path = create_reel_video(quote, workdir=workdir, bg_image_path=inputs["bg_image"],
+                                               audio_path=inputs["music"])
+                if not video_path:
+                    raise CommandError("Video generation failed; check logs.")
+
+                run_metadata["render_cache"] = render_cache.stats()
+
+                if skip_post:
+                    # Dry run ka workspace rakha jata hai → sirf tab path valid rehta hai
+                    run.video_path = video_path
+                    run_metadata["video_path"] = video_path
+                    run.status = PostRun.Status.SKIPPED
+                    self.stdout.write(self.style.WARNING(f"Upload skipped (dry run). Video: {video_path}"))
                 else:
-                    raise CommandError(
-                        f"No publisher implementation for platform '{platform}'."
-                    )
-                run.status = PostRun.Status.SUCCESS
-                self.stdout.write(self.style.SUCCESS("✅ Upload complete."))
+                    if platform == PostRun.Platform.INSTAGRAM:
+                        result = post_instagram(video_path)
+                    else:
+                        raise CommandError(
+                            f"No publisher implementation for platform '{platform}'."
+                        )
+                    if not result.get("ok"):
+                        raise CommandError(f"Instagram post failed: {result.get('error', 'Unknown error')}")
+                    caption_index.register_posted(quote)
+                    run.status = PostRun.Status.SUCCESS
+                    self.stdout.write(self.style.SUCCESS("✅ Upload complete."))
 
         except Exception as exc:
             run.status = PostRun.Status.FAILED
@@ -66,8 +89,28 @@ class Command(BaseCommand):
             run_metadata["traceback"] = traceback.format_exc()
             self.stderr.write(self.style.ERROR(f"❌ Run failed: {exc}"))
         finally:
+            run_metadata["http"] = http_stats()
             run.metadata = run_metadata
             run.finished_at = timezone.now()
             run.save()
             self.stdout.write(self.style.NOTICE("Run metadata saved."))
 
+    def _post_from_bank(self, run, run_metadata) -> bool:
+        """Content bank se ready reel upload karo; bank khali ho to False (live render hoga)"""
+        item = content_bank.claim(ContentItem.Kind.REEL)
+        if item is None:
+            self.stdout.write(self.style.WARNING("📦 Content bank khali hai → live generate kar raha hoon"))
+            return False
+
+        run.quote = item.caption
+        run_metadata["content_item"] = item.id
+        self.stdout.write(self.style.SUCCESS(f"📦 Bank se reel #{item.id}: {item.caption}"))
+
+        result = post_instagram(item.media_path)
+        if not result.get("ok"):
+            content_bank.release(item)
+            raise CommandError(f"Instagram post failed: {result.get('error', 'Unknown error')}")
+        content_bank.mark_used(item)
+        run.status = PostRun.Status.SUCCESS
+        self.stdout.write(self.style.SUCCESS("✅ Upload complete."))
+        return True
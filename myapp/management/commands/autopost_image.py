@@ -1,8 +1,17 @@
 from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
 
-from myapp.auto_post import generate_tech_script, post_instagram_image
-from myapp.models import PostRun
+from myapp.auto_post import (
+    create_quote_image,
+    gather_post_inputs,
+    post_instagram_image,
+    run_workspace,
+    take_caption,
+)
+from myapp import caption_index, content_bank
+from myapp.models import ContentItem, PostRun
+from myapp.http_utils import http_stats
+from myapp.render_cache import render_cache
 
 
 class Command(BaseCommand):
@@ -14,6 +23,11 @@ class Command(BaseCommand):
             action="store_true",
             help="Skip the final platform upload step.",
         )
+        parser.add_argument(
+            "--live",
+            action="store_true",
+            help="Generate and render now instead of using a pre-rendered image from the content bank.",
+        )
 
     def handle(self, *args, **options):
         skip_post = options["skip_post"]
@@ -22,15 +36,40 @@ class Command(BaseCommand):
         metadata = {}
 
         try:
-            caption = generate_tech_script()
-            run.quote = caption
-            self.stdout.write(self.style.SUCCESS(caption))
+            item = None if skip_post or options["live"] else content_bank.claim(ContentItem.Kind.IMAGE)
+            if item is not None:
+                run.quote = item.caption
+                metadata["content_item"] = item.id
+                self.stdout.write(self.style.SUCCESS(f"📦 Bank se image #{item.id}: {item.caption}"))
+                result = post_instagram_image(item.caption, image_path=item.media_path)
+                if not result.get("ok"):
+                    content_bank.release(item)
+                    raise CommandError(f"Instagram image post failed: {result.get('error', 'Unknown error')}")
+                content_bank.mark_used(item)
+                run.status = PostRun.Status.SUCCESS
+                self.stdout.write(self.style.SUCCESS("Uploaded."))
+                return
 
             if skip_post:
+                # Pool/Groq caption, post ho chuke captions se near-duplicate ho to regenerate
+                caption = take_caption()
+                run.quote = caption
+                self.stdout.write(self.style.SUCCESS(caption))
                 run.status = PostRun.Status.SKIPPED
                 self.stdout.write(self.style.WARNING("Upload skipped."))
             else:
-                post_instagram_image(caption)
+                with run_workspace() as workdir:
+                    # Caption aur usi topic ka background parallel mein
+                    inputs = gather_post_inputs(workdir, with_music=False)
+                    caption = inputs["script"]
+                    run.quote = caption
+                    self.stdout.write(self.style.SUCCESS(caption))
+                    image_path = create_quote_image(caption, workdir=workdir, bg_image_path=inputs["bg_image"])
+                    result = post_instagram_image(caption, image_path=image_path, workdir=workdir)
+                metadata["render_cache"] = render_cache.stats()
+                if not result.get("ok"):
+                    raise CommandError(f"Instagram image post failed: {result.get('error', 'Unknown error')}")
+                caption_index.register_posted(caption)
                 run.status = PostRun.Status.SUCCESS
                 self.stdout.write(self.style.SUCCESS("Uploaded."))
         except Exception as exc:
@@ -38,6 +77,7 @@ class Command(BaseCommand):
             run.error_message = str(exc)
             self.stderr.write(self.style.ERROR(str(exc)))
         finally:
+            metadata["http"] = http_stats()
             run.metadata = metadata
             run.finished_at = timezone.now()
             run.save()
@@ -0,0 +1,115 @@
+import os
+import shutil
+import statistics
+import tempfile
+import textwrap
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image
+
+from myapp.auto_post import REEL_DURATION, REEL_FPS, encode_still_video
+from myapp.image_utils import compose_reel_frame
+
+SAMPLE_TEXT = (
+    "💡 Docker images ko chhota rakho - multi-stage builds use karo\n"
+    "🔹 Build tools final image mein nahi jaate aur deploy fast hota hai"
+)
+
+
+def compose_textclip_frame(bg_img: Image.Image, text: str):
+    """Purana MoviePy TextClip (ImageMagick) path - sirf comparison ke liye"""
+    import numpy as np
+    from moviepy.editor import ColorClip, CompositeVideoClip, ImageClip, TextClip
+
+    new_height = int(1080 * bg_img.height / bg_img.width)
+    resized = bg_img.convert("RGB").resize((1080, new_height), Image.Resampling.LANCZOS)
+    bg_clip = ImageClip(np.array(resized)).set_duration(REEL_DURATION)
+    bg_clip = bg_clip.margin(left=80, right=80, top=200, bottom=200, color=(0, 0, 0))
+
+    txt_clip = (TextClip(textwrap.fill(text, width=20), fontsize=90, color="white",
+                         font="Arial-Bold", stroke_color="black", stroke_width=3,
+                         size=(1000, None), method="caption", align="center")
+                .set_position("center")
+                .set_duration(REEL_DURATION))
+    text_bg = (ColorClip(size=(1100, txt_clip.size[1] + 40), color=(0, 0, 0, 180))
+               .set_position(("center", "center"))
+               .set_duration(REEL_DURATION))
+    text_final = CompositeVideoClip([text_bg, txt_clip]).set_position(
+        ("center", bg_clip.size[1] * 0.6)
+    )
+    return CompositeVideoClip([bg_clip, text_final])
+
+
+class Command(BaseCommand):
+    help = "Benchmark per-reel render time: Pillow compositor vs MoviePy TextClip path."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--image", help="Background image path (default: synthetic 1080x1440).")
+        parser.add_argument("--text", default=SAMPLE_TEXT, help="Overlay text.")
+        parser.add_argument("--runs", type=int, default=5, help="Timed runs per path.")
+        parser.add_argument(
+            "--encode",
+            action="store_true",
+            help="Also encode the full 16s reel (ffmpeg still vs MoviePy write_videofile).",
+        )
+
+    def handle(self, *args, **options):
+        runs = max(1, options["runs"])
+        if options["image"]:
+            if not os.path.exists(options["image"]):
+                raise CommandError(f"Image not found: {options['image']}")
+            bg_img = Image.open(options["image"]).convert("RGB")
+        else:
+            bg_img = Image.linear_gradient("L").resize((1080, 1440)).convert("RGB")
+        text = options["text"]
+        workdir = tempfile.mkdtemp(prefix="bench_render_")
+
+        try:
+            pillow_times = self._time(runs, lambda i: self._pillow(bg_img, text, workdir, i, options["encode"]))
+            self._report("Pillow compositor", pillow_times)
+
+            try:
+                textclip_times = self._time(runs, lambda i: self._textclip(bg_img, text, workdir, i, options["encode"]))
+            except Exception as exc:
+                self.stderr.write(self.style.WARNING(
+                    f"TextClip path skipped (ImageMagick/MoviePy unavailable): {exc}"
+                ))
+                return
+            self._report("MoviePy TextClip", textclip_times)
+
+            speedup = statistics.mean(textclip_times) / statistics.mean(pillow_times)
+            self.stdout.write(self.style.SUCCESS(f"Speedup: {speedup:.1f}x"))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def _pillow(self, bg_img, text, workdir, i, encode):
+        frame = compose_reel_frame(bg_img, text)
+        if encode:
+            frame_path = os.path.join(workdir, f"pillow_{i}.png")
+            Image.fromarray(frame).save(frame_path)
+            if not encode_still_video(frame_path, None, os.path.join(workdir, f"pillow_{i}.mp4")):
+                raise CommandError("ffmpeg encode failed")
+
+    def _textclip(self, bg_img, text, workdir, i, encode):
+        clip = compose_textclip_frame(bg_img, text)
+        if encode:
+            clip.write_videofile(os.path.join(workdir, f"textclip_{i}.mp4"), fps=REEL_FPS,
+                                 codec="libx264", threads=6, verbose=False, logger=None)
+        else:
+            clip.get_frame(0)
+
+    @staticmethod
+    def _time(runs, fn):
+        times = []
+        for i in range(runs):
+            start = time.perf_counter()
+            fn(i)
+            times.append(time.perf_counter() - start)
+        return times
+
+    def _report(self, label, times):
+        self.stdout.write(
+            f"{label:<20} mean {statistics.mean(times) * 1000:8.1f} ms | "
+            f"min {min(times) * 1000:8.1f} ms | runs {len(times)}"
+        )
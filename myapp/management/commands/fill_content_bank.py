@@ -0,0 +1,69 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from myapp import content_bank
+from myapp.config import CONTENT_BANK_DEPTH, CONTENT_BANK_LOW_WATERMARK
+from myapp.models import ContentItem
+
+
+class Command(BaseCommand):
+    help = "Pre-generate captions and pre-render reels/images into the content bank."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--kind",
+            choices=[*ContentItem.Kind.values, "all"],
+            default="all",
+            help="Which content kind to fill.",
+        )
+        parser.add_argument(
+            "--depth",
+            type=int,
+            default=CONTENT_BANK_DEPTH,
+            help="Ready items to keep per kind.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help=f"Top up to --depth even if stock is above the low watermark ({CONTENT_BANK_LOW_WATERMARK}).",
+        )
+        parser.add_argument(
+            "--watch",
+            action="store_true",
+            help="Keep running and refill whenever stock drops to the low watermark.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=300.0,
+            help="Seconds between stock checks in --watch mode.",
+        )
+
+    def handle(self, *args, **options):
+        kinds = ContentItem.Kind.values if options["kind"] == "all" else [options["kind"]]
+        try:
+            while True:
+                close_old_connections()
+                self._fill(kinds, options["depth"], options["force"])
+                if not options["watch"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.NOTICE("Content bank filler stopped."))
+
+    def _fill(self, kinds, target, force):
+        expired = content_bank.expire_stale()
+        if expired:
+            self.stdout.write(self.style.WARNING(f"Expired {expired} old item(s)."))
+
+        for kind in kinds:
+            current = content_bank.depth(kind)
+            # Hysteresis: low watermark par hi refill, tab seedha depth tak
+            if current > CONTENT_BANK_LOW_WATERMARK and not force:
+                self.stdout.write(f"📦 {kind}: {current}/{target} ready, refill ki zarurat nahi")
+                continue
+            self.stdout.write(self.style.NOTICE(f"📦 {kind}: {current}/{target} ready → refill"))
+            produced = content_bank.fill([kind], target)
+            self.stdout.write(self.style.SUCCESS(f"✅ {kind}: {produced} item(s) added, {content_bank.depth(kind)} ready"))
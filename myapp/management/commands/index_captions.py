@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from myapp import caption_index
+from myapp.models import CaptionFingerprint, ContentItem, PostRun
+
+
+class Command(BaseCommand):
+    help = "Rebuild the near-duplicate caption index from successfully posted captions."
+
+    def handle(self, *args, **options):
+        CaptionFingerprint.objects.all().delete()
+
+        # Sirf post ho chuke captions (fallback text skip)
+        posted = PostRun.objects.filter(status=PostRun.Status.SUCCESS).exclude(quote="")
+        used = ContentItem.objects.filter(status=ContentItem.Status.USED)
+        count = 0
+        for text in [*posted.values_list("quote", flat=True), *used.values_list("caption", flat=True)]:
+            if caption_index.register_posted(text):
+                count += 1
+        self.stdout.write(self.style.SUCCESS(f"✅ {count} caption(s) indexed."))
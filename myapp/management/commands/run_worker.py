@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from myapp.jobs import claim_next, keep_alive, requeue_stale
+from myapp.pipeline import execute
+
+
+class Command(BaseCommand):
+    help = "Process queued dashboard posting jobs (database-backed queue, no broker needed)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to wait when the queue is empty.",
+        )
+        parser.add_argument(
+            "--stale-minutes",
+            type=int,
+            default=30,
+            help="Requeue 'started' jobs with no heartbeat for this long (crashed worker).",
+        )
+        parser.add_argument(
+            "--heartbeat-seconds",
+            type=float,
+            default=30.0,
+            help="How often a running job refreshes its heartbeat.",
+        )
+        parser.add_argument(
+            "--sweep-seconds",
+            type=float,
+            default=60.0,
+            help="How often to look for stale jobs while the worker runs.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the queue once and exit.",
+        )
+
+    def handle(self, *args, **options):
+        poll_interval = options["poll_interval"]
+        self.stdout.write(self.style.NOTICE("👷 Worker started, waiting for jobs..."))
+
+        last_sweep = None
+        try:
+            while True:
+                close_old_connections()
+                # Stale sweep sirf startup par nahi - chalte workers ke beech mare jobs bhi wapas aayein
+                if last_sweep is None or time.monotonic() - last_sweep >= options["sweep_seconds"]:
+                    last_sweep = time.monotonic()
+                    recovered = requeue_stale(options["stale_minutes"])
+                    if recovered:
+                        self.stdout.write(self.style.WARNING(f"Recovered {recovered} stale job(s)."))
+
+                run = claim_next()
+                if run is None:
+                    if options["once"]:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+
+                self.stdout.write(f"▶ Job #{run.id} ({run.job_type}) started")
+                with keep_alive(run.id, options["heartbeat_seconds"]):
+                    run = execute(run)
+                style = self.style.SUCCESS if run.status == run.Status.SUCCESS else self.style.ERROR
+                self.stdout.write(style(f"■ Job #{run.id} finished: {run.status} {run.error_message}"))
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.NOTICE("Worker stopped."))
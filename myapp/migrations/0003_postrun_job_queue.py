@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myapp", "0002_alter_postrun_id"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="postrun",
+            name="attempts",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="postrun",
+            name="job_type",
+            field=models.CharField(
+                blank=True,
+                choices=[("reel", "Reel"), ("image", "Image"), ("tweet", "Tweet")],
+                max_length=16,
+            ),
+        ),
+        migrations.AddField(
+            model_name="postrun",
+            name="started_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="postrun",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("queued", "Queued"),
+                    ("started", "Started"),
+                    ("success", "Success"),
+                    ("failed", "Failed"),
+                    ("skipped", "Skipped"),
+                ],
+                default="started",
+                max_length=16,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="postrun",
+            index=models.Index(
+                fields=["status", "created_at"], name="myapp_postr_status_cb2626_idx"
+            ),
+        ),
+    ]
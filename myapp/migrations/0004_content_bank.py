@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myapp", "0003_postrun_job_queue"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ContentItem",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("reel", "Reel"), ("image", "Image")], max_length=16
+                    ),
+                ),
+                ("caption", models.TextField()),
+                ("media_path", models.CharField(max_length=255)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("ready", "Ready"),
+                            ("claimed", "Claimed"),
+                            ("used", "Used"),
+                            ("expired", "Expired"),
+                        ],
+                        default="ready",
+                        max_length=16,
+                    ),
+                ),
+                ("metadata", models.JSONField(blank=True, default=dict)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("expires_at", models.DateTimeField()),
+                ("claimed_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "ordering": ("created_at",),
+                "indexes": [
+                    models.Index(
+                        fields=["kind", "status", "created_at"],
+                        name="myapp_conte_kind_7d5a9f_idx",
+                    )
+                ],
+            },
+        ),
+    ]
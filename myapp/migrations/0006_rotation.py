@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myapp", "0005_caption_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RotationItem",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("topic", "Topic"), ("keyword", "Image keyword")],
+                        max_length=16,
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                ("weight", models.FloatField(default=1.0)),
+                ("enabled", models.BooleanField(default=True)),
+                ("next_due", models.FloatField(default=0.0)),
+                ("uses", models.PositiveIntegerField(default=0)),
+                ("last_used_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["kind", "enabled", "next_due"],
+                        name="myapp_rotat_kind_8c4d22_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("kind", "name"), name="unique_rotation_item"
+                    )
+                ],
+            },
+        ),
+    ]
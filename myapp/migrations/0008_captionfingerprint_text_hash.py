@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:20
+
+import hashlib
+import re
+
+from django.db import migrations, models
+
+_WORD = re.compile(r"\w+")
+
+
+def fill_text_hash(apps, schema_editor):
+    # caption_index.text_hash jaisa hi (migration app code import nahi karta)
+    CaptionFingerprint = apps.get_model("myapp", "CaptionFingerprint")
+    for fingerprint in CaptionFingerprint.objects.filter(text_hash="").only("id", "text").iterator():
+        normalized = " ".join(_WORD.findall(fingerprint.text.lower()))
+        fingerprint.text_hash = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+        fingerprint.save(update_fields=["text_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myapp", "0007_postrun_heartbeat"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="captionfingerprint",
+            name="text_hash",
+            field=models.CharField(db_index=True, default="", max_length=40),
+        ),
+        migrations.RunPython(fill_text_hash, migrations.RunPython.noop),
+    ]
@@ -9,11 +9,17 @@ class PostRun(models.Model):
         YOUTUBE = "youtube", "YouTube"
 
     class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
         STARTED = "started", "Started"
         SUCCESS = "success", "Success"
         FAILED = "failed", "Failed"
         SKIPPED = "skipped", "Skipped"
 
+    class JobType(models.TextChoices):
+        REEL = "reel", "Reel"
+        IMAGE = "image", "Image"
+        TWEET = "tweet", "Tweet"
+
     platform = models.CharField(
         max_length=32, choices=Platform.choices, default=Platform.INSTAGRAM
     )
@@ -22,13 +28,19 @@ class PostRun(models.Model):
     status = models.CharField(
         max_length=16, choices=Status.choices, default=Status.STARTED
     )
+    job_type = models.CharField(max_length=16, choices=JobType.choices, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
     error_message = models.TextField(blank=True)
     metadata = models.JSONField(blank=True, default=dict)
     created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Worker job chalate waqt isse refresh karta rehta hai; purana ho to worker mar chuka hai
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
     finished_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ("-created_at",)
+        indexes = [models.Index(fields=("status", "created_at"))]
 
     def __str__(self) -> str:
         return f"{self.platform} run ({self.status}) @ {self.created_at:%Y-%m-%d %H:%M}"
@@ -40,5 +52,94 @@ class PostRun(models.Model):
             self.Status.FAILED: "bg-red-100 text-red-700",
             self.Status.SKIPPED: "bg-yellow-100 text-yellow-700",
             self.Status.STARTED: "bg-blue-100 text-blue-700",
+            self.Status.QUEUED: "bg-purple-100 text-purple-700",
         }
         return palette.get(self.status, "bg-gray-100 text-gray-600")
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status not in (self.Status.QUEUED, self.Status.STARTED)
+
+
+class ContentItem(models.Model):
+    """Content bank: pehle se bana caption + rendered reel/image, slot par sirf upload"""
+
+    class Kind(models.TextChoices):
+        REEL = "reel", "Reel"
+        IMAGE = "image", "Image"
+
+    class Status(models.TextChoices):
+        READY = "ready", "Ready"
+        CLAIMED = "claimed", "Claimed"
+        USED = "used", "Used"
+        EXPIRED = "expired", "Expired"
+
+    kind = models.CharField(max_length=16, choices=Kind.choices)
+    caption = models.TextField()
+    media_path = models.CharField(max_length=255)
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.READY
+    )
+    metadata = models.JSONField(blank=True, default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ("created_at",)
+        indexes = [models.Index(fields=("kind", "status", "created_at"))]
+
+    def __str__(self) -> str:
+        return f"{self.kind} ({self.status}) @ {self.created_at:%Y-%m-%d %H:%M}"
+
+
+class CaptionFingerprint(models.Model):
+    """Use ho chuke caption ka MinHash signature (near-duplicate check ke liye)"""
+
+    text = models.TextField()
+    # Normalized text ka sha1 - "yeh caption pehle se indexed hai?" ek indexed lookup
+    text_hash = models.CharField(max_length=40, db_index=True, default="")
+    signature = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return self.text[:60]
+
+
+class CaptionBucket(models.Model):
+    """LSH band bucket → fingerprint; lookup ek indexed ``key IN (...)`` query hai"""
+
+    fingerprint = models.ForeignKey(
+        CaptionFingerprint, on_delete=models.CASCADE, related_name="buckets"
+    )
+    key = models.BigIntegerField(db_index=True)
+
+
+class RotationItem(models.Model):
+    """Topic / image keyword rotation (stride scheduling).
+
+    Har baar sabse chhota ``next_due`` wala item milta hai aur uska ``next_due``
+    ``1 / weight`` se aage badhta hai: equal weights par yeh least-recently-used hai,
+    weight 2 wala item do guna baar aata hai.
+    """
+
+    class Kind(models.TextChoices):
+        TOPIC = "topic", "Topic"
+        KEYWORD = "keyword", "Image keyword"
+
+    kind = models.CharField(max_length=16, choices=Kind.choices)
+    name = models.CharField(max_length=100)
+    weight = models.FloatField(default=1.0)
+    enabled = models.BooleanField(default=True)
+    next_due = models.FloatField(default=0.0)
+    uses = models.PositiveIntegerField(default=0)
+    last_used_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=("kind", "name"), name="unique_rotation_item")
+        ]
+        indexes = [models.Index(fields=("kind", "enabled", "next_due"))]
+
+    def __str__(self) -> str:
+        return f"{self.kind}: {self.name} (x{self.weight})"
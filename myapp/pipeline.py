@@ -0,0 +1,194 @@
+import os
+import time
+import traceback
+from contextlib import contextmanager
+
+from django.utils import timezone
+
+from .auto_post import (
+    create_quote_image,
+    create_reel_video,
+    gather_post_inputs,
+    next_post_topic,
+    post_instagram,
+    post_instagram_image,
+    run_workspace,
+    take_caption,
+)
+from .backgrounds import background_cache
+from .caption_index import register_posted
+from .http_utils import http_stats
+from .llm_router import groq_router
+from .models import PostRun
+from .render_cache import file_digest, render_cache
+from .twitter_utils import post_tweet
+
+
+class StageTracker:
+    """Pipeline stages ki timing ``run.metadata["stages"]`` mein likhta hai.
+
+    Har stage ke baad metadata save hoti hai, taaki ``/runs/<id>/events`` stream
+    (dusre process se) transitions live push kar sake.
+    """
+
+    def __init__(self, run: PostRun, metadata: dict):
+        self.run = run
+        self.metadata = metadata
+        self.metadata["stages"] = []
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        yield
+        self.mark(name, round((time.perf_counter() - start) * 1000))
+
+    def mark(self, name: str, duration_ms: int) -> None:
+        """Stage complete record karo (parallel stages apni duration khud dete hain)"""
+        self.metadata["stages"].append({
+            "stage": name,
+            "duration_ms": duration_ms,
+            "elapsed_ms": round((time.perf_counter() - self._started) * 1000),
+            "at": timezone.now().isoformat(),
+        })
+        self.run.metadata = self.metadata
+        self.run.save(update_fields=["metadata", "quote", "video_path"])
+
+
+# gather_post_inputs ke names → dashboard stage names
+INPUT_STAGES = {
+    "script": "script_generated",
+    "bg_image": "background_fetched",
+    "music": "music_ready",
+}
+
+
+def _saved_inputs(metadata: dict) -> dict:
+    """Pichle attempt ke chune inputs; background tabhi jab file ab bhi wahi (same digest) ho"""
+    saved = dict(metadata.get("inputs") or {})
+    bg_image = saved.pop("bg_image", None)
+    if bg_image and os.path.exists(bg_image) and file_digest(bg_image) == saved.get("bg_digest"):
+        saved["bg_image"] = bg_image
+    return saved
+
+
+def _inside(path: str, folder: str) -> bool:
+    return os.path.abspath(path).startswith(os.path.abspath(folder) + os.sep)
+
+
+def _gather_inputs(run: PostRun, workdir: str, tracker: StageTracker, with_music: bool) -> dict:
+    """Script/background/music parallel mein banao, har input ready hote hi stage event bhejo.
+
+    Chune gaye inputs ``metadata["inputs"]`` mein save hote hain; requeue/retry par wahi topic,
+    caption, background aur music seed wapas aate hain, isliye render cache hit hota hai.
+    """
+    saved = _saved_inputs(tracker.metadata)
+    # Music seed run se → retry par same track (purane runs mein seed save nahi hua tha)
+    music_seed = saved.get("music_seed") or f"run-{run.id}"
+    # Caption aur background ek hi topic se (retry par bhi wahi)
+    topic = saved.get("topic") or next_post_topic()
+    chosen = tracker.metadata["inputs"] = {"topic": topic, "music_seed": music_seed}
+
+    def on_ready(name, value, duration_ms):
+        if name == "script":
+            run.quote = value
+            chosen["script"] = value
+        elif name == "bg_image" and value and not _inside(value, workdir):
+            # Workspace wali file run ke saath delete hoti hai - uska path save karna bekaar
+            chosen.update(bg_image=value, bg_digest=file_digest(value))
+        tracker.mark(INPUT_STAGES[name], duration_ms)
+
+    known = {name: saved[name] for name in ("script", "bg_image") if saved.get(name)}
+    return gather_post_inputs(workdir, with_music=with_music, music_seed=music_seed,
+                              on_ready=on_ready, known=known, topic=topic)
+
+
+def _reel(run: PostRun, metadata: dict, tracker: StageTracker) -> None:
+    # Har run ka apna workspace - parallel jobs ek dusre ki files overwrite nahi karenge
+    with run_workspace() as workdir:
+        # Step 1: Tech content + background + music ek saath
+        inputs = _gather_inputs(run, workdir, tracker, with_music=True)
+
+        # Step 2: Create video
+        with tracker.stage("rendered"):
+            video_path = create_reel_video(inputs["script"], workdir=workdir,
+                                           bg_image_path=inputs["bg_image"], audio_path=inputs["music"])
+            if not video_path:
+                raise Exception("Video generation failed; check logs.")
+            # video_path store nahi hota: file workspace ke saath delete ho jati hai
+            metadata["render_cache"] = render_cache.stats()
+            metadata["background_cache"] = background_cache.stats()
+
+        # Step 3: Post to Instagram
+        with tracker.stage("uploaded"):
+            result = post_instagram(video_path)
+            if not result.get("ok"):
+                raise Exception(f"Instagram post failed: {result.get('error', 'Unknown error')}")
+    metadata["message"] = "Instagram post successful"
+
+
+def _image(run: PostRun, metadata: dict, tracker: StageTracker) -> None:
+    with run_workspace() as workdir:
+        # Step 1: Tech content + background ek saath (image post mein music nahi)
+        inputs = _gather_inputs(run, workdir, tracker, with_music=False)
+        quote = inputs["script"]
+
+        with tracker.stage("rendered"):
+            image_path = create_quote_image(quote, workdir=workdir, bg_image_path=inputs["bg_image"])
+            metadata["render_cache"] = render_cache.stats()
+            metadata["background_cache"] = background_cache.stats()
+
+        # Step 2: Sirf image ke saath Instagram post
+        with tracker.stage("uploaded"):
+            result = post_instagram_image(quote, image_path=image_path, workdir=workdir)
+            if not result.get("ok"):
+                raise Exception(f"Instagram image post failed: {result.get('error', 'Unknown error')}")
+    metadata["message"] = "Instagram image post successful"
+
+
+def _tweet(run: PostRun, metadata: dict, tracker: StageTracker) -> None:
+    # Generate tech content
+    with tracker.stage("script_generated"):
+        quote = take_caption()
+        run.quote = quote
+
+    # Post to Twitter
+    with tracker.stage("uploaded"):
+        result = post_tweet(quote)
+        if not result["success"]:
+            raise Exception(f"Twitter post failed: {result.get('error', 'Unknown error')}")
+    metadata["tweet_id"] = result.get("tweet_id")
+    metadata["message"] = "Tweet posted successfully"
+
+
+PIPELINES = {
+    PostRun.JobType.REEL: _reel,
+    PostRun.JobType.IMAGE: _image,
+    PostRun.JobType.TWEET: _tweet,
+}
+
+
+def execute(run: PostRun) -> PostRun:
+    """Claimed PostRun ka pipeline chalao aur final status/metadata save karo"""
+    metadata = dict(run.metadata or {})
+    tracker = StageTracker(run, metadata)
+    try:
+        pipeline = PIPELINES.get(run.job_type)
+        if pipeline is None:
+            raise Exception(f"Unknown job type '{run.job_type}'")
+        pipeline(run, metadata, tracker)
+        run.status = PostRun.Status.SUCCESS
+        run.error_message = ""
+        # Sirf post ho chuka caption dedupe index mein (fail runs ke nahi)
+        register_posted(run.quote)
+    except Exception as exc:
+        run.status = PostRun.Status.FAILED
+        run.error_message = str(exc)
+        metadata["traceback"] = traceback.format_exc()
+    finally:
+        metadata["http"] = http_stats()
+        metadata["llm"] = groq_router.stats()
+        run.metadata = metadata
+        run.finished_at = timezone.now()
+        run.save()
+    return run
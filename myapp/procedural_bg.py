@@ -0,0 +1,130 @@
+import numpy as np
+
+# (dark base, mid tone, accent) - dark rakhe hain taaki white text readable rahe
+PALETTES = [
+    ((10, 14, 30), (28, 44, 88), (0, 200, 255)),     # midnight blue + cyan
+    ((12, 12, 16), (40, 24, 70), (170, 90, 255)),    # charcoal + purple
+    ((6, 20, 18), (16, 60, 52), (0, 230, 150)),      # terminal green
+    ((24, 10, 14), (70, 24, 40), (255, 90, 120)),    # crimson
+    ((14, 16, 20), (44, 52, 64), (255, 170, 40)),    # slate + amber
+]
+PATTERNS = ("grid", "circuit", "dots", "diagonal", "none")
+
+
+def _interp_weights(size: int, points: int) -> np.ndarray:
+    """``size x points`` matrix: har pixel ke liye do nearest grid points ke smoothstep weights"""
+    pos = np.linspace(0, points - 1, size, endpoint=False, dtype=np.float32)
+    left = pos.astype(np.int32)
+    t = pos - left
+    t = t * t * (3 - 2 * t)
+    weights = np.zeros((size, points), dtype=np.float32)
+    rows = np.arange(size)
+    weights[rows, left] = 1 - t
+    weights[rows, left + 1] = t
+    return weights
+
+
+def _upsample(height: int, width: int, grids: list[tuple[np.ndarray, float]]) -> np.ndarray:
+    """Kai coarse grids ka weighted sum full size par: sum(w x Wy @ grid @ Wx.T).
+
+    Sab grids ek block-diagonal matrix mein → poore frame ke liye sirf do matrix multiply.
+    """
+    rows = [_interp_weights(height, grid.shape[0]) * weight for grid, weight in grids]
+    cols = [_interp_weights(width, grid.shape[1]) for grid, _ in grids]
+    block = np.zeros((sum(r.shape[1] for r in rows), sum(c.shape[1] for c in cols)), dtype=np.float32)
+    y = x = 0
+    for grid, _ in grids:
+        block[y:y + grid.shape[0], x:x + grid.shape[1]] = grid
+        y, x = y + grid.shape[0], x + grid.shape[1]
+    return (np.hstack(rows) @ block) @ np.hstack(cols).T
+
+
+def _noise_grids(rng: np.random.Generator, height: int, width: int, octaves: int = 4) -> list:
+    """Fractal value noise ke octaves (har octave double cells, half amplitude) → [0, 1]"""
+    grids, amplitude, cells = [], 1.0, 3
+    norm = sum(0.5 ** i for i in range(octaves))
+    for _ in range(octaves):
+        grid_w = max(int(cells * width / height), 1) + 1
+        grids.append((rng.random((cells + 1, grid_w), dtype=np.float32), amplitude / norm))
+        amplitude *= 0.5
+        cells *= 2
+    return grids
+
+
+def _gradient_grid(rng: np.random.Generator, height: int, width: int) -> np.ndarray:
+    """Random angle ka linear gradient [0, 1] (2x2 corners; bilinear se exact linear)"""
+    angle = rng.uniform(0, 2 * np.pi)
+    ys, xs = np.array([-0.5, 0.5]) * (height / width), np.array([-0.5, 0.5])
+    t = xs[None, :] * np.cos(angle) + ys[:, None] * np.sin(angle)
+    return ((t - t.min()) / max(float(t.max() - t.min()), 1e-6)).astype(np.float32)
+
+
+def _glow_grid(rng: np.random.Generator, height: int, width: int, cells: int = 24) -> np.ndarray:
+    """Ek random jagah se radial glow [0, 1], coarse grid par (smooth hai, upsample se farq nahi)"""
+    grid_w = max(int(cells * width / height), 1)
+    cy, cx = rng.uniform(0.1, 0.9) * cells, rng.uniform(0.1, 0.9) * grid_w
+    radius = rng.uniform(0.35, 0.7) * max(cells, grid_w)
+    yy = (np.arange(cells + 1, dtype=np.float32)[:, None] - cy) ** 2
+    xx = (np.arange(grid_w + 1, dtype=np.float32)[None, :] - cx) ** 2
+    glow = np.clip(1 - np.sqrt(yy + xx) / radius, 0, 1)
+    return glow * glow
+
+
+def _pattern(rng: np.random.Generator, height: int, width: int, kind: str) -> np.ndarray:
+    """Geometric tech pattern ka mask [0, 1] (lines/dots = 1)"""
+    yy = np.arange(height, dtype=np.int32)[:, None]
+    xx = np.arange(width, dtype=np.int32)[None, :]
+    step = int(rng.integers(48, 110))
+    if kind == "grid":
+        return ((yy % step < 2) | (xx % step < 2)).astype(np.float32)
+    if kind == "dots":
+        dy, dx = yy % step - step // 2, xx % step - step // 2
+        return (dy * dy + dx * dx <= 9).astype(np.float32)
+    if kind == "diagonal":
+        return ((xx + yy) % step < 3).astype(np.float32)
+    if kind == "circuit":
+        # Coarse grid ke cells mein random horizontal/vertical traces + cell corners par nodes
+        rows, cols = -(-height // step), -(-width // step)
+        horizontal = rng.random((rows, cols)) < 0.35
+        vertical = rng.random((rows, cols)) < 0.35
+        nodes = rng.random((rows, cols)) < 0.15
+        cell_y, cell_x = yy // step, xx // step
+        off_y, off_x = yy % step, xx % step
+        on_h = horizontal[cell_y, cell_x] & (off_y < 3)
+        on_v = vertical[cell_y, cell_x] & (off_x < 3)
+        on_node = nodes[cell_y, cell_x] & ((off_y - 1) ** 2 + (off_x - 1) ** 2 <= 36)
+        return (on_h | on_v | on_node).astype(np.float32)
+    return np.zeros((height, width), dtype=np.float32)
+
+
+def generate_background(width: int = 1080, height: int = 1920, seed: int | None = None,
+                        pattern: str | None = None) -> tuple[np.ndarray, int]:
+    """Procedural tech background (RGB uint8 array) → ``(pixels, seed)``.
+
+    Gradient + glow + fractal noise + geometric pattern, sab NumPy arrays par (per-pixel
+    Python loop ya ImageDraw calls nahi). Same ``seed`` (aur size) → same image; ``None`` par random seed.
+    """
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy % (2 ** 32))
+    rng = np.random.default_rng(seed)
+    dark, mid, accent = (np.array(c, dtype=np.float32) for c in PALETTES[rng.integers(len(PALETTES))])
+    pattern = pattern or PATTERNS[rng.integers(len(PATTERNS))]
+
+    # Smooth fields coarse grids se: base = 70% gradient + 30% fractal noise, glow alag (accent color)
+    base = _upsample(height, width, [(_gradient_grid(rng, height, width), 0.7)]
+                     + [(grid, weight * 0.3) for grid, weight in _noise_grids(rng, height, width)])
+    glow = _upsample(height, width, [(_glow_grid(rng, height, width), 0.35)])
+    glow += _pattern(rng, height, width, pattern) * rng.uniform(0.12, 0.22)
+
+    # color = dark + base x (mid - dark) + glow x accent: dono fields 8-bit quantize karke ek
+    # 256x256 palette LUT se lookup (har pixel par 3-channel float math nahi)
+    levels = np.linspace(0, 1, 256, dtype=np.float32)
+    lut = dark + levels[:, None, None] * (mid - dark) + levels[None, :, None] * accent
+    lut = np.clip(lut, 0, 255).astype(np.uint8).reshape(-1, 3)
+    # Halka grain (dither) taaki JPEG mein gradient banding na dikhe
+    base *= 255
+    base += rng.random((height, width), dtype=np.float32) * 24 - 12
+    index = np.clip(base, 0, 255).astype(np.uint16)
+    index <<= 8
+    index |= np.clip(glow * 255, 0, 255).astype(np.uint16)
+    return np.take(lut, index, axis=0), seed
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+
+from myapp.config import PROVIDER_FAILURE_FILE, PROVIDER_FAILURE_TTL_SECONDS
+
+# Providers jinke credential/config failures cache hote hain
+GROQ = "groq"
+UNSPLASH = "unsplash"
+INSTAGRAM = "instagram"
+TWITTER = "twitter"
+
+_lock = threading.Lock()
+
+
+def credential_fingerprint(*parts: str | None) -> str:
+    """Credentials ka short hash - key badli to purani failure apne aap ignore"""
+    joined = "\x00".join(part or "" for part in parts)
+    return hashlib.sha256(joined.encode("utf-8")).hexdigest()[:12]
+
+
+def _load() -> dict:
+    try:
+        with open(PROVIDER_FAILURE_FILE, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save(data: dict) -> None:
+    # Temp file + rename: scheduler, worker aur web process kabhi aadhi file nahi padhenge
+    directory = os.path.dirname(os.path.abspath(PROVIDER_FAILURE_FILE))
+    tmp_path = os.path.join(directory, f".{os.path.basename(PROVIDER_FAILURE_FILE)}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, PROVIDER_FAILURE_FILE)
+    except OSError as e:
+        print(f"⚠️ Provider failure cache save nahi ho paya: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def record_failure(provider: str, reason: str, credential: str = "",
+                   ttl: int = PROVIDER_FAILURE_TTL_SECONDS) -> None:
+    """Provider ko ``ttl`` seconds ke liye skip list mein daalo (reason ke saath)"""
+    now = time.time()
+    with _lock:
+        data = _load()
+        data[provider] = {
+            "reason": reason[:300],
+            "credential": credential,
+            "failed_at": now,
+            "expires_at": now + ttl,
+        }
+        _save(data)
+    print(f"🚫 {provider} {ttl // 60} min ke liye skip: {reason[:120]}")
+
+
+def blocked(provider: str, credential: str = "") -> str | None:
+    """Provider abhi skip list mein hai to reason, warna None"""
+    entry = _load().get(provider)
+    if not entry or entry.get("expires_at", 0) <= time.time():
+        return None
+    if entry.get("credential", "") != credential:
+        # Credentials badal gaye → nayi key ko ek chance do
+        return None
+    return entry.get("reason") or "unknown failure"
+
+
+def clear(provider: str) -> None:
+    """Provider successful raha → cache entry hatao"""
+    with _lock:
+        data = _load()
+        if data.pop(provider, None) is not None:
+            _save(data)
+
+
+def snapshot() -> list[dict]:
+    """Dashboard ke liye active (unexpired) entries"""
+    now = time.time()
+    entries = []
+    for provider, entry in sorted(_load().items()):
+        expires_at = entry.get("expires_at", 0)
+        if expires_at <= now:
+            continue
+        entries.append({
+            "provider": provider,
+            "reason": entry.get("reason", ""),
+            "failed_at": entry.get("failed_at"),
+            "expires_in": int(expires_at - now),
+        })
+    return entries
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+from myapp.config import RENDER_CACHE_DIR, RENDER_CACHE_MAX_MB
+
+
+# Itni der se untouched .tmp/.part file kisi crashed writer ki hai (likhte waqt mtime badalta rehta hai)
+TEMP_GRACE_SECONDS = 10 * 60
+
+# (path, mtime, size) → sha256: ek render mein same background ke kai cache keys banti hain
+_digests = {}
+_digests_lock = threading.Lock()
+
+
+def file_digest(path: str | None) -> str:
+    """File content ka sha256 (missing/None path ke liye empty string)"""
+    if not path:
+        return ""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return ""
+    memo_key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    with _digests_lock:
+        cached = _digests.get(memo_key)
+    if cached:
+        return cached
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(chunk)
+    with _digests_lock:
+        if len(_digests) > 1024:
+            _digests.clear()
+        _digests[memo_key] = digest.hexdigest()
+    return _digests[memo_key]
+
+
+def make_key(kind: str, **params) -> str:
+    """Render inputs (text, asset digests, render params) se stable cache key banao"""
+    payload = json.dumps({"kind": kind, **params}, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class FileLRUCache:
+    """Content-addressed file cache, total size ``max_bytes`` tak (LRU eviction).
+
+    Recency file ke mtime mein rakhi jati hai, isliye gunicorn workers aur
+    scheduler process ek hi directory share kar sakte hain.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _path(self, key: str, ext: str) -> str:
+        return os.path.join(self.directory, f"{key}{ext}")
+
+    def get(self, key: str, ext: str) -> str | None:
+        path = self._path(key, ext)
+        hit = os.path.exists(path)
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        self._local.last = "hit" if hit else "miss"
+        if not hit:
+            return None
+        try:
+            os.utime(path)  # LRU: recently used
+        except OSError:
+            return None
+        return path
+
+    def fetch(self, key: str, ext: str, dest: str) -> bool:
+        """Cache hit ho to cached file ``dest`` par copy karo"""
+        cached = self.get(key, ext)
+        if not cached:
+            return False
+        try:
+            shutil.copyfile(cached, dest)
+            return True
+        except OSError:
+            return False
+
+    def put(self, key: str, src: str, ext: str, move: bool = False) -> str | None:
+        """Rendered file cache mein atomically store karo, phir size limit tak evict
+
+        ``move=True``: ``src`` (same filesystem par temp file) copy ki jagah rename hoti hai.
+        """
+        if self.max_bytes <= 0 or not os.path.exists(src):
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key, ext)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            if move:
+                os.replace(src, path)
+            else:
+                shutil.copyfile(src, tmp_path)
+                os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Render cache store fail: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+        self.evict()
+        return path
+
+    def evict(self) -> None:
+        entries = []
+        total = 0
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        stale_before = time.time() - TEMP_GRACE_SECONDS
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            total += st.st_size
+            if name.endswith((".tmp", ".part")):
+                # Aadhe likhe files: store/download chal raha ho to chhodo, crash ka bacha hua ho to hatao
+                if st.st_mtime < stale_before:
+                    try:
+                        os.remove(path)
+                        total -= st.st_size
+                    except OSError:
+                        pass
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+
+        entries.sort()  # oldest (least recently used) pehle
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        """Hit/miss counters + current thread ka last lookup result (PostRun.metadata ke liye)"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "last": getattr(self._local, "last", None),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            }
+
+
+render_cache = FileLRUCache(RENDER_CACHE_DIR, RENDER_CACHE_MAX_MB * 1024 * 1024)
@@ -0,0 +1,71 @@
+import random
+
+from django.db import DatabaseError
+from django.db.models import F, Min
+from django.utils import timezone
+
+from .models import RotationItem
+
+# Har process mein code ki lists ek baar DB se sync hoti hain
+_synced = set()
+
+
+def _sync(kind: str, names: list[str]) -> None:
+    if kind in _synced:
+        return
+    existing = set(RotationItem.objects.filter(kind=kind).values_list("name", flat=True))
+    missing = [name for name in dict.fromkeys(names) if name not in existing]
+    if missing:
+        # Naye items current minimum se start → turant rotation mein, baaki ko skip nahi karte
+        floor = RotationItem.objects.filter(kind=kind).aggregate(m=Min("next_due"))["m"] or 0.0
+        RotationItem.objects.bulk_create(
+            [RotationItem(kind=kind, name=name, next_due=floor) for name in missing],
+            ignore_conflicts=True,
+        )
+    _synced.add(kind)
+
+
+def _take(kind: str) -> str | None:
+    queue = RotationItem.objects.filter(kind=kind, enabled=True)
+    for _ in range(5):
+        item = queue.order_by("next_due", "id").only("id", "name", "weight", "next_due").first()
+        if item is None:
+            return None
+        # Compare-and-swap: dusra process same item le chuka ho to agla try karo
+        advanced = queue.filter(id=item.id, next_due=item.next_due).update(
+            next_due=item.next_due + 1.0 / max(item.weight, 0.01),
+            uses=F("uses") + 1,
+            last_used_at=timezone.now(),
+        )
+        if advanced:
+            return item.name
+    return None
+
+
+def pick(kind: str, names: list[str], count: int = 1) -> list[str]:
+    """Rotation se ``count`` items; DB ready na ho to ``names`` se random"""
+    fallback = random.sample(names, min(count, len(names)))
+    try:
+        _sync(kind, names)
+        picked = [name for name in (_take(kind) for _ in range(count)) if name]
+    except DatabaseError as e:
+        # e.g. migrations abhi apply nahi hue
+        print(f"⚠️ Rotation DB error ({e}) → random choice")
+        return fallback
+    return picked or fallback
+
+
+def next_topic(topics: list[str]) -> str:
+    return pick(RotationItem.Kind.TOPIC, topics)[0]
+
+
+def next_topics(topics: list[str], count: int) -> list[str]:
+    return pick(RotationItem.Kind.TOPIC, topics, count)
+
+
+def next_keyword(keywords: list[str]) -> str:
+    return pick(RotationItem.Kind.KEYWORD, keywords)[0]
+
+
+def next_keywords(keywords: list[str], count: int) -> list[str]:
+    return pick(RotationItem.Kind.KEYWORD, keywords, count)
@@ -1,5 +1,1393 @@
-from instagrapi import Client
-from myapp.config import INSTAGRAM_USERNAME, INSTAGRAM_PASSWORD
-cl = Client()
-cl.login(INSTAGRAM_USERNAME, INSTAGRAM_PASSWORD)
-print("Login OK")
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+from unittest import mock
+
+import moviepy.config as mpconfig
+import numpy as np
+import requests
+import tweepy
+from instagrapi.exceptions import BadPassword, LoginRequired
+from PIL import Image
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+from urllib3._collections import HTTPHeaderDict
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+from datetime import timedelta
+
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from myapp import (
+    auto_post,
+    backgrounds,
+    caption_index,
+    content_bank,
+    http_replay,
+    image_pool,
+    instagram_session,
+    jobs,
+    llm_router,
+    pipeline,
+    procedural_bg,
+    provider_health,
+    rotation,
+    twitter_utils,
+)
+from myapp.auto_post import (
+    CaptionFormatter,
+    artifact_path,
+    encode_still_video,
+    fallback_caption,
+    generate_background_music,
+    generate_tech_script,
+    generate_tech_scripts_batch,
+)
+from myapp.http_utils import DownloadTooLarge, download_session, download_to_file, http_session
+from myapp.models import CaptionFingerprint, ContentItem, PostRun, RotationItem
+from myapp import image_utils
+from myapp.image_utils import (
+    QUOTE_SIZE,
+    REEL_WIDTH,
+    OverlayTemplate,
+    compose_quote_frame,
+    decode_scaled,
+    fit_text,
+    load_font,
+    quote_decode_size,
+    reel_decode_size,
+    register_template,
+    wrap_text,
+)
+from myapp.render_cache import TEMP_GRACE_SECONDS, FileLRUCache, make_key
+
+
+class CaptionFormatterTests(SimpleTestCase):
+    def test_splits_on_all_sentence_terminators(self):
+        formatter = CaptionFormatter("Docker")
+        formatter.update("Docker kya hai? Containers fast hain! Image chhoti rakho. Aur\nmulti-stage use karo")
+        self.assertEqual(formatter.finish().split("\n"), [
+            "💡 Docker kya hai?",
+            "🔹 Containers fast hain!",
+            "🔹 Image chhoti rakho",
+            "🔹 Aur",
+            "🔹 multi-stage use karo",
+        ])
+
+    def test_hindi_danda_ends_sentence(self):
+        formatter = CaptionFormatter("Linux")
+        formatter.update("Linux seekho। Terminal se dosti karo।")
+        self.assertEqual(formatter.finish(), "💡 Linux seekho\n🔹 Terminal se dosti karo।")
+
+    def test_streaming_stops_after_min_words_on_question_mark(self):
+        formatter = CaptionFormatter("Python", min_words=4)
+        self.assertFalse(formatter.update("Python mein list"))
+        self.assertFalse(formatter.update("Python mein list comprehension kya hai?"))
+        # Terminator ke baad whitespace aate hi sentence poora
+        self.assertTrue(formatter.update("Python mein list comprehension kya hai? Ye"))
+        self.assertEqual(formatter.finish(), "💡 Python mein list comprehension kya hai?")
+
+    def test_failover_text_resets_lines(self):
+        formatter = CaptionFormatter("Git", min_words=50)
+        formatter.update("Pehla model. Aadha")
+        formatter.update("Dusra model ka jawab! Poora")
+        self.assertEqual(formatter.finish(), "Git: 💡 Dusra model ka jawab!\n🔹 Poora")
+
+
+class StreamingHedgeTests(SimpleTestCase):
+    def _router(self):
+        router = llm_router.ModelRouter(["a", "b"], hedge=True)
+        for model in ("a", "b"):
+            for _ in range(5):
+                router._success(model, 50.0)
+        return router
+
+    def test_slow_primary_stream_loses_to_hedge(self):
+        router = self._router()
+        fed = []
+
+        def fake_call(model, body, timeout, record_latency=True, stop_when=None):
+            if model == "a":
+                time.sleep(0.3)
+            stop_when(f"{model} ka jawab.")
+            return model, f"{model} ka jawab."
+
+        def stop_when(text):
+            fed.append(text)
+            return True
+
+        with mock.patch.object(llm_router.provider_health, "blocked", return_value=None), \
+                mock.patch.object(router, "_call", side_effect=fake_call):
+            self.assertEqual(router.complete({"messages": []}, stop_when=stop_when), ("b", "b ka jawab."))
+        time.sleep(0.4)  # primary thread bhi khatam ho
+        self.assertEqual(fed, ["b ka jawab."])
+
+
+class CaptionRegistrationTests(TestCase):
+    POSTED = "💡 Docker images ko chhota rakho - multi-stage builds se final image mein sirf runtime files jati hain"
+
+    def test_generated_caption_is_not_indexed_until_posted(self):
+        caption = caption_index.unique_caption(lambda: self.POSTED)
+        self.assertEqual(caption, self.POSTED)
+        self.assertFalse(CaptionFingerprint.objects.exists())
+        caption_index.register_posted(caption)
+        caption_index.register_posted(caption)  # dobara post/mark_used → duplicate row nahi
+        self.assertEqual(CaptionFingerprint.objects.count(), 1)
+
+    def test_fallback_caption_is_never_indexed_or_regenerated(self):
+        fallback = fallback_caption("Docker")
+        self.assertIsNone(caption_index.register_posted(fallback))
+        calls = []
+
+        def generate():
+            calls.append(1)
+            return fallback
+
+        self.assertEqual(caption_index.unique_caption(generate), fallback)
+        self.assertEqual(len(calls), 1)
+
+    def test_duplicate_of_posted_caption_is_regenerated(self):
+        caption_index.register_posted(self.POSTED)
+        fresh = "🔹 Git rebase se history linear rehti hai, lekin shared branches par force push mat karo"
+        captions = iter([self.POSTED + "!", fresh])
+        self.assertEqual(caption_index.unique_caption(lambda: next(captions)), fresh)
+
+
+class ArtifactPathTests(SimpleTestCase):
+    def test_shared_folder_artifacts_expire(self):
+        with tempfile.TemporaryDirectory() as folder:
+            old = os.path.join(folder, "reel_0123456789ab.mp4")
+            keep = os.path.join(folder, "bg.jpg")
+            for path in (old, keep):
+                open(path, "wb").close()
+                os.utime(path, (time.time() - 48 * 3600,) * 2)
+
+            fresh = artifact_path(None, folder, "reel.mp4")
+
+            self.assertFalse(os.path.exists(old))
+            self.assertTrue(os.path.exists(keep))
+            self.assertRegex(os.path.basename(fresh), r"^reel_[0-9a-f]{12}\.mp4$")
+
+
+class _FakeResponse:
+    def __init__(self, status_code, chunks, headers=None, fail_after=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._chunks = chunks
+        self._fail_after = fail_after
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def iter_content(self, chunk_size):
+        for index, chunk in enumerate(self._chunks):
+            if self._fail_after is not None and index >= self._fail_after:
+                raise requests.exceptions.ChunkedEncodingError("connection reset")
+            yield chunk
+
+
+class _FakeSession:
+    """Har ``get`` par agla scripted response; bheje gaye Range headers note karta hai"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.ranges = []
+
+    def get(self, url, stream, timeout, headers):
+        self.ranges.append(headers.get("Range"))
+        return self.responses.pop(0)
+
+
+class DownloadToFileTests(SimpleTestCase):
+    BODY = [b"a" * 10, b"b" * 10, b"c" * 10]
+
+    def _download(self, session, **kwargs):
+        folder = tempfile.mkdtemp()
+        path = os.path.join(folder, "img.jpg")
+        digest = download_to_file("https://example.com/img.jpg", path, session=session, **kwargs)
+        with open(path, "rb") as fh:
+            content = fh.read()
+        self.assertEqual(os.listdir(folder), ["img.jpg"])  # .part file nahi bachi
+        return digest, content
+
+    def test_mismatched_content_range_restarts_from_zero(self):
+        session = _FakeSession(
+            _FakeResponse(200, self.BODY, fail_after=2),
+            _FakeResponse(206, [b"x" * 5], {"Content-Range": "bytes 5-9/30"}),
+            _FakeResponse(200, self.BODY),
+        )
+        digest, content = self._download(session)
+        self.assertEqual(session.ranges, [None, "bytes=20-", None])
+        self.assertEqual(content, b"".join(self.BODY))
+        self.assertEqual(digest, hashlib.sha256(content).hexdigest())
+
+    def test_resumes_with_range_after_connection_drop(self):
+        session = _FakeSession(
+            _FakeResponse(200, self.BODY, {"Content-Length": "30"}, fail_after=2),
+            _FakeResponse(206, [b"c" * 10], {"Content-Range": "bytes 20-29/30", "Content-Length": "10"}),
+        )
+        digest, content = self._download(session)
+        self.assertEqual(session.ranges, [None, "bytes=20-"])
+        self.assertEqual(content, b"".join(self.BODY))
+        self.assertEqual(digest, hashlib.sha256(content).hexdigest())
+
+    def test_declared_size_over_cap_aborts_before_writing(self):
+        folder = tempfile.mkdtemp()
+        session = _FakeSession(_FakeResponse(200, self.BODY, {"Content-Length": "30"}))
+        with self.assertRaises(DownloadTooLarge):
+            download_to_file("https://example.com/img.jpg", os.path.join(folder, "img.jpg"),
+                             session=session, max_bytes=25)
+        self.assertEqual(os.listdir(folder), [])
+
+    def test_streamed_size_over_cap_aborts(self):
+        # Content-Length na ho (chunked) to bhi cap stream ke dauraan lagta hai
+        folder = tempfile.mkdtemp()
+        session = _FakeSession(_FakeResponse(200, self.BODY))
+        with self.assertRaises(DownloadTooLarge):
+            download_to_file("https://example.com/img.jpg", os.path.join(folder, "img.jpg"),
+                             session=session, max_bytes=25)
+        self.assertEqual(os.listdir(folder), [])
+
+
+class DownloadRetryTests(SimpleTestCase):
+    def test_download_session_has_no_urllib3_retries(self):
+        retries = download_session.get_adapter("https://images.unsplash.com/").max_retries
+        self.assertEqual((retries.total, retries.connect, retries.read), (0, 0, 0))
+        self.assertGreater(http_session.get_adapter("https://api.unsplash.com/").max_retries.total, 0)
+
+    def test_bad_host_costs_one_connection_per_attempt(self):
+        server = socket.socket()
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+        server.settimeout(5)
+        accepted = []
+
+        def serve():
+            # Har connection accept karke bina response band → client ko RemoteDisconnected
+            try:
+                while True:
+                    conn, _ = server.accept()
+                    accepted.append(conn)
+                    conn.close()
+            except OSError:
+                pass
+
+        thread = threading.Thread(target=serve, daemon=True)
+        thread.start()
+        folder = tempfile.mkdtemp()
+        try:
+            with self.assertRaises(requests.ConnectionError):
+                download_to_file(f"http://127.0.0.1:{server.getsockname()[1]}/img.jpg",
+                                 os.path.join(folder, "img.jpg"), timeout=2, attempts=3)
+        finally:
+            server.close()
+            thread.join(timeout=5)
+        self.assertEqual(len(accepted), 3)
+
+    def test_server_error_is_retried_by_the_download_loop(self):
+        session = _FakeSession(_FakeResponse(503, []), _FakeResponse(200, [b"ok"]))
+        folder = tempfile.mkdtemp()
+        with mock.patch("myapp.http_utils.time.sleep") as sleep:
+            digest = download_to_file("https://example.com/img.jpg", os.path.join(folder, "img.jpg"),
+                                      session=session)
+        self.assertEqual(digest, hashlib.sha256(b"ok").hexdigest())
+        self.assertEqual(sleep.call_count, 1)
+
+
+class FileLRUCacheTempFileTests(SimpleTestCase):
+    def test_stale_temp_files_are_evicted(self):
+        with tempfile.TemporaryDirectory() as folder:
+            cache = FileLRUCache(folder, max_bytes=1024)
+            stale = os.path.join(folder, "abc.jpg.1234.part")
+            active = os.path.join(folder, "def.jpg.5678.tmp")
+            for path in (stale, active):
+                with open(path, "wb") as fh:
+                    fh.write(b"x" * 10)
+            old = time.time() - TEMP_GRACE_SECONDS - 60
+            os.utime(stale, (old, old))
+
+            cache.evict()
+
+            self.assertFalse(os.path.exists(stale))
+            self.assertTrue(os.path.exists(active))
+
+    def test_active_temp_files_count_towards_size_cap(self):
+        with tempfile.TemporaryDirectory() as folder:
+            cache = FileLRUCache(folder, max_bytes=100)
+            with open(os.path.join(folder, "big.mp4.1234.tmp"), "wb") as fh:
+                fh.write(b"x" * 80)
+            entry = os.path.join(folder, "key.jpg")
+            with open(entry, "wb") as fh:
+                fh.write(b"y" * 40)
+
+            cache.evict()
+
+            self.assertFalse(os.path.exists(entry))
+
+
+class RenderCacheTests(SimpleTestCase):
+    def _write(self, path, data):
+        with open(path, "wb") as fh:
+            fh.write(data)
+        return path
+
+    def test_make_key_depends_on_params_not_their_order(self):
+        self.assertEqual(make_key("quote", text="a", bg="d1"), make_key("quote", bg="d1", text="a"))
+        self.assertNotEqual(make_key("quote", text="a", bg="d1"), make_key("quote", text="a", bg="d2"))
+        self.assertNotEqual(make_key("quote", text="a"), make_key("reel", text="a"))
+
+    def test_put_then_fetch_copies_the_cached_render(self):
+        with tempfile.TemporaryDirectory() as folder:
+            cache = FileLRUCache(os.path.join(folder, "cache"), max_bytes=1024)
+            dest = os.path.join(folder, "out.jpg")
+            self.assertFalse(cache.fetch("k", ".jpg", dest))
+
+            cache.put("k", self._write(os.path.join(folder, "render.jpg"), b"frame"), ".jpg")
+
+            self.assertTrue(cache.fetch("k", ".jpg", dest))
+            with open(dest, "rb") as fh:
+                self.assertEqual(fh.read(), b"frame")
+            self.assertEqual(cache.stats()["hits"], 1)
+            self.assertEqual(cache.stats()["misses"], 1)
+            self.assertEqual(cache.stats()["last"], "hit")
+
+    def test_least_recently_used_entry_is_evicted_first(self):
+        with tempfile.TemporaryDirectory() as folder:
+            cache = FileLRUCache(os.path.join(folder, "cache"), max_bytes=100)
+            src = self._write(os.path.join(folder, "render.jpg"), b"x" * 40)
+            old, used = cache.put("old", src, ".jpg"), cache.put("used", src, ".jpg")
+            past = time.time() - 60
+            for path in (old, used):
+                os.utime(path, (past, past))
+            cache.get("used", ".jpg")  # ab "old" sabse purana
+
+            cache.put("new", src, ".jpg")
+
+            self.assertFalse(os.path.exists(old))
+            self.assertTrue(os.path.exists(used))
+            self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_same_quote_and_background_renders_once(self):
+        with tempfile.TemporaryDirectory() as folder:
+            bg = os.path.join(folder, "bg.jpg")
+            Image.new("RGB", (64, 80), (20, 30, 40)).save(bg)
+            cache = FileLRUCache(os.path.join(folder, "cache"), max_bytes=10 * 1024 * 1024)
+            compose = mock.Mock(return_value=np.zeros((80, 64, 3), dtype=np.uint8))
+            with mock.patch("myapp.auto_post.render_cache", cache), \
+                    mock.patch("myapp.auto_post.load_background", side_effect=lambda path, kind: Image.open(path)), \
+                    mock.patch("myapp.auto_post.compose_quote_frame", compose):
+                first = auto_post._render_quote_image("Cache me", folder, os.path.join(folder, "a.jpg"), bg)
+                second = auto_post._render_quote_image("Cache me", folder, os.path.join(folder, "b.jpg"), bg)
+            self.assertTrue(os.path.exists(first) and os.path.exists(second))
+            self.assertEqual(compose.call_count, 1)
+            self.assertEqual(cache.stats()["hits"], 1)
+
+
+class BackgroundCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.cache = FileLRUCache(os.path.join(self.folder, "bg"), max_bytes=50 * 1024 * 1024)
+        for target, value in (("myapp.backgrounds.background_cache", self.cache),
+                              ("myapp.backgrounds.BG_CACHE_DIR", self.cache.directory)):
+            patcher = mock.patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.src = os.path.join(self.folder, "src.jpg")
+        Image.new("RGB", (1600, 1200), (200, 40, 90)).save(self.src)
+
+    def test_background_is_resized_once_and_then_loaded_from_cache(self):
+        first = backgrounds.load_background(self.src, "quote")
+        with mock.patch("myapp.backgrounds.decode_scaled") as decode:
+            second = backgrounds.load_background(self.src, "quote")
+        decode.assert_not_called()
+
+        self.assertEqual(first.size, QUOTE_SIZE)
+        self.assertTrue(np.array_equal(np.asarray(first), np.asarray(second)))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertEqual(backgrounds.load_background(self.src, "reel").width, REEL_WIDTH)
+        self.assertEqual(len([n for n in os.listdir(self.cache.directory) if n.endswith(".npy")]), 2)
+
+    def test_corrupt_cache_entry_is_rebuilt(self):
+        backgrounds.load_background(self.src, "quote")
+        (name,) = os.listdir(self.cache.directory)
+        with open(os.path.join(self.cache.directory, name), "wb") as fh:
+            fh.write(b"kharab")
+
+        self.assertEqual(backgrounds.load_background(self.src, "quote").size, QUOTE_SIZE)
+
+
+class ReducedDecodeTests(SimpleTestCase):
+    def _image(self, size, ext):
+        path = os.path.join(tempfile.mkdtemp(), f"bg.{ext}")
+        Image.new("RGB", size, (10, 120, 200)).save(path)
+        return path
+
+    def test_large_jpeg_is_decoded_at_reduced_scale_but_still_covers_the_crop(self):
+        img = decode_scaled(self._image((4320, 3240), "jpg"), quote_decode_size)
+        self.assertEqual(img.size, (2160, 1620))
+        self.assertGreaterEqual(img.height, QUOTE_SIZE[1])
+        self.assertEqual(img.mode, "RGB")
+
+    def test_other_formats_use_integer_reduce(self):
+        img = decode_scaled(self._image((4400, 1000), "png"), reel_decode_size)
+        self.assertEqual(img.size, (1100, 250))
+        self.assertGreaterEqual(img.width, REEL_WIDTH)
+
+    def test_small_images_are_not_scaled(self):
+        self.assertEqual(decode_scaled(self._image((900, 700), "jpg"), quote_decode_size).size, (900, 700))
+
+
+class TextLayoutTests(SimpleTestCase):
+    def test_wrapped_lines_fit_the_width(self):
+        font = load_font(40)
+        text = "Docker images chhoti rakho multi stage builds use karo aur cache layers ka dhyan rakho"
+        wrapped = wrap_text(text, font, 400)
+
+        self.assertGreater(wrapped.count("\n"), 0)
+        self.assertEqual(wrapped.split(), text.split())
+        self.assertTrue(all(font.getlength(line) <= 400 for line in wrapped.split("\n")))
+
+    def test_word_longer_than_the_box_is_split(self):
+        font = load_font(40)
+        wrapped = wrap_text("x" * 80, font, 300)
+        self.assertEqual(wrapped.replace("\n", ""), "x" * 80)
+        self.assertTrue(all(font.getlength(line) <= 300 for line in wrapped.split("\n")))
+
+    def test_long_text_gets_a_smaller_font_and_results_are_memoized(self):
+        short_font, _ = fit_text("Short tip", 900, 400, max_size=64, min_size=28)
+        long_text = " ".join(["Lamba Groq output"] * 60)
+        long_font, wrapped = fit_text(long_text, 900, 400, max_size=64, min_size=28)
+
+        self.assertEqual(short_font.size, 64)
+        self.assertLess(long_font.size, 64)
+        self.assertIs(load_font(40), load_font(40))
+        self.assertIs(fit_text(long_text, 900, 400, max_size=64, min_size=28)[1], wrapped)
+
+
+class QuoteTemplateTests(SimpleTestCase):
+    def setUp(self):
+        self.bg = Image.new("RGB", QUOTE_SIZE, (30, 60, 90))
+        self.addCleanup(image_utils.QUOTE_TEMPLATES.pop, "test-small", None)
+
+    def test_static_layer_is_rendered_once_per_template_and_footer(self):
+        image_utils._static_layer.cache_clear()
+        compose_quote_frame(self.bg, "Pehli post")
+        compose_quote_frame(self.bg, "Doosri post")
+        compose_quote_frame(self.bg, "Teesri post", footer_text="@other")
+
+        info = image_utils._static_layer.cache_info()
+        self.assertEqual((info.misses, info.hits), (2, 1))
+
+    def test_frame_has_box_text_and_leaves_caller_image_untouched(self):
+        frame = compose_quote_frame(self.bg, "Git rebase se history saaf rakho")
+
+        self.assertEqual(frame.shape, (QUOTE_SIZE[1], QUOTE_SIZE[0], 3))
+        self.assertEqual(tuple(frame[10, 10]), (30, 60, 90))  # box ke bahar background as-is
+        self.assertNotEqual(tuple(frame[1000, 500]), (30, 60, 90))  # translucent box ke andar
+        self.assertEqual(self.bg.getpixel((500, 1000)), (30, 60, 90))
+
+    def test_registered_template_sets_its_own_size(self):
+        register_template(OverlayTemplate("test-small", size=(540, 675), box=(20, 100, 520, 600),
+                                          text_xy=(40, 120), font_size=32, min_font_size=16))
+
+        frame = compose_quote_frame(self.bg, "Chhota frame", template="test-small")
+
+        self.assertEqual(frame.shape, (675, 540, 3))
+
+
+class ProceduralBackgroundTests(SimpleTestCase):
+    def test_same_seed_gives_the_same_image(self):
+        first, seed = procedural_bg.generate_background(120, 200, seed=7)
+        again, _ = procedural_bg.generate_background(120, 200, seed=7)
+        other, _ = procedural_bg.generate_background(120, 200, seed=8)
+
+        self.assertEqual(seed, 7)
+        self.assertEqual((first.shape, first.dtype), ((200, 120, 3), np.uint8))
+        self.assertTrue(np.array_equal(first, again))
+        self.assertFalse(np.array_equal(first, other))
+
+    def test_random_seed_is_returned_for_reproduction(self):
+        pixels, seed = procedural_bg.generate_background(64, 96)
+        self.assertTrue(np.array_equal(procedural_bg.generate_background(64, 96, seed=seed)[0], pixels))
+
+    def test_every_pattern_stays_dark_enough_for_white_text(self):
+        for pattern in procedural_bg.PATTERNS:
+            pixels, _ = procedural_bg.generate_background(108, 192, seed=3, pattern=pattern)
+            self.assertLess(pixels.mean(), 140, pattern)
+            self.assertGreater(pixels.std(), 0, pattern)
+
+    def test_smooth_upsample_matches_the_grid_corners(self):
+        grid = np.array([[0.0, 1.0], [1.0, 0.0]], dtype=np.float32)
+        field = procedural_bg._upsample(10, 10, [(grid, 1.0)])
+        self.assertEqual(field.shape, (10, 10))
+        self.assertAlmostEqual(float(field[0, 0]), 0.0)
+        self.assertTrue(((field >= 0) & (field <= 1)).all())
+
+
+def _take_images(directory, count, queue):
+    pool = image_pool.ImagePool(directory, max_bytes=10 * 1024 * 1024, reuse_seconds=3600)
+    queue.put([pool.take() for _ in range(count)])
+
+
+class ImagePoolLockTests(SimpleTestCase):
+    def test_parallel_processes_never_get_the_same_image(self):
+        if image_pool.fcntl is None:
+            self.skipTest("flock sirf POSIX par")
+        with tempfile.TemporaryDirectory() as root:
+            directory = os.path.join(root, "pool")
+            os.makedirs(directory)
+            for i in range(60):
+                with open(os.path.join(directory, f"{i:064x}.jpg"), "wb") as fh:
+                    fh.write(b"x")
+
+            ctx = multiprocessing.get_context("fork")
+            queue = ctx.Queue()
+            workers = [ctx.Process(target=_take_images, args=(directory, 15, queue)) for _ in range(4)]
+            for worker in workers:
+                worker.start()
+            taken = [path for _ in workers for path in queue.get(timeout=30)]
+            for worker in workers:
+                worker.join()
+
+            self.assertNotIn(None, taken)
+            self.assertEqual(len(set(taken)), 60)
+
+
+class JobQueueTests(TestCase):
+    def test_job_is_claimed_only_once(self):
+        run = jobs.enqueue(PostRun.JobType.TWEET)
+        claimed = jobs.claim_next()
+        self.assertEqual(claimed.id, run.id)
+        self.assertEqual(claimed.status, PostRun.Status.STARTED)
+        self.assertEqual(claimed.attempts, 1)
+        self.assertIsNone(jobs.claim_next())
+
+    def test_claim_skips_job_taken_by_another_worker(self):
+        first = jobs.enqueue(PostRun.JobType.TWEET)
+        second = jobs.enqueue(PostRun.JobType.IMAGE)
+        original_update = QuerySet.update
+        raced = []
+
+        def racing_update(queryset, **kwargs):
+            if not raced:
+                # Candidates padhne ke baad, conditional UPDATE se pehle dusre worker ne first le liya
+                raced.append(True)
+                original_update(PostRun.objects.filter(id=first.id), status=PostRun.Status.STARTED)
+            return original_update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, "update", autospec=True, side_effect=racing_update):
+            claimed = jobs.claim_next()
+
+        self.assertEqual(claimed.id, second.id)
+        first.refresh_from_db()
+        self.assertEqual(first.attempts, 0)  # humara UPDATE first par laga hi nahi
+
+    def test_stale_started_jobs_are_requeued_or_failed(self):
+        old = timezone.now() - timedelta(minutes=45)
+        retry = PostRun.objects.create(job_type=PostRun.JobType.REEL, status=PostRun.Status.STARTED,
+                                       started_at=old, attempts=1)
+        exhausted = PostRun.objects.create(job_type=PostRun.JobType.REEL, status=PostRun.Status.STARTED,
+                                           started_at=old, attempts=3)
+        running = PostRun.objects.create(job_type=PostRun.JobType.REEL, status=PostRun.Status.STARTED,
+                                         started_at=timezone.now(), attempts=1)
+
+        self.assertEqual(jobs.requeue_stale(30), 2)
+
+        for run in (retry, exhausted, running):
+            run.refresh_from_db()
+        self.assertEqual(retry.status, PostRun.Status.QUEUED)
+        self.assertEqual(exhausted.status, PostRun.Status.FAILED)
+        self.assertIsNotNone(exhausted.finished_at)
+        self.assertEqual(running.status, PostRun.Status.STARTED)
+
+    def test_long_running_job_with_fresh_heartbeat_is_not_requeued(self):
+        run = jobs.enqueue(PostRun.JobType.REEL)
+        jobs.claim_next()
+        PostRun.objects.filter(id=run.id).update(started_at=timezone.now() - timedelta(hours=2))
+        self.assertTrue(jobs.heartbeat(run.id))
+
+        self.assertEqual(jobs.requeue_stale(30), 0)
+        run.refresh_from_db()
+        self.assertEqual(run.status, PostRun.Status.STARTED)
+
+        PostRun.objects.filter(id=run.id).update(heartbeat_at=timezone.now() - timedelta(minutes=31))
+        self.assertEqual(jobs.requeue_stale(30), 1)
+        run.refresh_from_db()
+        self.assertEqual(run.status, PostRun.Status.QUEUED)
+
+    def test_keep_alive_beats_until_the_block_ends(self):
+        with mock.patch.object(jobs, "heartbeat") as beat, mock.patch.object(jobs, "connection"):
+            with jobs.keep_alive(7, interval=0.05):
+                time.sleep(0.3)
+            beats = beat.call_count
+            time.sleep(0.15)
+        self.assertGreaterEqual(beats, 3)
+        self.assertEqual(beat.call_count, beats)
+        beat.assert_called_with(7)
+
+
+class RunEventsTests(TestCase):
+    def _events(self, run, **headers):
+        response = self.client.get(reverse("run_events", args=[run.id]), **headers)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        return b"".join(response.streaming_content).decode("utf-8")
+
+    def test_finished_run_streams_stages_then_done(self):
+        stages = [{"stage": "inputs", "seconds": 1.2}, {"stage": "render", "seconds": 3.4}]
+        run = PostRun.objects.create(status=PostRun.Status.SUCCESS, metadata={"stages": stages})
+
+        body = self._events(run)
+
+        self.assertTrue(body.startswith("retry: "))
+        self.assertIn('event: stage\nid: 1\ndata: {"stage": "inputs"', body)
+        self.assertIn("id: 2\n", body)
+        self.assertLess(body.index("event: status"), body.index("event: done"))
+        self.assertTrue(body.rstrip().endswith("}"))
+
+    def test_reconnect_skips_stages_already_sent(self):
+        stages = [{"stage": "inputs"}, {"stage": "render"}]
+        run = PostRun.objects.create(status=PostRun.Status.FAILED, metadata={"stages": stages})
+
+        body = self._events(run, HTTP_LAST_EVENT_ID="1")
+
+        self.assertNotIn("id: 1\n", body)
+        self.assertIn('id: 2\ndata: {"stage": "render"}', body)
+
+    def test_stream_of_a_running_job_ends_after_max_seconds(self):
+        run = PostRun.objects.create(status=PostRun.Status.STARTED)
+        # Chhota poll interval; stream kuch hi polls ke baad band
+        with mock.patch("myapp.views.SSE_MAX_SECONDS", 0.05), mock.patch("myapp.views.SSE_POLL_SECONDS", 0.01):
+            body = self._events(run)
+        self.assertIn("event: status", body)
+        self.assertNotIn("event: done", body)
+
+
+class CaptionIndexTests(TestCase):
+    CAPTION = ("💡 Python mein list comprehension se loops chhote aur fast bante hain, "
+               "jaise [x * 2 for x in data] ek line mein poori list bana deta hai")
+
+    def test_near_duplicate_is_found(self):
+        posted = caption_index.register(self.CAPTION)
+        reworded = self.CAPTION.replace("💡 ", "🔹 ").replace("fast bante", "fast ban jate")
+        match = caption_index.find_duplicate(reworded)
+        self.assertIsNotNone(match)
+        self.assertEqual(match[0].id, posted.id)
+        self.assertGreaterEqual(match[1], caption_index.CAPTION_DUPLICATE_THRESHOLD)
+
+    def test_unrelated_caption_is_not_a_duplicate(self):
+        caption_index.register(self.CAPTION)
+        other = "🔹 Kubernetes mein readiness probe fail ho to pod ko traffic nahi milta, deploy safe rehta hai"
+        self.assertIsNone(caption_index.find_duplicate(other))
+
+    def test_register_posted_looks_up_the_indexed_hash(self):
+        caption_index.register_posted(self.CAPTION)
+        fingerprint = CaptionFingerprint.objects.get()
+        self.assertEqual(fingerprint.text_hash, caption_index.text_hash(self.CAPTION))
+        # Sirf emoji/whitespace ka farq → same normalized hash, dobara index nahi
+        self.assertIsNone(caption_index.register_posted(self.CAPTION.replace("💡 ", "🔹  ")))
+        with CaptureQueriesContext(connection) as queries:
+            caption_index.register_posted(self.CAPTION)
+        self.assertIn("text_hash", queries[0]["sql"])
+        self.assertNotIn('"text" =', queries[0]["sql"])
+        self.assertEqual(CaptionFingerprint.objects.count(), 1)
+
+
+class RotationTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(rotation, "_synced", set())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_equal_weights_rotate_least_recently_used(self):
+        names = ["Docker", "Git", "Linux", "Python"]
+        picked = rotation.pick(RotationItem.Kind.TOPIC, names, count=8)
+        self.assertEqual(sorted(picked[:4]), sorted(names))
+        self.assertEqual(picked[4:], picked[:4])
+
+    def test_weights_share_picks_proportionally(self):
+        names = ["Docker", "Git", "Linux"]
+        rotation.pick(RotationItem.Kind.TOPIC, names, count=0)  # sync
+        RotationItem.objects.filter(name="Docker").update(weight=2.0)
+        picked = rotation.pick(RotationItem.Kind.TOPIC, names, count=40)
+        self.assertEqual({name: picked.count(name) for name in names}, {"Docker": 20, "Git": 10, "Linux": 10})
+
+    def test_new_item_joins_at_current_minimum(self):
+        rotation.pick(RotationItem.Kind.KEYWORD, ["coding", "laptop"], count=6)
+        rotation._synced.clear()
+        picked = rotation.pick(RotationItem.Kind.KEYWORD, ["coding", "laptop", "server"], count=3)
+        self.assertEqual(sorted(picked), ["coding", "laptop", "server"])
+
+
+class _GroqResponse:
+    def __init__(self, status_code, content="", headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._content = content
+        self.text = content if status_code != 200 else ""
+
+    def json(self):
+        return {"choices": [{"message": {"content": self._content}}]}
+
+
+class InstagramSessionTests(SimpleTestCase):
+    def setUp(self):
+        folder = tempfile.mkdtemp()
+        self.session_file = os.path.join(folder, "session.json")
+        self.client = mock.MagicMock()
+        self.client.get_settings.return_value = {"uuids": {"phone_id": "p1"}}
+        self.Client = mock.Mock(return_value=self.client)
+        for target, value in (("myapp.instagram_session.Client", self.Client),
+                              ("myapp.instagram_session.install_replay", mock.Mock())):
+            patcher = mock.patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.health = {}
+        for name in ("blocked", "record_failure", "clear"):
+            patcher = mock.patch.object(provider_health, name, return_value=None)
+            self.health[name] = patcher.start()
+            self.addCleanup(patcher.stop)
+        self.session = instagram_session.InstagramSession("user", "pw", self.session_file, validate_seconds=3600)
+
+    def test_login_happens_once_and_settings_are_saved(self):
+        self.assertEqual(self.session.run(lambda cl: "a"), "a")
+        self.assertEqual(self.session.run(lambda cl: "b"), "b")
+
+        self.assertEqual(self.Client.call_count, 1)
+        self.client.login.assert_called_once_with("user", "pw")
+        with open(self.session_file, encoding="utf-8") as fh:
+            self.assertEqual(json.load(fh), {"uuids": {"phone_id": "p1"}})
+
+    def test_saved_settings_are_reused_on_next_process(self):
+        self.session.run(lambda cl: None)
+        fresh = instagram_session.InstagramSession("user", "pw", self.session_file)
+
+        fresh.run(lambda cl: None)
+
+        self.client.set_settings.assert_called_once_with({"uuids": {"phone_id": "p1"}})
+
+    def test_expired_session_relogs_in_once_and_retries(self):
+        action = mock.Mock(side_effect=[LoginRequired("expired"), "posted"])
+
+        self.assertEqual(self.session.run(action), "posted")
+
+        self.client.relogin.assert_called_once_with()
+        self.assertEqual(self.client.login.call_count, 1)
+        self.health["clear"].assert_called_with(provider_health.INSTAGRAM)
+
+    def test_auth_failure_is_cached_and_drops_the_client(self):
+        self.client.login.side_effect = BadPassword("nope")
+
+        with self.assertRaises(BadPassword):
+            self.session.run(lambda cl: None)
+
+        self.health["record_failure"].assert_called_once()
+        self.assertIsNone(self.session._client)
+
+    def test_cached_failure_skips_login(self):
+        self.health["blocked"].return_value = "BadPassword: nope"
+
+        with self.assertRaises(instagram_session.InstagramBlocked):
+            self.session.run(lambda cl: None)
+
+        self.Client.assert_not_called()
+
+    def test_stale_session_is_validated_before_use(self):
+        self.session.validate_seconds = 0
+        self.session.run(lambda cl: None)
+        self.client.account_info.assert_not_called()
+
+        self.session.run(lambda cl: None)
+
+        self.client.account_info.assert_called_once_with()
+
+
+class TwitterClientCacheTests(SimpleTestCase):
+    def setUp(self):
+        creds = mock.patch("myapp.twitter_utils._credentials", return_value=("ck", "cs", "at", "as"))
+        creds.start()
+        self.addCleanup(creds.stop)
+        self.addCleanup(twitter_utils.invalidate_twitter_clients)
+        twitter_utils.invalidate_twitter_clients()
+
+    def test_clients_are_built_once_and_share_the_keep_alive_session(self):
+        first, again = twitter_utils.get_twitter_client_v2(), twitter_utils.get_twitter_client_v2()
+        self.assertIs(first, again)
+        with mock.patch.object(tweepy.API, "verify_credentials"):
+            api = twitter_utils.get_twitter_client_v1()
+        self.assertIs(api.session, first.session)
+        self.assertIs(api.session, twitter_utils._session)
+
+    def test_credentials_are_verified_once_per_ttl(self):
+        with mock.patch.object(tweepy.API, "verify_credentials") as verify, \
+                mock.patch.object(provider_health, "clear"):
+            twitter_utils.get_twitter_client_v1()
+            twitter_utils.get_twitter_client_v1()
+            self.assertEqual(verify.call_count, 1)
+            with mock.patch("myapp.twitter_utils.TWITTER_VERIFY_TTL_SECONDS", -1):
+                twitter_utils.get_twitter_client_v1()
+        self.assertEqual(verify.call_count, 2)
+
+    def test_unauthorized_tweet_drops_cached_clients(self):
+        response = mock.Mock(status_code=401, reason="Unauthorized", json=mock.Mock(return_value={}))
+        client = twitter_utils.get_twitter_client_v2()
+        with mock.patch.object(provider_health, "blocked", return_value=None), \
+                mock.patch.object(provider_health, "record_failure") as record_failure, \
+                mock.patch.object(tweepy.Client, "create_tweet", side_effect=tweepy.Unauthorized(response)):
+            result = twitter_utils.post_tweet_v2("hello")
+
+        self.assertFalse(result["success"])
+        record_failure.assert_called_once()
+        self.assertIsNot(twitter_utils.get_twitter_client_v2(), client)
+
+
+class ModelRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.calls = []
+        self.responses = {}
+        for target, value in (("blocked", None), ("record_failure", None), ("clear", None)):
+            patcher = mock.patch.object(llm_router.provider_health, target, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(llm_router.llm_session, "post", side_effect=self._post)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _post(self, url, headers, json, timeout, stream):
+        self.calls.append(json["model"])
+        return self.responses[json["model"]]()
+
+    def test_fails_over_to_next_model(self):
+        router = llm_router.ModelRouter(["a", "b"], failure_threshold=3)
+        self.responses = {"a": lambda: _GroqResponse(500, "boom"), "b": lambda: _GroqResponse(200, "tip")}
+        self.assertEqual(router.complete({"messages": []}), ("b", "tip"))
+        self.assertEqual(self.calls, ["a", "b"])
+
+    def test_breaker_opens_after_consecutive_failures(self):
+        router = llm_router.ModelRouter(["a"], failure_threshold=2, cooldown=60)
+        self.responses = {"a": lambda: _GroqResponse(503, "down")}
+        for _ in range(3):
+            with self.assertRaises(llm_router.GroqUnavailable):
+                router.complete({"messages": []})
+        # Do lagatar failures ke baad circuit open → teesri baar network call hi nahi
+        self.assertEqual(self.calls, ["a", "a"])
+        self.assertTrue(router.stats()["a"]["open"])
+
+        with mock.patch.object(llm_router.time, "monotonic", return_value=time.monotonic() + 61):
+            self.assertEqual(router.ranked(), ["a"])  # cooldown ke baad half-open
+
+    def test_rate_limit_opens_for_retry_after(self):
+        router = llm_router.ModelRouter(["a", "b"], failure_threshold=5)
+        self.responses = {"a": lambda: _GroqResponse(429, "slow down", {"Retry-After": "30"}),
+                          "b": lambda: _GroqResponse(200, "tip")}
+        router.complete({"messages": []})
+        self.assertEqual(router.ranked(), ["b"])
+
+    def test_auth_error_does_not_fail_over(self):
+        router = llm_router.ModelRouter(["a", "b"])
+        self.responses = {"a": lambda: _GroqResponse(401, "invalid key"), "b": lambda: _GroqResponse(200, "tip")}
+        with self.assertRaises(llm_router.GroqAuthError):
+            router.complete({"messages": []})
+        self.assertEqual(self.calls, ["a"])
+
+    def test_all_models_failing_raises_unavailable(self):
+        router = llm_router.ModelRouter(["a", "b"])
+        self.responses = {"a": lambda: _GroqResponse(500, "x"), "b": lambda: _GroqResponse(500, "y")}
+        with self.assertRaises(llm_router.GroqUnavailable):
+            router.complete({"messages": []})
+
+
+class EncodeStillVideoTests(SimpleTestCase):
+    def test_odd_sized_still_encodes_to_even_yuv420p_with_audio(self):
+        with tempfile.TemporaryDirectory() as folder:
+            frame = os.path.join(folder, "frame.png")
+            Image.new("RGB", (107, 191), (20, 40, 80)).save(frame)
+            music = generate_background_music(folder, duration_sec=3, seed="x")
+            output = os.path.join(folder, "reel.mp4")
+
+            self.assertTrue(encode_still_video(frame, music, output, duration=2))
+
+            info = ffmpeg_parse_infos(output)
+            self.assertAlmostEqual(info["duration"], 2.0, delta=0.1)
+            self.assertEqual(info["video_fps"], 30)
+            self.assertEqual(info["video_size"], [108, 192])
+            self.assertTrue(info["audio_found"])
+            probe = subprocess.run([mpconfig.get_setting("FFMPEG_BINARY"), "-hide_banner", "-i", output],
+                                   capture_output=True, text=True)
+            self.assertIn("h264", probe.stderr)
+            self.assertIn("yuv420p", probe.stderr)
+            self.assertIn("aac", probe.stderr)
+
+    def test_missing_frame_returns_false(self):
+        with tempfile.TemporaryDirectory() as folder:
+            output = os.path.join(folder, "reel.mp4")
+            self.assertFalse(encode_still_video(os.path.join(folder, "nahi.png"), None, output, duration=1))
+
+
+class GatherInputsTests(SimpleTestCase):
+    def _fakes(self, parties):
+        # Har task barrier par milta hai → tasks sequential chale to BrokenBarrierError
+        barrier = threading.Barrier(parties, timeout=5)
+
+        def meet(value):
+            barrier.wait()
+            return value
+
+        stack = ExitStack()
+        stack.enter_context(mock.patch("myapp.auto_post.next_post_topic", return_value="Python"))
+        stack.enter_context(mock.patch("myapp.auto_post.take_caption", lambda topic=None: meet(f"💡 {topic} tip")))
+        stack.enter_context(mock.patch("myapp.auto_post.download_random_tech_image",
+                                       lambda workdir, keyword=None: meet(f"{keyword}.jpg")))
+        stack.enter_context(mock.patch("myapp.auto_post.pick_background_music",
+                                       lambda workdir, seed=None: meet(f"{seed}.wav")))
+        return stack
+
+    def test_script_background_and_music_are_prepared_concurrently(self):
+        ready = []
+        with self._fakes(3):
+            inputs = auto_post.gather_post_inputs(
+                "/tmp", music_seed="s1",
+                on_ready=lambda name, value, ms: ready.append((name, threading.current_thread())))
+
+        self.assertEqual(inputs, {"topic": "Python", "script": "💡 Python tip",
+                                  "bg_image": f"{auto_post.image_keyword_for('Python')}.jpg", "music": "s1.wav"})
+        self.assertEqual(sorted(name for name, _ in ready), ["bg_image", "music", "script"])
+        self.assertTrue(all(thread is threading.current_thread() for _, thread in ready))
+
+    def test_known_inputs_are_not_rebuilt(self):
+        ready = []
+        with self._fakes(1):
+            inputs = auto_post.gather_post_inputs(
+                "/tmp", with_music=False, known={"script": "💡 Saved tip"},
+                on_ready=lambda name, value, ms: ready.append((name, ms)))
+
+        self.assertEqual(inputs["script"], "💡 Saved tip")
+        self.assertIsNone(inputs["music"])
+        self.assertEqual(ready[0], ("script", 0))
+        self.assertEqual([name for name, _ in ready], ["script", "bg_image"])
+
+
+class BatchCaptionTests(SimpleTestCase):
+    TIP = "Yeh ek kaafi lamba tech tip hai jo validation pass karega"
+
+    def _complete(self, *payloads):
+        raws = [p if isinstance(p, str) else json.dumps({"tips": p}) for p in payloads]
+        return mock.patch.object(llm_router.groq_router, "complete",
+                                 side_effect=[("llama", raw) for raw in raws])
+
+    def test_parse_tips_json_ignores_code_fences(self):
+        self.assertEqual(auto_post._parse_tips_json('```json\n{"tips": [{"tip": "a"}]}\n```'), [{"tip": "a"}])
+        with self.assertRaises(ValueError):
+            auto_post._parse_tips_json('{"answer": []}')
+        with self.assertRaises(ValueError):
+            auto_post._parse_tips_json("koi JSON nahi")
+
+    def test_invalid_and_duplicate_tips_are_dropped(self):
+        tips = [
+            {"topic": "docker", "tip": f"Docker: {self.TIP}"},
+            {"topic": "Rust", "tip": "chhota"},
+            {"topic": "Linux", "tip": f"docker:   {self.TIP}"},
+            {"topic": "anjaan", "tip": f"Git: {self.TIP}"},  # anjaan topic → usi position ka topic
+            "not a dict",
+        ]
+        with self._complete(tips) as complete:
+            pairs = auto_post._batch_captions(4, ["Docker", "Rust", "Linux", "Git"])
+
+        complete.assert_called_once()
+        self.assertEqual([topic for topic, _ in pairs], ["Docker", "Git"])
+        self.assertTrue(pairs[0][1].startswith("💡 Docker:"))
+
+    def test_large_batches_are_split_and_bad_json_is_retried(self):
+        tips = lambda *topics: [{"topic": t, "tip": f"{t}: {self.TIP}"} for t in topics]
+        with mock.patch("myapp.auto_post.CAPTION_BATCH_SIZE", 2), \
+                self._complete(tips("Docker", "Rust"), "not json", tips("Git")) as complete:
+            captions = generate_tech_scripts_batch(3, ["Docker", "Rust", "Git"])
+
+        self.assertEqual(complete.call_count, 3)
+        self.assertEqual(len(captions), 3)
+
+    def test_prefetch_fills_the_topic_pool(self):
+        with self._complete([{"topic": "Rust", "tip": f"Rust: {self.TIP}"}]), \
+                mock.patch.object(auto_post, "_caption_pool", deque()) as pool, \
+                mock.patch.object(auto_post, "_next_topics", return_value=["Rust"]):
+            self.assertEqual(auto_post.prefetch_captions(1), 1)
+            self.assertEqual(pool[0][0], "Rust")
+            self.assertEqual(auto_post.next_post_topic(), "Rust")
+
+
+class ContentBankTests(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        for target, value in (("myapp.content_bank.CONTENT_BANK_DIR", self.folder),
+                              ("myapp.auto_post.RUNS_DIR", tempfile.mkdtemp())):
+            patcher = mock.patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _item(self, name, minutes_ago=0, **fields):
+        path = os.path.join(self.folder, name)
+        with open(path, "wb") as fh:
+            fh.write(b"media")
+        item = ContentItem.objects.create(kind=ContentItem.Kind.IMAGE, caption=f"💡 {name}", media_path=path,
+                                          expires_at=timezone.now() + timedelta(hours=1), **fields)
+        ContentItem.objects.filter(id=item.id).update(created_at=timezone.now() - timedelta(minutes=minutes_ago))
+        return item
+
+    def test_produce_moves_render_out_of_the_workspace(self):
+        def render(caption, workdir, bg_image_path):
+            path = os.path.join(workdir, "quote_post.jpg")
+            with open(path, "wb") as fh:
+                fh.write(b"jpeg")
+            return path
+
+        with mock.patch("myapp.content_bank.gather_post_inputs",
+                        return_value={"script": "💡 Bank tip", "bg_image": "bg.jpg", "music": None}), \
+                mock.patch("myapp.content_bank.create_quote_image", side_effect=render):
+            item = content_bank.produce(ContentItem.Kind.IMAGE)
+
+        self.assertEqual((item.caption, item.status), ("💡 Bank tip", ContentItem.Status.READY))
+        self.assertEqual(os.path.dirname(item.media_path), self.folder)
+        self.assertTrue(os.path.exists(item.media_path))
+
+    def test_claim_takes_oldest_ready_item_once(self):
+        old, new = self._item("old.jpg", minutes_ago=10), self._item("new.jpg")
+
+        self.assertEqual(content_bank.claim(ContentItem.Kind.IMAGE).id, old.id)
+        self.assertEqual(content_bank.claim(ContentItem.Kind.IMAGE).id, new.id)
+        self.assertIsNone(content_bank.claim(ContentItem.Kind.IMAGE))
+        self.assertIsNone(content_bank.claim(ContentItem.Kind.REEL))
+
+    def test_item_with_missing_media_is_expired_on_claim(self):
+        gone, ok = self._item("gone.jpg", minutes_ago=10), self._item("ok.jpg")
+        os.remove(gone.media_path)
+
+        self.assertEqual(content_bank.claim().id, ok.id)
+        gone.refresh_from_db()
+        self.assertEqual(gone.status, ContentItem.Status.EXPIRED)
+
+    def test_release_and_mark_used(self):
+        failed, posted = self._item("failed.jpg"), self._item("posted.jpg")
+        content_bank.claim()
+        content_bank.claim()
+
+        content_bank.release(failed)
+        with mock.patch("myapp.content_bank.register_posted") as register_posted:
+            content_bank.mark_used(posted)
+
+        self.assertEqual(content_bank.claim().id, failed.id)
+        self.assertEqual(ContentItem.objects.get(id=posted.id).status, ContentItem.Status.USED)
+        self.assertFalse(os.path.exists(posted.media_path))
+        register_posted.assert_called_once_with("💡 posted.jpg")
+
+    def test_expire_stale_deletes_expired_media_and_frees_stuck_claims(self):
+        expired = self._item("expired.jpg")
+        ContentItem.objects.filter(id=expired.id).update(expires_at=timezone.now() - timedelta(minutes=1))
+        stuck = self._item("stuck.jpg", status=ContentItem.Status.CLAIMED,
+                           claimed_at=timezone.now() - content_bank.CLAIM_TIMEOUT - timedelta(minutes=1))
+
+        self.assertEqual(content_bank.expire_stale(), 1)
+
+        self.assertFalse(os.path.exists(expired.media_path))
+        self.assertEqual(ContentItem.objects.get(id=expired.id).status, ContentItem.Status.EXPIRED)
+        self.assertEqual(content_bank.claim().id, stuck.id)
+
+
+class RetryInputsTests(TestCase):
+    def _gather(self, run, calls):
+        def take_caption(topic=None):
+            calls.append("script")
+            return f"💡 Caption {len(calls)}"
+
+        def download(workdir, keyword=None):
+            calls.append("bg_image")
+            return self.bg
+
+        def music(workdir, seed=None):
+            calls.append(("music", seed))
+            return None
+
+        metadata = dict(run.metadata)
+        tracker = pipeline.StageTracker(run, metadata)
+        with mock.patch("myapp.auto_post.take_caption", take_caption), \
+                mock.patch("myapp.auto_post.download_random_tech_image", download), \
+                mock.patch("myapp.auto_post.pick_background_music", music), \
+                tempfile.TemporaryDirectory() as workdir:
+            return pipeline._gather_inputs(run, workdir, tracker, with_music=True)
+
+    def test_retry_reuses_caption_background_and_music_seed(self):
+        folder = tempfile.mkdtemp()
+        self.bg = os.path.join(folder, "pool.jpg")
+        with open(self.bg, "wb") as fh:
+            fh.write(b"jpeg")
+        run = PostRun.objects.create(job_type=PostRun.JobType.REEL)
+
+        first_calls = []
+        first = self._gather(run, first_calls)
+        run.refresh_from_db()
+        self.assertEqual(run.metadata["inputs"]["script"], first["script"])
+        self.assertEqual(run.metadata["inputs"]["bg_image"], self.bg)
+
+        retry_calls = []
+        retry = self._gather(run, retry_calls)
+        self.assertEqual((retry["script"], retry["bg_image"]), (first["script"], self.bg))
+        self.assertEqual(retry_calls, [("music", f"run-{run.id}")])
+        self.assertEqual(first_calls[-1], ("music", f"run-{run.id}"))
+
+    def test_changed_background_is_fetched_again(self):
+        folder = tempfile.mkdtemp()
+        self.bg = os.path.join(folder, "pool.jpg")
+        with open(self.bg, "wb") as fh:
+            fh.write(b"jpeg")
+        run = PostRun.objects.create(job_type=PostRun.JobType.REEL)
+        self._gather(run, [])
+        run.refresh_from_db()
+        with open(self.bg, "wb") as fh:
+            fh.write(b"dusri jpeg")
+
+        calls = []
+        self._gather(run, calls)
+        self.assertIn("bg_image", calls)
+        self.assertNotIn("script", calls)
+
+
+class _CannedAdapter(HTTPAdapter):
+    """Network ke bina fixed response (record mode ka inner adapter)"""
+
+    def __init__(self, body, headers):
+        super().__init__()
+        self.body = body
+        self.headers = headers
+
+    def send(self, request, stream=False, **kwargs):
+        raw = HTTPResponse(body=io.BytesIO(self.body), headers=self.headers, status=200,
+                           preload_content=False)
+        return self.build_response(request, raw)
+
+
+class HttpReplayTests(SimpleTestCase):
+    HEADERS = [
+        ("Content-Type", "application/json"),
+        ("Set-Cookie", "sessionid=SECRET123; Path=/; HttpOnly"),
+        ("ig-set-authorization", "Bearer IGT:2:SECRET123"),
+        ("x-ig-set-www-claim", "hmac.SECRET123"),
+        ("Authorization", "Bearer SECRET123"),
+    ]
+
+    def _session(self, mode, directory, body=b"{}"):
+        session = requests.Session()
+        adapter = http_replay.ReplayAdapter(_CannedAdapter(body, HTTPHeaderDict(self.HEADERS)), mode,
+                                            directory=directory, latency_ms=0)
+        session.mount("https://", adapter)
+        return session
+
+    def _recorded(self, directory, suffix):
+        return [os.path.join(root, name) for root, _, names in os.walk(directory)
+                for name in names if name.endswith(suffix)]
+
+    def test_session_secrets_are_not_recorded(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self._session(http_replay.RECORD, directory).get("https://i.instagram.com/api/v1/login/")
+            (meta,) = self._recorded(directory, ".json")
+            with open(meta, encoding="utf-8") as fh:
+                recorded = fh.read()
+            self.assertNotIn("SECRET123", recorded)
+            self.assertIn("sessionid=redacted; Path=/; HttpOnly", recorded)
+
+            replayed = self._session(http_replay.REPLAY, directory).get("https://i.instagram.com/api/v1/login/")
+            self.assertEqual(replayed.cookies.get("sessionid"), "redacted")
+            self.assertNotIn("ig-set-authorization", replayed.headers)
+
+    def test_streamed_download_honors_size_cap_and_is_not_recorded(self):
+        with tempfile.TemporaryDirectory() as directory:
+            session = self._session(http_replay.RECORD, directory, body=b"x" * 300 * 1024)
+            with self.assertRaises(DownloadTooLarge):
+                download_to_file("https://images.unsplash.com/a.jpg", os.path.join(directory, "a.jpg"),
+                                 session=session, max_bytes=100 * 1024, attempts=1)
+            self.assertEqual(self._recorded(directory, ".json"), [])
+            self.assertEqual(self._recorded(directory, ".tmp"), [])
+
+    def test_streamed_download_is_recorded_and_replayed(self):
+        body = os.urandom(200 * 1024)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "a.jpg")
+            digest = download_to_file("https://images.unsplash.com/a.jpg", path,
+                                      session=self._session(http_replay.RECORD, directory, body=body))
+            os.remove(path)
+            replayed = download_to_file("https://images.unsplash.com/a.jpg", path,
+                                        session=self._session(http_replay.REPLAY, directory, body=b""))
+            self.assertEqual(replayed, digest)
+            self.assertEqual(digest, hashlib.sha256(body).hexdigest())
+
+
+    def test_replay_matches_exact_request_then_cycles_endpoint_recordings(self):
+        with tempfile.TemporaryDirectory() as directory:
+            recorder = self._session(http_replay.RECORD, directory)
+            canned = recorder.get_adapter("https://").inner
+            for n in (1, 2):
+                canned.body = json.dumps({"n": n}).encode()
+                recorder.post("https://api.groq.com/openai/v1/chat", json={"prompt": n})
+
+            replay = self._session(http_replay.REPLAY, directory)
+            chat = "https://api.groq.com/openai/v1/chat"
+            self.assertEqual(replay.post(chat, json={"prompt": 2}).json(), {"n": 2})
+            self.assertEqual([replay.post(chat, json={"prompt": 9}).json()["n"] for _ in range(3)], [1, 2, 1])
+            with self.assertRaises(requests.ConnectionError):
+                replay.get("https://api.groq.com/openai/v1/models")
+
+    def test_api_keys_are_scrubbed_from_recorded_urls_and_keys(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self._session(http_replay.RECORD, directory, body=b'{"ok": 1}').get(
+                "https://api.unsplash.com/photos/random?query=code&client_id=KEY111")
+            (meta,) = self._recorded(directory, ".json")
+            with open(meta, encoding="utf-8") as fh:
+                self.assertNotIn("KEY111", fh.read())
+
+            replayed = self._session(http_replay.REPLAY, directory).get(
+                "https://api.unsplash.com/photos/random?client_id=KEY222&query=code")
+            self.assertEqual(replayed.json(), {"ok": 1})
+
+
+class ProviderHealthTests(SimpleTestCase):
+    def setUp(self):
+        folder = tempfile.mkdtemp()
+        patcher = mock.patch.object(provider_health, "PROVIDER_FAILURE_FILE", os.path.join(folder, "failures.json"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_failure_is_cached_per_credential_until_ttl(self):
+        provider_health.record_failure(provider_health.GROQ, "401 Unauthorized", "key-a", ttl=60)
+        self.assertEqual(provider_health.blocked(provider_health.GROQ, "key-a"), "401 Unauthorized")
+        self.assertIsNone(provider_health.blocked(provider_health.GROQ, "key-b"))
+        self.assertIsNone(provider_health.blocked(provider_health.UNSPLASH, "key-a"))
+        with mock.patch.object(provider_health.time, "time", return_value=time.time() + 61):
+            self.assertIsNone(provider_health.blocked(provider_health.GROQ, "key-a"))
+
+    def test_groq_success_clears_cached_failure(self):
+        provider_health.record_failure(provider_health.GROQ, "401 Unauthorized", "old-key")
+        router = llm_router.ModelRouter(["a"])
+        with mock.patch.object(llm_router.llm_session, "post", return_value=_GroqResponse(200, "tip")):
+            router.complete({"messages": []})
+        self.assertEqual(provider_health.snapshot(), [])
+
+    def test_instagram_login_clears_cached_failure(self):
+        provider_health.record_failure(provider_health.INSTAGRAM, "BadPassword: x", "old")
+        folder = tempfile.mkdtemp()
+        session = instagram_session.InstagramSession("user", "pass", os.path.join(folder, "session.json"))
+        with mock.patch.object(instagram_session, "Client") as client:
+            client.return_value.get_settings.return_value = {}
+            session.client()
+        self.assertEqual(provider_health.snapshot(), [])
+
+    def test_twitter_verify_clears_cached_failure(self):
+        provider_health.record_failure(provider_health.TWITTER, "401 Unauthorized: x", "old")
+        with mock.patch.object(twitter_utils, "_cached_client", return_value=mock.Mock()), \
+                mock.patch.dict(twitter_utils._verified_at, clear=True):
+            twitter_utils.get_twitter_client_v1()
+        self.assertEqual(provider_health.snapshot(), [])
+
+
+    def test_groq_401_is_cached_and_next_call_skips_the_network(self):
+        router = llm_router.ModelRouter(["a"])
+        with mock.patch.object(llm_router.llm_session, "post", return_value=_GroqResponse(401, "")) as post:
+            with self.assertRaises(llm_router.GroqAuthError):
+                router.complete({"messages": []})
+            with self.assertRaises(llm_router.GroqAuthError):
+                router.complete({"messages": []})
+        self.assertEqual(post.call_count, 1)
+
+    def test_missing_unsplash_key_is_cached(self):
+        with mock.patch.object(image_pool, "UNSPLASH_ACCESS_KEY", ""):
+            self.assertFalse(image_pool.unsplash_available())
+            with mock.patch.object(provider_health, "record_failure") as record_failure:
+                self.assertFalse(image_pool.unsplash_available())
+        record_failure.assert_not_called()
+
+
+class CaptionFallbackTests(SimpleTestCase):
+    def setUp(self):
+        for target, value in (("GROQ_API_KEY", "gsk_test_key_123"), ("_next_topics", lambda count=1: ["Docker"] * count)):
+            patcher = mock.patch(f"myapp.auto_post.{target}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_unexpected_error_retries_then_falls_back(self):
+        with mock.patch.object(llm_router.groq_router, "complete", side_effect=RuntimeError("stream parse")) as complete:
+            self.assertEqual(generate_tech_script(), fallback_caption("Docker"))
+        self.assertEqual(complete.call_count, 3)
+
+    def test_unexpected_error_on_one_attempt_is_retried(self):
+        answer = "Docker image chhoti rakho. Multi-stage builds se sirf runtime files final image mein jati hain."
+        attempts = []
+
+        def complete(body, stop_when=None):
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("callback")
+            stop_when(answer)  # router stream ka text formatter ko deta hai
+            return "a", answer
+
+        with mock.patch.object(llm_router.groq_router, "complete", side_effect=complete):
+            self.assertTrue(generate_tech_script().startswith("💡 Docker image chhoti rakho\n🔹 Multi-stage"))
+        self.assertEqual(len(attempts), 2)
+
+    def test_batch_unexpected_error_returns_empty(self):
+        with mock.patch.object(llm_router.groq_router, "complete", side_effect=RuntimeError("boom")):
+            self.assertEqual(generate_tech_scripts_batch(2), [])
+
+
+class TopicBackgroundTests(TestCase):
+    def test_every_topic_maps_to_a_pool_keyword(self):
+        self.assertEqual(set(auto_post.TOPIC_IMAGE_KEYWORDS), set(auto_post.TECH_TOPICS))
+        self.assertLessEqual(set(auto_post.TOPIC_IMAGE_KEYWORDS.values()), set(auto_post.TECH_IMAGE_KEYWORDS))
+
+    def test_caption_and_background_share_the_topic(self):
+        seen = {}
+        with mock.patch.object(auto_post, "take_caption", side_effect=lambda topic: seen.setdefault("topic", topic)), \
+                mock.patch.object(auto_post, "download_random_tech_image",
+                                  side_effect=lambda workdir, keyword: seen.setdefault("keyword", keyword)), \
+                mock.patch.object(auto_post, "_caption_pool", deque([("Docker", "💡 Docker tip")])):
+            inputs = auto_post.gather_post_inputs(tempfile.mkdtemp(), with_music=False)
+        self.assertEqual(inputs["topic"], "Docker")
+        self.assertEqual(seen, {"topic": "Docker", "keyword": "cloud computing"})
+
+    def test_pooled_caption_is_taken_for_its_topic(self):
+        pool = deque([("Docker", "💡 Docker tip"), ("Rust", "💡 Rust tip")])
+        with mock.patch.object(auto_post, "_caption_pool", pool):
+            self.assertEqual(auto_post.next_post_topic(), "Docker")
+            self.assertEqual(auto_post._next_caption("Rust"), "💡 Rust tip")
+            self.assertEqual(list(pool), [("Docker", "💡 Docker tip")])
+
+    def test_image_pool_serves_the_requested_keyword(self):
+        with tempfile.TemporaryDirectory() as root:
+            directory = os.path.join(root, "pool")
+            os.makedirs(directory)
+            index = {}
+            for i, keyword in enumerate(["machine learning", "cloud computing", "machine learning"]):
+                digest = f"{i:064x}"
+                open(os.path.join(directory, digest + ".jpg"), "wb").close()
+                index[digest] = {"keyword": keyword, "added_at": i}
+            with open(f"{directory}.json", "w") as fh:
+                json.dump(index, fh)
+            pool = image_pool.ImagePool(directory, max_bytes=1024 * 1024, reuse_seconds=3600)
+
+            self.assertEqual(pool.available("machine learning"), 2)
+            self.assertEqual(os.path.basename(pool.take("cloud computing")), f"{1:064x}.jpg")
+            self.assertIsNone(pool.take("cloud computing"))
+            self.assertEqual(os.path.basename(pool.take()), f"{0:064x}.jpg")
+
@@ -1,83 +1,145 @@
 import os
+import threading
+import time
+import requests
 import tweepy
 import urllib.parse
 from pathlib import Path
+from myapp import provider_health
+from myapp.http_replay import install as install_replay
 from myapp.config import (
+    TWITTER_VERIFY_TTL_SECONDS,
     X_CONSUMER_KEY,
     X_CONSUMER_SECRET,
     X_ACCESS_TOKEN,
     X_ACCESS_SECRET,
 )
 
-def get_twitter_client_v1():
-    """Initialize and return Twitter API v1.1 client (used for media uploads)"""
+class _KeepAliveSession(requests.Session):
+    """tweepy.API har request ke baad ``session.close()`` karta hai (pool khatam) - yahan woh no-op hai"""
+
+    def close(self):
+        pass
+
+
+# Process-wide cache: ek hi credentials ke liye clients + connection pool reuse hota hai
+_session = install_replay(_KeepAliveSession())
+_clients = {}
+_verified_at = {}
+_clients_lock = threading.Lock()
+
+
+def _credentials():
+    """Config se credentials (URL-encoded tokens decode karke)"""
+    access_token = X_ACCESS_TOKEN
+    access_token_secret = X_ACCESS_SECRET
+
+    # URL decode the tokens if they're URL-encoded
+    if access_token and '%' in access_token:
+        access_token = urllib.parse.unquote(access_token)
+    if access_token_secret and '%' in access_token_secret:
+        access_token_secret = urllib.parse.unquote(access_token_secret)
+
+    # Do not print or log credential values
+    return X_CONSUMER_KEY, X_CONSUMER_SECRET, access_token, access_token_secret
+
+
+def _cached_client(kind, build):
+    creds = _credentials()
+    key = (kind, creds)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = build(*creds)
+            _clients[key] = client
+        return client
+
+
+def invalidate_twitter_clients():
+    """Auth failure par cached clients hatao - agli call fresh clients banayegi aur verify karegi"""
+    with _clients_lock:
+        _clients.clear()
+        _verified_at.clear()
+
+
+def _credential_fingerprint():
+    return provider_health.credential_fingerprint(*_credentials())
+
+
+def _auth_failed(error):
+    """401: clients hatao aur credentials ko kuch der ke liye negative cache mein daalo"""
+    invalidate_twitter_clients()
+    provider_health.record_failure(provider_health.TWITTER, f"401 Unauthorized: {error}", _credential_fingerprint())
+
+
+def _build_v1(consumer_key, consumer_secret, access_token, access_token_secret):
+    # Validate all credentials are present
+    missing = []
+    if not consumer_key: missing.append('X_CONSUMER_KEY')
+    if not consumer_secret: missing.append('X_CONSUMER_SECRET')
+    if not access_token: missing.append('X_ACCESS_TOKEN')
+    if not access_token_secret: missing.append('X_ACCESS_SECRET')
+
+    if missing:
+        raise ValueError(f"Missing Twitter API credentials: {', '.join(missing)} in .env file")
+
+    # Initialize Twitter client with OAuth 1.0a
+    auth = tweepy.OAuth1UserHandler(
+        consumer_key=consumer_key,
+        consumer_secret=consumer_secret,
+        access_token=access_token,
+        access_token_secret=access_token_secret
+    )
+
+    # Create API client (shared keep-alive session)
+    api = tweepy.API(auth, wait_on_rate_limit=True)
+    api.session = _session
+    return api
+
+
+def _build_v2(consumer_key, consumer_secret, access_token, access_token_secret):
+    # Initialize Twitter client with OAuth 1.0a for v2
+    client = tweepy.Client(
+        consumer_key=consumer_key,
+        consumer_secret=consumer_secret,
+        access_token=access_token,
+        access_token_secret=access_token_secret,
+    )
+    client.session = _session
+    return client
+
+
+def get_twitter_client_v1(verify=True):
+    """Cached Twitter API v1.1 client (used for media uploads).
+
+    ``verify_credentials`` sirf pehli baar aur phir har ``TWITTER_VERIFY_TTL_SECONDS`` mein ek baar.
+    """
     try:
-        # Get credentials from environment variables
-        consumer_key = X_CONSUMER_KEY
-        consumer_secret = X_CONSUMER_SECRET
-        access_token = X_ACCESS_TOKEN
-        access_token_secret = X_ACCESS_SECRET
-
-        # URL decode the tokens if they're URL-encoded
-        if access_token and '%' in access_token:
-            access_token = urllib.parse.unquote(access_token)
-        if access_token_secret and '%' in access_token_secret:
-            access_token_secret = urllib.parse.unquote(access_token_secret)
-
-        # Do not print or log credential values
-
-        # Validate all credentials are present
-        missing = []
-        if not consumer_key: missing.append('X_CONSUMER_KEY')
-        if not consumer_secret: missing.append('X_CONSUMER_SECRET')
-        if not access_token: missing.append('X_ACCESS_TOKEN')
-        if not access_token_secret: missing.append('X_ACCESS_SECRET')
-        
-        if missing:
-            raise ValueError(f"Missing Twitter API credentials: {', '.join(missing)} in .env file")
-
-        # Initialize Twitter client with OAuth 1.0a
-        auth = tweepy.OAuth1UserHandler(
-            consumer_key=consumer_key,
-            consumer_secret=consumer_secret,
-            access_token=access_token,
-            access_token_secret=access_token_secret
-        )
-        
-        # Create API client
-        api = tweepy.API(auth, wait_on_rate_limit=True)
-        
-        # Verify credentials
-        api.verify_credentials()
-        
+        api = _cached_client("v1", _build_v1)
+
+        if verify:
+            key = id(api)
+            now = time.monotonic()
+            last = _verified_at.get(key)
+            if last is None or now - last > TWITTER_VERIFY_TTL_SECONDS:
+                api.verify_credentials()
+                _verified_at[key] = now
+                # Credentials verify ho gaye → purani 401 entry hatao
+                provider_health.clear(provider_health.TWITTER)
+
         return api
-        
+
     except Exception as e:
+        if isinstance(e, tweepy.Unauthorized):
+            _auth_failed(e)
         print(f"❌ Error initializing Twitter v1.1 client: {str(e)}")
         raise
 
 def get_twitter_client_v2():
-    """Initialize and return Twitter API v2 client"""
+    """Cached Twitter API v2 client"""
     try:
-        # Get credentials from environment variables
-        consumer_key = os.getenv('X_CONSUMER_KEY')
-        consumer_secret = os.getenv('X_CONSUMER_SECRET')
-        access_token = os.getenv('X_ACCESS_TOKEN')
-        access_token_secret = os.getenv('X_ACCESS_SECRET')
-
-        # Do not print or log credential values
-
-        # Initialize Twitter client with OAuth 1.0a for v2
-        client = tweepy.Client(
-            consumer_key=consumer_key,
-            consumer_secret=consumer_secret,
-            access_token=access_token,
-            access_token_secret=access_token_secret,
-        )
-        
-        pass
-        return client
-        
+        return _cached_client("v2", _build_v2)
+
     except Exception as e:
         print(f"❌ Error initializing Twitter v2 client: {str(e)}")
         raise
@@ -89,6 +151,16 @@ def post_tweet(text, image_path=None):
 
 def post_tweet_v2(text, image_path=None):
     """Post a tweet using Twitter API v2 with optional image"""
+    # Pichhla 401 abhi cache mein hai → network par dobara fail hone ki zarurat nahi
+    reason = provider_health.blocked(provider_health.TWITTER, _credential_fingerprint())
+    if reason:
+        print(f"⏭️ Twitter skip (cached failure): {reason}")
+        return {
+            'success': False,
+            'error': f"Twitter skipped (cached credential failure): {reason}",
+            'skipped': True
+        }
+
     try:
         # Initialize v2 client for posting
         client = get_twitter_client_v2()
@@ -104,6 +176,8 @@ def post_tweet_v2(text, image_path=None):
                 media_id = media.media_id
                 print(f"✅ Media uploaded successfully. Media ID: {media_id}")
             except Exception as e:
+                if isinstance(e, tweepy.Unauthorized):
+                    _auth_failed(e)
                 error_msg = f"Error uploading media: {str(e)}"
                 print(f"❌ {error_msg}")
                 return {
@@ -133,11 +207,15 @@ def post_tweet_v2(text, image_path=None):
             error_msg = str(e)
             if "Forbidden" in error_msg and "read-only" in error_msg:
                 error_msg += "\nYour app may not have write permissions. Please check your app permissions in the Twitter Developer Portal."
-            raise Exception(error_msg)
+            raise Exception(error_msg) from e
         
     except Exception as e:
         error_msg = str(e)
         print(f"❌ Error posting tweet: {error_msg}")
+
+        # 401: cached clients/verification purani ho chuki - agli tweet fresh clients se
+        if isinstance(e, tweepy.Unauthorized) or isinstance(e.__cause__, tweepy.Unauthorized):
+            _auth_failed(e)
         
         # More detailed error handling
         if "Invalid or expired token" in error_msg:
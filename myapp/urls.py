@@ -7,5 +7,7 @@ urlpatterns = [
     path("post-instagram/", views.post_instagram_view, name="post_instagram"),
     path("post-instagram-image/", views.post_instagram_image_view, name="post_instagram_image"),
     path("post-twitter/", views.post_twitter_view, name="post_twitter"),
+    path("runs/<int:run_id>/", views.run_status, name="run_status"),
+    path("runs/<int:run_id>/events", views.run_events, name="run_events"),
 ]
 
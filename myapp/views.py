@@ -1,16 +1,15 @@
-import traceback
-from django.shortcuts import render
-from django.http import JsonResponse
+import json
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.shortcuts import get_object_or_404, render
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
+from . import provider_health
+from .jobs import enqueue
 from .models import PostRun
-from .auto_post import (
-    generate_tech_script,
-    create_reel_video,
-    post_instagram,
-    post_instagram_image,
-)
-from .twitter_utils import post_tweet
 
 
 def dashboard(request):
@@ -23,6 +22,7 @@ def dashboard(request):
         PostRun.Status.FAILED: "text-red-600",
         PostRun.Status.SKIPPED: "text-yellow-600",
         PostRun.Status.STARTED: "text-blue-600",
+        PostRun.Status.QUEUED: "text-purple-600",
     }
 
     context = {
@@ -33,160 +33,142 @@ def dashboard(request):
         "last_run_time": timezone.localtime(last.finished_at).strftime("%d %b %Y, %H:%M")
             if last and last.finished_at else "",
         "last_platform": last.get_platform_display() if last else "",
+        "provider_failures": _provider_failures(),
     }
 
     return render(request, "dashboard.html", context)
 
 
-@csrf_exempt
-def post_instagram_view(request):
-    """Direct Instagram REEL posting from dashboard"""
-    if request.method != "POST":
-        return JsonResponse({"success": False, "error": "POST method required"}, status=405)
-
-    # Create a new PostRun record
-    run = PostRun.objects.create(platform=PostRun.Platform.INSTAGRAM, status=PostRun.Status.STARTED)
-    run_metadata = {}
+def _provider_failures() -> list[dict]:
+    # Negative cache entries (Groq 401, Unsplash key, Instagram login...) dashboard ke liye
+    failures = provider_health.snapshot()
+    for failure in failures:
+        if failure["failed_at"]:
+            failure["failed_at"] = timezone.localtime(datetime.fromtimestamp(failure["failed_at"], tz=dt_timezone.utc))
+        failure["expires_in_minutes"] = max(1, round(failure["expires_in"] / 60))
+    return failures
 
-    try:
-        # Step 1: Generate tech content (har bar unique)
-        quote = generate_tech_script()
-        run.quote = quote
 
-        # Step 2: Create video
-        video_path = create_reel_video(quote)
-        if not video_path:
-            raise Exception("Video generation failed; check logs.")
-
-        run.video_path = video_path
-        run_metadata["video_path"] = video_path
-
-        # Step 3: Post to Instagram
-        post_instagram(video_path)
-        
-        run.status = PostRun.Status.SUCCESS
-        run_metadata["message"] = "Instagram post successful"
-
-        return JsonResponse({
+def _enqueue_response(job_type: str, message: str) -> JsonResponse:
+    # Pipeline (LLM + render + upload) run_worker process mein chalega, request turant return
+    run = enqueue(job_type)
+    return JsonResponse(
+        {
             "success": True,
-            "message": "✅ Instagram par post ho gaya bhai! 🎉",
-            "quote": quote,
-            "video_path": video_path,
-            "run_id": run.id
-        })
-
-    except Exception as exc:
-        run.status = PostRun.Status.FAILED
-        run.error_message = str(exc)
-        run_metadata["traceback"] = traceback.format_exc()
-        
-        return JsonResponse({
-            "success": False,
-            "error": str(exc),
-            "run_id": run.id
-        }, status=500)
-    
-    finally:
-        run.metadata = run_metadata
-        run.finished_at = timezone.now()
-        run.save()
+            "queued": True,
+            "message": message,
+            "run_id": run.id,
+            "status_url": reverse("run_status", args=[run.id]),
+            "events_url": reverse("run_events", args=[run.id]),
+        },
+        status=202,
+    )
 
 
 @csrf_exempt
-def post_twitter_view(request):
-    """Post to Twitter from dashboard"""
+def post_instagram_view(request):
+    """Direct Instagram REEL posting from dashboard (queued)"""
     if request.method != "POST":
         return JsonResponse({"success": False, "error": "POST method required"}, status=405)
+    return _enqueue_response(PostRun.JobType.REEL, "⏳ Reel queue mein hai, worker bana ke post karega")
 
-    # Create a new PostRun record
-    run = PostRun.objects.create(platform=PostRun.Platform.X, status=PostRun.Status.STARTED)
-    run_metadata = {}
 
-    try:
-        # Generate tech content
-        quote = generate_tech_script()
-        run.quote = quote
-
-        # Post to Twitter
-        result = post_tweet(quote)
-        
-        if not result['success']:
-            raise Exception(f"Twitter post failed: {result.get('error', 'Unknown error')}")
-        
-        run.status = PostRun.Status.SUCCESS
-        run_metadata["tweet_id"] = result.get('tweet_id')
-        run_metadata["message"] = "Tweet posted successfully"
-
-        return JsonResponse({
-            "success": True,
-            "message": "✅ Tweet successful! 🚀",
-            "quote": quote,
-            "tweet_id": result.get('tweet_id'),
-            "run_id": run.id
-        })
-
-    except Exception as exc:
-        run.status = PostRun.Status.FAILED
-        run.error_message = str(exc)
-        run_metadata["traceback"] = traceback.format_exc()
-        
-        return JsonResponse({
-            "success": False,
-            "error": str(exc),
-            "run_id": run.id
-        }, status=500)
-    
-    finally:
-        run.metadata = run_metadata
-        run.finished_at = timezone.now()
-        run.save()
+@csrf_exempt
+def post_twitter_view(request):
+    """Post to Twitter from dashboard (queued)"""
+    if request.method != "POST":
+        return JsonResponse({"success": False, "error": "POST method required"}, status=405)
+    return _enqueue_response(PostRun.JobType.TWEET, "⏳ Tweet queue mein hai")
 
 
 @csrf_exempt
 def post_instagram_image_view(request):
-    """Direct Instagram IMAGE (photo-only) posting from dashboard"""
+    """Direct Instagram IMAGE (photo-only) posting from dashboard (queued)"""
     if request.method != "POST":
         return JsonResponse({"success": False, "error": "POST method required"}, status=405)
+    return _enqueue_response(PostRun.JobType.IMAGE, "⏳ Image post queue mein hai")
+
+
+def _run_payload(run: PostRun) -> dict:
+    metadata = run.metadata or {}
+    return {
+        "run_id": run.id,
+        "job_type": run.job_type,
+        "status": run.status,
+        "finished": run.is_finished,
+        "success": run.status == PostRun.Status.SUCCESS,
+        "quote": run.quote,
+        "video_path": run.video_path,
+        "tweet_id": metadata.get("tweet_id"),
+        "message": metadata.get("message", ""),
+        "error": run.error_message,
+        "stages": metadata.get("stages", []),
+    }
+
+
+def run_status(request, run_id):
+    """Queued/running PostRun ka current status (JSON snapshot)"""
+    run = get_object_or_404(PostRun, id=run_id)
+    return JsonResponse(_run_payload(run))
+
+
+SSE_POLL_SECONDS = 0.5
+SSE_KEEPALIVE_SECONDS = 10
+# Ek stream itni der hi (gunicorn ke 30s timeout se kam); phir browser ``retry`` ke baad
+# ``Last-Event-ID`` ke saath khud reconnect karta hai → koi worker/thread minutes tak nahi rukta
+SSE_MAX_SECONDS = 20
+SSE_RETRY_MS = 1000
+
+
+def _sse(event: str, data: dict, event_id=None) -> str:
+    message = f"event: {event}\n"
+    if event_id is not None:
+        message += f"id: {event_id}\n"
+    return message + f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 
-    # Create a new PostRun record
-    run = PostRun.objects.create(platform=PostRun.Platform.INSTAGRAM, status=PostRun.Status.STARTED)
-    run_metadata = {}
+def run_events(request, run_id):
+    """Server-Sent Events: worker ke stage transitions + timings live push karo.
 
+    Events: ``status`` (status badla), ``stage`` (stage complete, timing ke saath)
+    aur ``done`` (final payload). Stream ``SSE_MAX_SECONDS`` baad band hota hai; reconnect par
+    ``Last-Event-ID`` se aage ke stages hi bheje jaate hain.
+    """
+    get_object_or_404(PostRun, id=run_id)
     try:
-        # Step 1: Generate tech content (har bar unique)
-        quote = generate_tech_script()
-        run.quote = quote
-
-        # Step 2: Sirf image ke saath Instagram post
-        post_instagram_image(quote)
-
-        run.status = PostRun.Status.SUCCESS
-        run_metadata["message"] = "Instagram image post successful"
-
-        return JsonResponse(
-            {
-                "success": True,
-                "message": "✅ Instagram par IMAGE post ho gaya bhai! 🎉",
-                "quote": quote,
-                "run_id": run.id,
-            }
-        )
-
-    except Exception as exc:
-        run.status = PostRun.Status.FAILED
-        run.error_message = str(exc)
-        run_metadata["traceback"] = traceback.format_exc()
-
-        return JsonResponse(
-            {
-                "success": False,
-                "error": str(exc),
-                "run_id": run.id,
-            },
-            status=500,
-        )
-
-    finally:
-        run.metadata = run_metadata
-        run.finished_at = timezone.now()
-        run.save()
+        sent = int(request.headers.get("Last-Event-ID", 0))
+    except ValueError:
+        sent = 0
+
+    def stream():
+        nonlocal sent
+        last_status = None
+        started = last_beat = time.monotonic()
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        while time.monotonic() - started < SSE_MAX_SECONDS:
+            run = PostRun.objects.filter(id=run_id).first()
+            if run is None:
+                return
+            stages = (run.metadata or {}).get("stages", [])
+            if len(stages) < sent:  # job requeue hokar dobara chala
+                sent = 0
+            for index, stage in enumerate(stages[sent:], start=sent + 1):
+                yield _sse("stage", stage, event_id=index)
+            sent = len(stages)
+
+            if run.status != last_status:
+                last_status = run.status
+                yield _sse("status", {"status": run.status, "label": run.get_status_display()})
+
+            if run.is_finished:
+                yield _sse("done", _run_payload(run))
+                return
+            if time.monotonic() - last_beat > SSE_KEEPALIVE_SECONDS:
+                last_beat = time.monotonic()
+                yield ": keep-alive\n\n"
+            time.sleep(SSE_POLL_SECONDS)
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
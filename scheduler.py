@@ -1,5 +1,6 @@
 import schedule
 import sys
+import threading
 import time
 import subprocess
 import logging
@@ -24,7 +25,8 @@ logging.info("Scheduler script loaded...")
 # PATH SETUP
 # ---------------------------------------------------------
 BASE_DIR = Path(__file__).resolve().parent
-PROJECT_DIR = BASE_DIR / "myproject"
+# Root manage.py (live app + content bank); purana nested project sirf fallback
+PROJECT_DIR = BASE_DIR if (BASE_DIR / "manage.py").exists() else BASE_DIR / "myproject"
 MANAGE_PY = PROJECT_DIR / "manage.py"
 
 # Auto-detect Python
@@ -80,6 +82,19 @@ def run_autopost_image():
     run_command("autopost_image")
 
 
+_bank_refill = None
+
+
+def run_fill_content_bank():
+    # Refill background mein - slot jobs iske render khatam hone ka wait nahi karenge
+    global _bank_refill
+    if _bank_refill and _bank_refill.is_alive():
+        logging.info("Content bank refill already running")
+        return
+    _bank_refill = threading.Thread(target=run_command, args=("fill_content_bank",), daemon=True)
+    _bank_refill.start()
+
+
 # ---------------------------------------------------------
 # SCHEDULER SETUP
 # ---------------------------------------------------------
@@ -117,6 +132,13 @@ if not (reel_time or photo_time or test_mode):
     schedule.every().day.at("15:00").do(run_autopost_image)
     schedule.every().day.at("20:00").do(run_autopost)
 
+# Content bank: idle time mein captions + renders pehle se ready (slots sirf upload karte hain)
+bank_refill_minutes = int(os.getenv("CONTENT_BANK_REFILL_MINUTES", "30"))
+if bank_refill_minutes > 0:
+    logging.info(f"Content bank refill check every {bank_refill_minutes} min")
+    schedule.every(bank_refill_minutes).minutes.do(run_fill_content_bank)
+    run_fill_content_bank()
+
 # Run on start
 if str(run_on_start).lower() in ("1", "true", "yes"):
     logging.info("RUN_ON_START enabled → Executing immediately")